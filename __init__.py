@@ -7,10 +7,9 @@
 
 __version__ = 1.0
 
-print("Loading...")
-
 # Load the global variables that the user can change.  
 from src.globalVars import _DEFAULT_INDENT as _indent
+from src.globalVars import _DEFAULT_LAZY_LOAD as _lazy
 from src.globalVars import _DEFAULT_LOAD_DB as _load
 from src.globalVars import _DEFAULT_p as _p
 from src.globalVars import _DEFAULT_t as _t
@@ -20,6 +19,9 @@ from src.globalVars import _DEFAULT_VERBOSE as _verbose
 if not isinstance(_indent, str):
     raise TypeError("Global variable '_DEFAULT_INDENT' must be a string.")
 
+if not isinstance(_lazy, bool):
+    raise TypeError("Global variable '_DEFAULT_LAZY_LOAD' must be set to boolean: True or False.")
+
 if not isinstance(_load, bool):
     raise TypeError("Global variable '_DEFAULT_LOAD_DB' must be set to boolean: True or False.")
 
@@ -36,73 +38,123 @@ if not isinstance(_verbose, int):
     raise TypeError("Global variable '_DEFAULT_VERBOSE' must be set to an integer: True or False.")
     
 
-# Enables us to turn off printing.
-from os import devnull as _DEVNULL
-import sys as _sys
-class _HiddenPrints:
-    def __enter__(self):
-        self._original_stdout = _sys.stdout
-        _sys.stdout = open(_DEVNULL, 'w')
+# Batch jobs can ask for a lazy start without editing globalVars.py.
+from os import environ as _environ
+if _environ.get("SINGULARZETA_LAZY", "") != "":
+    _lazy = _environ["SINGULARZETA_LAZY"] != "0"
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        _sys.stdout.close()
-        _sys.stdout = self._original_stdout
+# Enables us to turn off printing.
+from src.globalVars import _HiddenPrints
 
 
 # ------------------------------------------------------------------------------
 #   We front-load some functions so that the initial call after loading the 
-#   SingularZeta is not slow. 
+#   SingularZeta is not slow. In lazy mode we skip all of this: Singular starts 
+#   on its first evaluation and Zeta is imported by the functions needing it.
 # ------------------------------------------------------------------------------
-# Start a Singular run
-print(_indent + "Loading Singular.")
-from sage.all import singular as _singular
-_ = _singular.eval("1 + 1;")
-
-# See if Zeta is already imported.
-print(_indent + "Loading Zeta.")
-try:
-    Zeta_ver = isinstance(Zeta.__version__, str)
-except NameError:
-    try: 
-        # This just turns off printing because the Zeta banner always comes up.
-        with _HiddenPrints():
-            # TODO: Eventually specify what we need.
-            import Zeta 
-        Zeta_ver = isinstance(Zeta.__version__, str)
-    except ImportError:
-        Zeta_ver = False
-    except:
-        print(_indent*2 + "Something unexpected went wrong while loading Zeta.")
-except:
-    print(_indent*2 + "Something unexpected went wrong while looking for Zeta.")
+if not _lazy:
+    print("Loading...")
 
+    # Start a Singular run
+    print(_indent + "Loading Singular.")
+    from sage.all import singular as _singular
+    _ = _singular.eval("1 + 1;")
 
-# Report what we know
-if Zeta_ver:
-    print(_indent*2 + "Found Zeta version %s." % (Zeta.__version__))
-else:
-    print(_indent*2 + "Could not find Zeta! Most functions unavailable.")
-    print(_indent*2 + "Zeta url: http://www.maths.nuigalway.ie/~rossmann/Zeta/")
-del Zeta_ver
-
+    # See if Zeta is already imported.
+    print(_indent + "Loading Zeta.")
+    try:
+        Zeta_ver = isinstance(Zeta.__version__, str)
+    except NameError:
+        try: 
+            # This just turns off printing because the Zeta banner always comes up.
+            with _HiddenPrints():
+                # TODO: Eventually specify what we need.
+                import Zeta 
+            Zeta_ver = isinstance(Zeta.__version__, str)
+        except ImportError:
+            Zeta_ver = False
+        except:
+            print(_indent*2 + "Something unexpected went wrong while loading Zeta.")
+    except:
+        print(_indent*2 + "Something unexpected went wrong while looking for Zeta.")
+
+
+    # Report what we know
+    if Zeta_ver:
+        print(_indent*2 + "Found Zeta version %s." % (Zeta.__version__))
+    else:
+        print(_indent*2 + "Could not find Zeta! Most functions unavailable.")
+        print(_indent*2 + "Zeta url: http://www.maths.nuigalway.ie/~rossmann/Zeta/")
+    del Zeta_ver
+
+    print(_indent + "Importing functions.")
+
+
+# The public functions and classes, and the modules in src they come from.
+_PUBLIC = {
+    "Atlas": "atlasClass",
+    "Report": "atlasReport",
+    "Chart": "chartClass",
+    "Integrand": "integrandClass",
+    "MapIntegrand": "integrandClass",
+    "LoadChart": "interfaceSingular",
+    "SingularSessionCounts": "interfaceSingular",
+    "IntLattice": "intLatticeClass",
+    "IsLocalSubringZF_Zn": "localZFTest",
+    "IntegralTests": "propertyTests",
+    "pRationalPointChartTest": "propertyTests",
+    "pRationalPointTest": "propertyTests",
+}
+__all__ = sorted(_PUBLIC.keys())
 
 # 'from foo import *' leaves hidden functions hidden and brings it up to 
 # foo instead of foo.src
-print(_indent + "Importing functions.")
-from src.atlasClass import *
-from src.atlasReport import *
-from src.chartClass import *
-from src.integrandClass import *
-from src.interfaceSingular import *
-from src.intLatticeClass import *
-from src.localZFTest import *
-from src.propertyTests import *
-
-
-print(_indent + "User defined default settings:")
-print(_indent*2 + "Load database: %s" % (_load))
-print(_indent*2 + "User input: %s" % (_user_input))
-print(_indent*2 + "Variable names: %s" % ([_p, _t]))
-print(_indent*2 + "Verbose level: %s" % (_verbose))
-
-print("SingularZeta v%s loaded." % (__version__))
\ No newline at end of file
+if not _lazy:
+    from src.atlasClass import *
+    from src.atlasReport import *
+    from src.chartClass import *
+    from src.integrandClass import *
+    from src.interfaceSingular import *
+    from src.intLatticeClass import *
+    from src.localZFTest import *
+    from src.propertyTests import *
+else:
+    # In lazy mode, none of the modules in src (nor sage.all, which they 
+    # import) are loaded until one of the names above is first looked up. 
+    # Python 2 modules cannot do this themselves, so the package is replaced 
+    # by a module whose attribute lookup does it. Note that 'from foo import *'
+    # looks up every name, so it loads everything.
+    import sys as _sys
+    from types import ModuleType as _ModuleType
+
+    class _LazyPackage(_ModuleType):
+
+        def __getattr__(self, name):
+            if not name in _PUBLIC:
+                raise AttributeError("'module' object has no attribute '%s'" % (name))
+            from importlib import import_module
+            module = import_module("%s.src.%s" % (self.__name__, _PUBLIC[name]))
+            value = getattr(module, name)
+            setattr(self, name, value)
+            return value
+
+
+        def __dir__(self):
+            return sorted(set(self.__dict__.keys()) | set(_PUBLIC.keys()))
+
+    # We hold on to the original module, since Python 2 clears the globals of a
+    # module once it is gone.
+    _package = _LazyPackage(__name__, __doc__)
+    _package.__dict__.update(_sys.modules[__name__].__dict__)
+    _package._original = _sys.modules[__name__]
+    _sys.modules[__name__] = _package
+
+
+if not _lazy:
+    print(_indent + "User defined default settings:")
+    print(_indent*2 + "Load database: %s" % (_load))
+    print(_indent*2 + "User input: %s" % (_user_input))
+    print(_indent*2 + "Variable names: %s" % ([_p, _t]))
+    print(_indent*2 + "Verbose level: %s" % (_verbose))
+
+    print("SingularZeta v%s loaded." % (__version__))
@@ -4,15 +4,21 @@
 #   Distributed under MIT License
 #
 
+from globalVars import _DEFAULT_CACHE as _cache
 from globalVars import _DEFAULT_INDENT as _indent
 from globalVars import _DEFAULT_p as _p
 from globalVars import _DEFAULT_USER_INPUT as _input
 from globalVars import _DEFAULT_VERBOSE as _verbose
 from integrandClass import Integrand as _integrand
 from integrandClass import _integral_printout
-from interfaceSingular import LoadChart as _load
-from parseEdges import _parse_edges, _get_total_charts, _get_leaves
-from sage.all import var as _var
+from chartCache import ChartCache as _chart_cache
+from chartCache import _cached_load, _chart_hash
+from chartSequence import ChartSequence as _chart_sequence
+from checkpoint import Checkpoint as _checkpoint
+from parallel import _parallel_load_charts
+from parseEdges import _parse_edges, BlowupTree as _blowup_tree
+from rationalFunctions import _rational_sum
+from symbolTable import _symbol, _SYMBOLS
 from sage.all import factor as _factor
 from sage.all import ZZ as _ZZ
 
@@ -34,7 +40,7 @@ def _build_integrand(varbs, LT):
         integrand.append(factor)
     if not LT:
         integrand = integrand[::-1]
-    p = _var(_p)
+    p = _symbol(_p)
     return _integrand(integrand, factor=[[1 - p**(-1), [-rows, 0]]])
     
 
@@ -42,7 +48,8 @@ class Atlas():
 
     # Currently, we have lower_triangular until more information is given 
     # concerning the variables. 
-    def __init__(self, direc, lower_triangular=True, verbose=_verbose, version=2):
+    def __init__(self, direc, lower_triangular=True, verbose=_verbose, version=2, 
+        cache=_cache, jobs=1, lazy=False, resident=None, incremental=False):
         if verbose >= 1:
             print("Loading atlas from %s" % (direc))
             if verbose >= 2:
@@ -52,16 +59,47 @@ class Atlas():
         if direc[-1] != "/":
             direc = direc + "/"
         self.directory = direc
+        self.version = version
+
+        # The variables used by the charts of the atlas.
+        self.symbols = _SYMBOLS
 
         # Get the edges as a list of tuples of integers
         self.edges = _parse_edges(direc, version=version)
+        self.tree = _blowup_tree(self.edges)
 
         # Get the integer
-        self.number_of_charts = _get_total_charts(self.edges)
+        self.number_of_charts = len(self.tree)
 
         # Get the leaves as a tuple of integers corresponding to the vertex 
         # number
-        self.leaves = _get_leaves(self.edges)
+        self.leaves = self.tree.Leaves()
+
+        # Parsed charts are kept on disk, so loading unchanged charts again 
+        # does not need Singular.
+        if cache:
+            self.cache = _chart_cache(direc, version=version)
+        else:
+            self.cache = None
+        _load = lambda i, get_lat=True: _cached_load(i, direc, cache=self.cache, get_lat=get_lat, version=version)
+        self._load = _load
+        self._jobs = jobs
+
+        # We remember the chart files we loaded and the integrals we computed, 
+        # so Refresh only has to deal with what changed.
+        self._chart_hashes = {l : _chart_hash(direc, l) for l in self.leaves}
+        self._chart_integrals = {}
+
+        # Where finished integrals are saved when asked for. The entries 
+        # depend on the integrand as well as on the charts.
+        self.lower_triangular = lower_triangular
+        self.checkpoint = _checkpoint(direc, 
+            params={"lower_triangular": lower_triangular})
+
+        # An incremental atlas pulls integrands down the blow-up tree one edge 
+        # at a time, remembering the factors it gets at every vertex.
+        self.incremental = incremental
+        self._node_integrands = {}
 
         # Load Chart 1 as the starting chart. 
         # BUG with the following command due to jacDet not being defined.
@@ -71,11 +109,17 @@ class Atlas():
         # # Get the starting integrand.
         # self.integrand = _get_integrand(self.root.variables, LT)
 
-        # Load in all the leaves
-        self.charts = tuple([_load(i, direc, version=version) for i in self.leaves])
+        # Load in all the leaves. A lazy atlas only loads a leaf when it is 
+        # used, and keeps at most resident of them in memory. With more than 
+        # one job, every job gets its own Singular process.
+        if lazy or resident != None:
+            self.charts = _chart_sequence(self.leaves, _load, atlas=self, 
+                resident=resident, cache=self.cache)
+        else:
+            self.charts = tuple(self._load_leaves(self.leaves))
 
         # TODO: Once the jacDet bug is fixed, uncomment the lines above.
-        self.root = _load(1, direc, get_lat=False) # Cannot run Singular anymore
+        self.root = _load(1, get_lat=False) # Cannot run Singular anymore
 
         if verbose >= 1:
             print("Successfully loaded atlas.")
@@ -83,8 +127,9 @@ class Atlas():
                 print("="*79)
 
         self.integrand = _build_integrand(self.root.variables, lower_triangular)
-        for C in self.charts:
-            C.atlas = self
+        if isinstance(self.charts, tuple):
+            for C in self.charts:
+                C.atlas = self
 
         if verbose >= 1:
             print(self)
@@ -92,8 +137,134 @@ class Atlas():
 
 
     def __repr__(self):
-        ring = self.charts[0].coefficients
-        dim = len(self.charts[0].variables)
+        ring = self.root.coefficients
+        dim = len(self.root.variables)
+        Nverts = self.NumberOfIntegrals(load=False)
+        if Nverts == None:
+            # A lazy atlas does not load charts just to print itself.
+            counts = [self.charts.VertexCount(k, load=False) for k in range(len(self.charts))]
+            known = [n for n in counts if n != None]
+            Nverts = "at least %s (%s charts not counted yet)" % (sum(known), len(counts) - len(known))
+        first = "An atlas over %s in %s dimensions.\n" % (ring, dim)
+        direct = "%sDirectory: %s\n" % (_indent, self.directory)
+        charts = "%sNumber of charts: %s\n" % (_indent, self.number_of_charts)
+        leaves = "%sNumber of leaves: %s\n" % (_indent, len(self.leaves))
+        integrals = "%sNumber of integrals: %s" % (_indent, Nverts)
+        return first + direct + charts + leaves + integrals
+
+
+    # Loads the charts with the given labels. With more than one job, every job
+    # gets its own Singular process.
+    def _load_leaves(self, labels):
+        if self._jobs > 1 and len(labels) > 1:
+            charts = _parallel_load_charts(labels, self.directory, self._jobs, 
+                cache=self.cache, version=self.version)
+        else:
+            charts = [self._load(i) for i in labels]
+        for C in charts:
+            C.atlas = self
+        return charts
+
+
+    # Reads the directory again and brings the atlas up to date. Charts of new 
+    # leaves and of leaves whose files changed are loaded, and charts that are 
+    # no longer leaves are dropped. The integrals of the other charts are kept,
+    # so the next call to ZetaIntegral only integrates what is new. Returns a 
+    # dictionary with the labels that were 'added', 'changed', and 'removed'.
+    def Refresh(self, verbose=_verbose):
+        direc = self.directory
+        edges = _parse_edges(direc, version=self.version)
+        tree = _blowup_tree(edges)
+        leaves = tree.Leaves()
+        hashes = {l : _chart_hash(direc, l) for l in leaves}
+        old = set(self.leaves)
+        new = set(leaves)
+        added = tuple([l for l in leaves if not l in old])
+        changed = tuple([l for l in leaves if l in old and hashes[l] != self._chart_hashes.get(l)])
+        removed = tuple([l for l in self.leaves if not l in new])
+        stale = set(changed)
+
+        if verbose >= 1:
+            print("Refreshing atlas from %s" % (direc))
+            print("%s%s new, %s changed, and %s removed leaves." % (_indent, len(added), len(changed), len(removed)))
+
+        # The cache entries depend on the Edges files.
+        if self.cache != None:
+            self.cache = _chart_cache(direc, version=self.version)
+
+        if isinstance(self.charts, _chart_sequence):
+            self.charts.Relabel(leaves, keep=lambda l: not l in stale, 
+                cache=self.cache)
+        else:
+            by_label = {self.leaves[k] : self.charts[k] for k in range(len(self.leaves))}
+            to_load = [l for l in leaves if not l in by_label or l in stale]
+            by_label.update(zip(to_load, self._load_leaves(to_load)))
+            self.charts = tuple([by_label[l] for l in leaves])
+
+        for l in changed + removed:
+            _ = self._chart_integrals.pop(l, None)
+        self._node_integrands = {}
+        self.edges = edges
+        self.tree = tree
+        self.number_of_charts = len(tree)
+        self.leaves = leaves
+        self._chart_hashes = hashes
+
+        return {"added": added, "changed": changed, "removed": removed}
+
+
+    # Returns a dictionary sending each of the given labels to the tuple of 
+    # hashes of the chart files on the path from the root to that chart. The 
+    # integral of a chart depends on all of these, so checkpoints are keyed by 
+    # them.
+    def _path_hashes(self, labels):
+        node_hashes = dict(self._chart_hashes)
+        def node_hash(l):
+            if not l in node_hashes:
+                node_hashes[l] = _chart_hash(self.directory, l)
+            return node_hashes[l]
+        return {l : tuple(map(node_hash, self.tree.Path(l))) for l in labels}
+
+
+    # Returns the factors of the root integrand pulled back to the chart with 
+    # the given label, without the Jacobian. Each vertex on the path from the 
+    # root gets its factors from its parent with its last map, so the charts 
+    # above the leaves are loaded once, without their lattices. If the last map
+    # does not fit, the birational map from the root is used.
+    def _node_factors(self, label, chart=None):
+        from integrandClass import _pull_back
+        path = self.tree.Path(label)
+        nodes = self._node_integrands
+        if not path[0] in nodes:
+            nodes[path[0]] = (self.root.variables, self.integrand.list)
+        for i in range(1, len(path)):
+            l = path[i]
+            if l in nodes:
+                continue
+            if l == path[-1] and chart != None:
+                C = chart
+            else:
+                C = self._load(l, get_lat=False)
+            varbs, factors = nodes[path[i - 1]]
+            try:
+                mapped = _pull_back(factors, varbs, C.lastMap)
+            except (ValueError, TypeError):
+                mapped = _pull_back(self.integrand.list, self.root.variables, 
+                    C.birationalMap)
+            nodes[l] = (C.variables, mapped)
+        return nodes[path[-1]][1]
+
+
+    # Returns the total number of vertices of the intersection lattices of the
+    # leaves. For a lazy atlas, the counts are taken from the cache when 
+    # possible, and the other charts are loaded. If load is False, they are 
+    # not, and None is returned if some count is not known.
+    def NumberOfIntegrals(self, load=True):
+        if isinstance(self.charts, _chart_sequence):
+            counts = [self.charts.VertexCount(k, load=load) for k in range(len(self.charts))]
+            if None in counts:
+                return None
+            return sum(counts)
         # TODO: Eventually when the bug from ambient spaces is fixed, turn into 
         # lambda function.
         def chart_to_verts(x): 
@@ -102,16 +273,76 @@ class Atlas():
             except: 
                 return 0
         add_up = lambda x, y: x + y 
-        Nverts = reduce(add_up, map(chart_to_verts, self.charts))
-        first = "An atlas over %s in %s dimensions.\n" % (ring, dim)
-        direct = "%sDirectory: %s\n" % (_indent, self.directory)
-        charts = "%sNumber of charts: %s\n" % (_indent, self.number_of_charts)
-        leaves = "%sNumber of leaves: %s\n" % (_indent, len(self.leaves))
-        integrals = "%sNumber of integrals: %s" % (_indent, Nverts)
-        return first + direct + charts + leaves + integrals
+        return reduce(add_up, map(chart_to_verts, self.charts), 0)
+
+
+    # Returns the integral on the entire lattice. If stream is True, the 
+    # charts are integrated one at a time and each is released afterwards. A 
+    # lazy atlas drops each chart once it is done, so only one chart is in 
+    # memory at once; an atlas that is not lazy keeps its charts, which are 
+    # already loaded, and only drops what was built from them. The integral of 
+    # each chart is remembered, unless recompute is True. With more than one job, the 
+    # subcharts of each chart are integrated by a pool of processes. If 
+    # checkpoint is True, the integrals of the charts and subcharts are saved 
+    # as they are finished, and the ones saved by an earlier run are used. A 
+    # chart that fails is marked as failed and the others are still done. The 
+    # integrals of the charts are kept in Frac(QQ[p, t]) when they can be, and 
+    # only their sum is brought back to the symbolic ring.
+    def ZetaIntegral(self, user_input=_input, verbose=_verbose, stream=False,
+        recompute=False, jobs=1, checkpoint=False):
+        import gc
+        if recompute:
+            self._chart_integrals = {}
+        lazy = isinstance(self.charts, _chart_sequence)
+        failed = []
+        hashes = self._path_hashes(self.leaves) if checkpoint else {}
+        for k in range(len(self.leaves)):
+            label = self.leaves[k]
+            h = hashes.get(label)
+            if not label in self._chart_integrals and checkpoint and not recompute:
+                saved = self.checkpoint.load(label, h)
+                if saved != None:
+                    self._chart_integrals[label] = saved[0]
+            if label in self._chart_integrals:
+                continue
+            if stream and lazy:
+                C = self.charts.Pop(k)
+            else:
+                C = self.charts[k]
+            if checkpoint:
+                # When recomputing, the saved integrals of the subcharts go 
+                # as well; the new ones are still saved.
+                sub_store = self.checkpoint.chart(label, h)
+                if recompute:
+                    sub_store.clear()
+                try:
+                    Z = C.ZetaIntegral(jobs=jobs, checkpoint=sub_store, 
+                        symbolic=False)
+                    self.checkpoint.save(label, h, Z)
+                except Exception as err:
+                    self.checkpoint.fail(label, h, err)
+                    failed.append(label)
+                    if verbose >= 1:
+                        print("Could not integrate Chart %s: %s" % (label, err))
+                    Z = None
+            else:
+                Z = C.ZetaIntegral(jobs=jobs, symbolic=False)
+            if Z is not None:
+                self._chart_integrals[label] = Z
+            if stream:
+                C.Release()
+                C = None
+                _ = gc.collect()
+        if len(failed) > 0:
+            raise RuntimeError("Could not integrate the charts %s. The other integrals are saved; see Atlas.CheckpointStatus." % (list(failed)))
+        return _rational_sum([self._chart_integrals[l] for l in self.leaves])
 
 
-    # Returns the integral on the entire lattice
-    def ZetaIntegral(self, user_input=_input, verbose=_verbose):
-        add_up_ints = lambda x, y: x + y.ZetaIntegral()
-        return reduce(add_up_ints, self.charts, 0)
+    # Returns a dictionary with keys 'done', 'pending', and 'failed' whose 
+    # values are the tuples of leaves in that state in the checkpoint store.
+    def CheckpointStatus(self):
+        status = {"done": [], "pending": [], "failed": []}
+        hashes = self._path_hashes(self.leaves)
+        for l in self.leaves:
+            status[self.checkpoint.status(l, hashes[l])].append(l)
+        return {k : tuple(v) for k, v in status.items()}
@@ -0,0 +1,222 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Benchmarks for the parts of SingularZeta we want to keep fast. These are not
+# imported with the package. For example, in Sage run
+#   sage: from SingularZeta.src.benchmarks import ImportTime
+#   sage: ImportTime()
+
+from globalVars import _DEFAULT_INDENT as _indent
+from globalVars import _DEFAULT_VERBOSE as _verbose
+
+
+# Returns the directory containing SingularZeta and the name of the package.
+def _package_location():
+    from os.path import abspath, basename, dirname
+    pkg_dir = dirname(dirname(abspath(__file__)))
+    return dirname(pkg_dir), basename(pkg_dir)
+
+
+# Time how long it takes to import SingularZeta in a fresh Python process, both
+# with the eager start and with the lazy start. Returns a dictionary with keys
+# 'eager' and 'lazy' whose values are the best times (in seconds) over the runs.
+def ImportTime(runs=3, verbose=_verbose):
+    import os
+    import subprocess
+    import sys
+    parent, name = _package_location()
+    code = "import time; s = time.time(); import %s; print(time.time() - s)" % (name)
+    timings = {}
+    for mode, flag in [("eager", "0"), ("lazy", "1")]:
+        env = dict(os.environ)
+        env["SINGULARZETA_LAZY"] = flag
+        times = []
+        for _ in range(runs):
+            out = subprocess.check_output([sys.executable, "-c", code],
+                cwd=parent, env=env)
+            # Only the last line is ours; the eager start prints a banner.
+            times.append(float(out.decode().strip().split("\n")[-1]))
+        timings[mode] = min(times)
+    if verbose >= 1:
+        print("Import time over %s runs:" % (runs))
+        print("%sEager: %.3f seconds" % (_indent, timings["eager"]))
+        print("%sLazy:  %.3f seconds" % (_indent, timings["lazy"]))
+    return timings
+
+
+# Returns the best time (in seconds) over the runs of calling func.
+def _best_time(func, runs):
+    from time import time
+    times = []
+    for _ in range(runs):
+        start = time()
+        _ = func()
+        times.append(time() - start)
+    return min(times)
+
+
+# Record the printouts of the chart num in direc as Singular gives them, and 
+# save them to filename. These can be given to ParseThroughput later, without 
+# Singular.
+def RecordChartOutput(num, direc, filename, get_lat=True, version=2):
+    from chartCache import _num_str
+    from interfaceSingular import _singular_chart_fields
+    from sage.all import save
+    if direc[-1] == "/":
+        direc = direc[:-1]
+    if "/" in direc:
+        pdir = direc[:direc.rindex("/") + 1]
+    else:
+        pdir = "./"
+    fields = _singular_chart_fields(_num_str(num), direc, pdir, 
+        get_lat=get_lat, version=version)
+    save(fields, filename)
+    return fields
+
+
+# Time parsing the expressions in recorded chart printouts, from 
+# RecordChartOutput, with the symbolic parser and with the parser that goes 
+# straight into the polynomial ring. Returns a dictionary with keys 'symbolic' 
+# and 'ring' whose values are the best times (in seconds) over the runs, 
+# together with the number of 'lines' and 'bytes' parsed.
+def ParseThroughput(recorded, runs=3, verbose=_verbose):
+    from parseSingularBasics import _parse_printout
+    from parseSingularExpr import _expr_to_tup, _expr_to_poly
+    from sage.all import load, PolynomialRing, QQ
+    if isinstance(recorded, str):
+        recorded = load(recorded)
+    _, varbs = _parse_printout(recorded["ring"][0])
+    P = PolynomialRing(QQ, varbs)
+
+    # All the printouts of ideals; the others are lists and integer vectors.
+    names = ["ambient", "birat", "cent", "exDiv", "jacDet", "lastMap", 
+        "focus", "lat4"]
+    lines = []
+    for name in names:
+        for out in recorded.get(name, []):
+            out = out.replace(",", "").replace("_[1]=", "")
+            lines += [l for l in out.split("\n") if l.strip() != ""]
+    size = sum([len(l) for l in lines])
+
+    timings = {
+        "symbolic": _best_time(lambda: [_expr_to_tup(l) for l in lines], runs),
+        "ring": _best_time(lambda: [_expr_to_poly(l, P) for l in lines], runs),
+        "lines": len(lines), 
+        "bytes": size
+    }
+    if verbose >= 1:
+        print("Parsed %s lines (%s bytes), best of %s runs:" % (len(lines), size, runs))
+        for key, label in [("symbolic", "Symbolic:"), ("ring", "Ring:    ")]:
+            t = timings[key]
+            print("%s%s %.3f seconds (%.0f lines per second)" % (_indent, label, t, len(lines)/max(t, 1e-9)))
+    return timings
+
+
+# Time making the variables in names, each repeated the given number of times, 
+# with Sage's var and with our symbol table. If recorded chart printouts are 
+# given, from RecordChartOutput, the time to parse them is included as well. 
+# Returns a dictionary with keys 'var', 'table', and possibly 'parse' whose 
+# values are the best times (in seconds) over the runs.
+def SymbolTime(names=None, repeats=100, recorded=None, runs=3, 
+    verbose=_verbose):
+    from interfaceSingular import _parse_chart_fields
+    from sage.all import load, var
+    from symbolTable import SymbolTable
+    if names == None:
+        names = ["x%s" % (i) for i in range(1, 21)] + ["p", "t"]
+    table = SymbolTable()
+    calls = names*repeats
+    timings = {
+        "var": _best_time(lambda: [var(x) for x in calls], runs),
+        "table": _best_time(lambda: [table(x) for x in calls], runs)
+    }
+    if recorded != None:
+        if isinstance(recorded, str):
+            recorded = load(recorded)
+        timings["parse"] = _best_time(lambda: _parse_chart_fields(recorded, verbose=0), runs)
+    if verbose >= 1:
+        print("Made %s variables, best of %s runs:" % (len(calls), runs))
+        print("%svar:   %.3f seconds" % (_indent, timings["var"]))
+        print("%stable: %.3f seconds" % (_indent, timings["table"]))
+        if "parse" in timings:
+            print("Parsed the recorded chart in %.3f seconds." % (timings["parse"]))
+    return timings
+
+
+# Time the pipeline from a chart to its integral: building the monomial 
+# subcharts and integrating over them. The chart C is given directly or by its 
+# index in the atlas A. Returns a dictionary with keys 'subcharts' and 
+# 'integral' whose values are the best times (in seconds) over the runs.
+def PipelineTime(C, A=None, runs=1, verbose=_verbose):
+    if A != None:
+        C = A.charts[C]
+    timings = {
+        "subcharts": _best_time(lambda: C.Subcharts(recompute=True, verbose=0), runs),
+        "integral": _best_time(lambda: C.ZetaIntegral(verbose=0), runs)
+    }
+    if verbose >= 1:
+        print("Chart %s, best of %s runs:" % (C._id, runs))
+        print("%sSubcharts: %.3f seconds" % (_indent, timings["subcharts"]))
+        print("%sIntegral:  %.3f seconds" % (_indent, timings["integral"]))
+    return timings
+
+
+# Returns the number of bytes held by obj and everything it refers to, other 
+# than what is in seen. Parents (rings), the atlas, and parent charts are not 
+# counted, since these are shared.
+def _deep_size(obj, seen):
+    import sys
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += _deep_size(k, seen) + _deep_size(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for x in obj:
+            size += _deep_size(x, seen)
+    elif hasattr(obj, "__slots__") or hasattr(obj, "__dict__"):
+        if hasattr(obj, "__dict__") and not hasattr(obj, "parent"):
+            size += _deep_size(obj.__dict__, seen)
+        for k in getattr(type(obj), "__slots__", ()):
+            if k in {"atlas", "_parent", "_polynomial_ring", "chart"}:
+                continue
+            if hasattr(obj, k):
+                size += _deep_size(getattr(obj, k), seen)
+    return size
+
+
+# Report the memory held by the charts of the atlas A and by their subcharts. 
+# The subcharts are built if they are not already. Returns a dictionary with 
+# keys 'charts' and 'subcharts', the average number of bytes per chart and per 
+# subchart, together with the numbers of each.
+def ChartMemory(A, subcharts=True, verbose=_verbose):
+    seen = set()
+    chart_bytes = 0
+    sub_bytes = 0
+    Nsub = 0
+    for C in A.charts:
+        chart_bytes += _deep_size(C, seen)
+    if subcharts:
+        for C in A.charts:
+            if C.IsMonomial():
+                continue
+            for S in C.Subcharts(verbose=0):
+                sub_bytes += _deep_size(S, seen)
+                Nsub += 1
+    N = len(A.charts)
+    report = {
+        "charts": chart_bytes/max(N, 1),
+        "subcharts": sub_bytes/max(Nsub, 1),
+        "number of charts": N,
+        "number of subcharts": Nsub
+    }
+    if verbose >= 1:
+        print("Memory held by the atlas in %s:" % (A.directory))
+        print("%s%s charts, %s bytes per chart" % (_indent, N, report["charts"]))
+        print("%s%s subcharts, %s bytes per subchart" % (_indent, Nsub, report["subcharts"]))
+    return report
@@ -0,0 +1,204 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os as _os
+from globalVars import _CHART_CACHE_DIR, _chart_num
+from interfaceSingular import LoadChart as _load_chart
+from sage.all import load as _load
+from sage.all import save as _save
+
+# Bump this whenever the Chart or IntLattice classes change in a way that makes
+# old cache entries unusable.
+_CACHE_FORMAT = 4
+
+
+# Returns the SHA-1 hex digest of the contents of the file at path.
+def _file_hash(path):
+    from hashlib import sha1
+    h = sha1()
+    with open(path, 'rb') as F:
+        for block in iter(lambda: F.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# Returns the hash of all the Edges files in direc together.
+def _edges_hash(direc):
+    from hashlib import sha1
+    h = sha1()
+    edge_files = sorted([f for f in _os.listdir(direc) if f.startswith("Edges")])
+    for f in edge_files:
+        h.update(f.encode())
+        h.update(_file_hash(direc + f).encode())
+    return h.hexdigest()
+
+
+# Returns the hash of the file of chart num in direc, or None if there is no 
+# such file.
+def _chart_hash(direc, num):
+    try:
+        return _file_hash(direc + _chart_num(_num_str(num)))
+    except (IOError, OSError):
+        return None
+
+
+# Makes the directory direc unless it is there already. Processes saving at the
+# same time may race to make it, which is fine.
+def _make_directory(direc):
+    import errno
+    try:
+        _os.makedirs(direc)
+    except OSError as err:
+        if err.errno != errno.EEXIST or not _os.path.isdir(direc):
+            raise
+
+
+# Saves obj at path. It is first saved to a temporary file of its own in the 
+# same directory and then renamed, so processes saving the same entry at the 
+# same time do not write over each other's files. If the rename fails because 
+# another process already put the entry there, the entry is kept.
+def _save_atomic(obj, path):
+    import tempfile
+    fd, tmp = tempfile.mkstemp(dir=_os.path.dirname(path), prefix=".tmp-", 
+        suffix=".sobj")
+    _os.close(fd)
+    try:
+        _save(obj, tmp)
+        _os.rename(tmp, path)
+    except OSError:
+        if not _os.path.exists(path):
+            raise
+    finally:
+        if _os.path.exists(tmp):
+            _os.remove(tmp)
+
+
+# Returns the chart number as the string used in file names.
+def _num_str(num):
+    if isinstance(num, (list, tuple)):
+        return str(num[0]) + "." + str(num[1])
+    return str(num)
+
+
+# A content-addressed cache of parsed charts, stored in the atlas directory. An
+# entry is keyed by the hashes of the chart's ssi file and of the Edges files,
+# so an entry whose inputs changed is never found; it is deleted the next time
+# the chart is saved.
+class ChartCache():
+
+    def __init__(self, direc, version=2):
+        if direc[-1] != "/":
+            direc += "/"
+        self.atlas_directory = direc
+        self.directory = direc + _CHART_CACHE_DIR
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+        # Hidden
+        self._edges_hash = _edges_hash(direc)
+
+
+    def __repr__(self):
+        return "A chart cache in %s with %s hits and %s misses." % (self.directory, self.hits, self.misses)
+
+
+    # Returns the hash of the inputs of the chart.
+    def key(self, num, get_lat=True):
+        from hashlib import sha1
+        chart_file = self.atlas_directory + _chart_num(_num_str(num))
+        data = [_CACHE_FORMAT, self.version, bool(get_lat), self._edges_hash,
+            _file_hash(chart_file)]
+        return sha1(str(data).encode()).hexdigest()
+
+
+    def _prefix(self, num, get_lat):
+        return "Chart%s-%s-" % (_num_str(num), int(bool(get_lat)))
+
+
+    def _path(self, num, key, get_lat):
+        return self.directory + self._prefix(num, get_lat) + key + ".sobj"
+
+
+    # Returns the cached chart, or None if there is no valid entry.
+    def load(self, num, get_lat=True):
+        try:
+            path = self._path(num, self.key(num, get_lat=get_lat), get_lat)
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+        if not _os.path.exists(path):
+            self.misses += 1
+            return None
+        try:
+            C = _load(path)
+        except Exception:
+            # A broken entry is just a miss.
+            self.misses += 1
+            return None
+        self.hits += 1
+        return C
+
+
+    # Saves the chart C and deletes the stale entries for it.
+    def save(self, num, C, get_lat=True):
+        _make_directory(self.directory)
+        key = self.key(num, get_lat=get_lat)
+        path = self._path(num, key, get_lat)
+        prefix = self._prefix(num, get_lat)
+        for f in _os.listdir(self.directory):
+            if f.startswith(prefix) and self.directory + f != path:
+                _os.remove(self.directory + f)
+
+        # We do not want to save the whole atlas with the chart.
+        atlas = C.atlas
+        C.atlas = None
+        try:
+            _save_atomic(C, path)
+        finally:
+            C.atlas = atlas
+
+        # The number of vertices is kept next to the chart, so an atlas can
+        # report it without loading the chart.
+        try:
+            verts = len(C.intLat.vertices)
+        except:
+            verts = 0
+        with open(path[:-5] + ".verts", 'w') as F:
+            F.write(str(verts))
+
+
+    # Returns the number of vertices of the intersection lattice of the cached
+    # chart, or None if there is no valid entry.
+    def vertex_count(self, num, get_lat=True):
+        try:
+            path = self._path(num, self.key(num, get_lat=get_lat), get_lat)
+            with open(path[:-5] + ".verts") as F:
+                return int(F.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+
+    # Deletes every entry in the cache.
+    def clear(self):
+        if _os.path.isdir(self.directory):
+            for f in _os.listdir(self.directory):
+                _os.remove(self.directory + f)
+
+
+# Load the chart num from direc, looking in the cache first when one is given.
+# Charts loaded from Singular are added to the cache.
+def _cached_load(num, direc, cache=None, get_lat=True, version=2, 
+    singular=None):
+    load = lambda: _load_chart(num, direc, get_lat=get_lat, singular=singular,
+        version=version)
+    if cache == None:
+        return load()
+    C = cache.load(num, get_lat=get_lat)
+    if C == None:
+        C = load()
+        cache.save(num, C, get_lat=get_lat)
+    return C
@@ -14,6 +14,10 @@ from integrandClass import Integrand as _integrand
 from integrandClass import _integral_printout
 from interfaceZeta import _mono_chart_to_gen_func
 from parseSingularExpr import _expr_to_terms
+from polynomialBackend import _backend_pairs, _variable_names
+from polynomialBackend import _is_term
+from rationalFunctions import _rational_sum
+from ringFactory import _get_ring, _get_quotient
 from sage.all import expand as _expand
 from sage.all import factor as _factor
 from sage.all import Ideal as _ideal
@@ -22,7 +26,7 @@ from sage.all import PolynomialRing as _polyring
 from sage.all import QQ as _QQ
 from sage.all import Set as _set
 from sage.all import symbolic_expression as _symb_expr
-from sage.all import var as _var
+from symbolTable import _symbol
 from sage.all import ZZ as _ZZ
 
 
@@ -35,7 +39,7 @@ def _safe_variables(varbs, n):
     new_varbs = []
     for _ in range(n):
         if not letter + str(i) in varbs_str:
-            new_varbs.append(_var(letter + str(i)))
+            new_varbs.append(_symbol(letter + str(i)))
         i += 1
     return tuple(new_varbs)
 
@@ -43,9 +47,10 @@ def _safe_variables(varbs, n):
 # Given a list S of polynomials, return a set of variables, as strings, in the 
 # set S
 def _get_variable_support(S):
-    mult = lambda x, y: x*y
-    f = reduce(mult, S, 1)
-    return {str(x) for x in f.variables()}
+    support = set()
+    for f in S:
+        support |= _variable_names(f)
+    return support
 
 
 # Test if a rational multiple of f is contained in S. 
@@ -62,11 +67,59 @@ def _is_contained(f, S):
         return False, -1
 
 
-# Given an expression expr, units, non_units, and replacements repl, simplify 
-# the expression to be monomial in the latest variables.
-def _simplify_expr(expr, units, non_units, repl):
+# Given a polynomial f and a polynomial ring P over QQ, return the monic 
+# polynomial in P that is a rational multiple of f. Two polynomials have the 
+# same normal form if and only if one is a rational multiple of the other. 
+# Elements of quotient rings are lifted first. Returns None if there is no 
+# normal form.
+def _normal_form(f, P):
+    if hasattr(f, "parent") and hasattr(f.parent(), "cover_ring"):
+        f = f.lift()
+    try:
+        g = P(f)
+    except (TypeError, ValueError):
+        return None
+    if g == 0:
+        return None
+    return g/g.lc()
+
+
+# Given the units and non-units, return the data _simplify_expr needs to 
+# classify factors: the variable support of the system, a polynomial ring, and 
+# for both the units and the non-units a dictionary from normal forms to the 
+# first index with that normal form.
+def _classifier(units, non_units):
     sys_varbs = _get_variable_support(units + non_units)
-    p = _var(_p)
+    P = _get_ring(_QQ, sorted(sys_varbs | {_p}))
+    def table(S):
+        T = {}
+        for j in range(len(S)):
+            g = _normal_form(S[j], P)
+            if g != None and not g in T:
+                T[g] = j
+        return T
+    return sys_varbs, P, table(units), table(non_units)
+
+
+# Decides if a rational multiple of f is in S, using the table of normal forms 
+# of S from _classifier. If f has no normal form, we fall back on comparing 
+# with every element of S.
+def _lookup(f, S, P, table):
+    g = _normal_form(f, P)
+    if g == None:
+        return _is_contained(f, S)
+    j = table.get(g, -1)
+    return j >= 0, j
+
+
+# Given an expression expr, units, non_units, and replacements repl, simplify 
+# the expression to be monomial in the latest variables. The classifier data 
+# can be given, so that it is only built once for a system.
+def _simplify_expr(expr, units, non_units, repl, classifier=None):
+    if classifier == None:
+        classifier = _classifier(units, non_units)
+    sys_varbs, P, unit_table, non_unit_table = classifier
+    p = _symbol(_p)
     f = expr.factor_list()
     new_factors = []
     # Need Sage int for some reason...
@@ -78,14 +131,14 @@ def _simplify_expr(expr, units, non_units, repl):
         # First we check that all the variables are contained in the support of 
         # the system. 
         if any(str(x) in sys_varbs for x in d.variables()):
-            is_unit, j = _is_contained(d, units)
+            is_unit, j = _lookup(d, units, P, unit_table)
             if is_unit:
                 # If the factor is a unit, replace it with 1
                 new_factors.append(map(sage_int, [1, 1]))
                 if _verbose >= 2:
                         print "%sAssumed %s to be a unit because the following are units:\n%s%s" % (_indent, d, _indent*2, units)
             else:
-                is_non_unit, j = _is_contained(d, non_units)
+                is_non_unit, j = _lookup(d, non_units, P, non_unit_table)
                 if is_non_unit:
                     # If the factor is not a unit, replace it with p*z
                     new_factors.append([p*repl[j], f[i][1]])
@@ -113,14 +166,15 @@ def _simplify_expr(expr, units, non_units, repl):
 # Given the chart, units, non_units, and the replacement variables, construct a 
 # new chart from C with the given data.
 def _simplify(C, units, non_units, repl, verbose=_verbose):
-    # To be used to by 'map'
-    _simp_map = lambda x: _simplify_expr(x, units, non_units, repl)
+    # To be used to by 'map'. The units and non-units are classified once.
+    classifier = _classifier(units, non_units)
+    _simp_map = lambda x: _simplify_expr(x, units, non_units, repl, classifier=classifier)
 
     # First we update the birational map.
     birat = tuple(map(_simp_map, C.birationalMap))
 
     # We update the cone.
-    cone = [tuple(map(_simp_map, ineq)) for ineq in C.cone]
+    cone = tuple([tuple(map(_simp_map, ineq)) for ineq in C.cone])
 
     # Finally we update the Jacobian.
     jacobian = _simp_map(C.jacDet)
@@ -130,7 +184,7 @@ def _simplify(C, units, non_units, repl, verbose=_verbose):
     all_polys = list(birat) + reduce(flatten, cone, []) + [jacobian]
     non_const = lambda x: not _is_int(x)
     new_varbs_str = _get_variable_support(filter(non_const, all_polys))
-    new_varbs = tuple([_var(x) for x in new_varbs_str if x != _p])
+    new_varbs = tuple([_symbol(x) for x in new_varbs_str if x != _p])
 
     sub_C = Chart(C.coefficients, new_varbs, 
         atlas = C.atlas,
@@ -142,8 +196,7 @@ def _simplify(C, units, non_units, repl, verbose=_verbose):
         focus = C.focus,
         jacDet = jacobian, 
         lastMap = C.lastMap,
-        parent = C,
-        path = C.path)
+        parent = C)
     return sub_C
 
 
@@ -197,17 +250,63 @@ def _construct_subchart(C, v, verbose=_verbose):
     sub_C._id = str(C._id) + reduce(vert_to_str, v, '.')
     # We multiply by a factor of p
     c = len(_get_variable_support(divs))
-    p = _var(_p)
+    p = _symbol(_p)
     sub_C.jacDet *= p**c
 
+    # The integrand of the subchart comes from the integrand of C by the same 
+    # simplification.
+    sub_C._step = (units, non_units, repl)
+
     if verbose >= 2:
         print "%sMultiplying Jacobian by %s" % (_indent*2, p**c)
 
     return sub_C
 
 
+# The chart whose subcharts are being built by a pool of processes. The pool is
+# forked, so the workers find the chart here instead of having it sent to them.
+_pool_chart = [None]
+
+# The subcharts and integrands being integrated by a pool of processes.
+_pool_integrals = [None]
+
+# The attributes a subchart shares with its parent chart.
+_SHARED_ATTRIBUTES = ["atlas", "cent", "exDivisors", "focus", "lastMap"]
+
+
+# Builds the subchart of the chart in _pool_chart for the vertex v and decides 
+# if it is monomial. The subchart is sent back without the data it shares with 
+# its parent, which Subcharts puts back.
+def _subchart_worker(args):
+    v, verbose = args
+    sub_C = _construct_subchart(_pool_chart[0], v, verbose=verbose)
+    sub_C._parent = None
+    for attr in _SHARED_ATTRIBUTES:
+        setattr(sub_C, attr, None)
+    return sub_C, sub_C.IsMonomial()
+
+
+# Solves the integral for the kth pair of subchart and integrand in 
+# _pool_integrals.
+def _integral_worker(args):
+    k, verbose = args
+    C, I = _pool_integrals[0][k]
+    if verbose >= 1:
+        print("-"*79)
+        print("Solving the integral for Subchart %s." % (C._id))
+        _integral_printout(C)
+    return _mono_chart_to_gen_func(C, I)
 
-class Chart():
+
+# Charts use __slots__ since an atlas can have a great many of them, together 
+# with their subcharts. The data a subchart has in common with its parent is 
+# shared, not copied.
+class Chart(object):
+
+    __slots__ = ("_id", "_parent", "_subcharts", "_integralFactor", 
+        "_integrand", "_mapped", "_step", "_polynomial_ring", "_backend_cone", "coefficients", "variables", "atlas", 
+        "birationalMap", "cent", "cone", "exDivisors", "ambientFactor", "focus", 
+        "intLat", "jacDet", "lastMap")
 
     def __init__(self, R, X,
         atlas = None,
@@ -221,15 +320,17 @@ class Chart():
         intLat = None,
         jacDet = None,
         lastMap = None,
-        parent = None,
-        path = None): 
+        parent = None): 
 
         # 'Hidden' attributes
         self._id = identity
         self._parent = parent
         self._subcharts = None
         self._integralFactor = 1
-        P = _polyring(R, len(X), X)
+        self._integrand = None
+        self._mapped = None
+        self._step = None
+        P = _get_ring(R, X)
         self._polynomial_ring = P
 
         # 'Public' attributes
@@ -238,19 +339,31 @@ class Chart():
         self.atlas = atlas
         self.birationalMap = biratMap
         self.cent = cent
-        self.cone = cone
+        self.cone = tuple(cone) if cone != None else None
+        self._backend_cone = None
+        if cone != None:
+            self._backend_cone = _backend_pairs(X, self.cone)
         self.exDivisors = exDivs
-        self.ambientFactor = map(lambda f: P(f), factor)
+        self.ambientFactor = tuple([P(f) for f in factor])
         self.focus = focus
         self.intLat = intLat
         self.jacDet = jacDet
         self.lastMap = lastMap
-        self.path = path
 
         # We make sure the intersection lattice can point back to the chart
         if intLat != None:
             self.intLat.chart = self
-            self.intLat.divisors = map(lambda f: P(f), self.intLat.divisors)
+            self.intLat.divisors = tuple([P(f) for f in self.intLat.divisors])
+
+
+    # Without a __dict__, pickling needs to be told what the state is.
+    def __getstate__(self):
+        return {k : getattr(self, k) for k in self.__slots__ if hasattr(self, k)}
+
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
 
 
     def __repr__(self):
@@ -266,14 +379,13 @@ class Chart():
         return str_coeffs + str_num_vars + str_b1_ord + str_names + str_b2_ord
 
 
-    # Returns the ambient space as a (quotient) polynomial ring.
+    # Returns the ambient space as a (quotient) polynomial ring. Charts with 
+    # the same variables and ambient factor get the same ring.
     def AmbientSpace(self):
-        R = _polyring(self.coefficients, self.variables)
         if self.ambientFactor == 0:
-            return R
-        I = _ideal(R, self.ambientFactor)
-        S = R.quotient(I)
-        return S
+            return _get_ring(self.coefficients, self.variables)
+        return _get_quotient(self.coefficients, self.variables, 
+            self.ambientFactor)
 
 
     # Prints out the string for the corresponding integral for this chart: the 
@@ -284,26 +396,40 @@ class Chart():
 
     # If the chart comes from an atlas, then we know how to define the integral 
     # from the root to the chart based on its data. This function will return 
-    # the integrand.
+    # the integrand, which is only built once.
     def Integrand(self):
         if self.atlas == None:
             raise ValueError("Chart does not come from an atlas; unsure how to define an integral.")
-        return _map_integrand(self.atlas, self)
+        if self._integrand == None:
+            self._integrand = _map_integrand(self.atlas, self)
+        return self._integrand
         
     
-    # Decides if the cone data is monomial.
+    # Decides if the cone data is monomial. This counts terms in QQ[p, vars], 
+    # and only looks at the printout if an entry is not a polynomial there.
     def IsMonomial(self):
         flatten = lambda x: x[0]*x[1]
-        def _is_monomial(x):
+        def _is_monomial(x, y):
+            if not None in y:
+                return _is_term(flatten(y))
             s = str(flatten(x))
             if "+" in s or "-" in s[1:]:
                 return False
             return True
-        return all(map(_is_monomial, self.cone))
+        return all(map(_is_monomial, self.cone, self._ring_cone()))
 
 
-    # Constructs the subcharts based on the intersection lattice.
-    def Subcharts(self, recompute=False, verbose=_verbose):
+    # Returns the cone data as pairs in QQ[p, vars]. These are converted once, 
+    # when the chart is built, or else the first time they are asked for.
+    def _ring_cone(self):
+        if getattr(self, "_backend_cone", None) == None:
+            self._backend_cone = _backend_pairs(self.variables, self.cone)
+        return self._backend_cone
+
+
+    # Constructs the subcharts based on the intersection lattice. With more 
+    # than one job, the subcharts are built by a pool of processes.
+    def Subcharts(self, recompute=False, verbose=_verbose, jobs=1):
         # If the subcharts have already been computed, then do not do extra 
         # work if we do not need to.
         if not recompute and self._subcharts != None:
@@ -324,7 +450,23 @@ class Chart():
             print("We construct a subchart for every vertex in the lattice.")
 
         # Visit every vertex and construct a corresponding (monomial) subchart.
-        charts = [_construct_subchart(self, v, verbose=verbose) for v in verts]
+        if jobs > 1 and len(verts) > 1:
+            from parallel import _pool_map
+            _pool_chart[0] = self
+            try:
+                built = _pool_map(_subchart_worker, 
+                    [(v, verbose) for v in verts], jobs)
+            finally:
+                _pool_chart[0] = None
+            charts = [C for C, _ in built]
+            monomial = [is_mono for _, is_mono in built]
+            for C in charts:
+                C._parent = self
+                for attr in _SHARED_ATTRIBUTES:
+                    setattr(C, attr, getattr(self, attr))
+        else:
+            charts = [_construct_subchart(self, v, verbose=verbose) for v in verts]
+            monomial = None
 
         if _verbose >= 1:
             print("Computing the p-rational points for each vertex in the intersection lattice. ")
@@ -342,7 +484,8 @@ class Chart():
             print("We are verifying that all subcharts are monomial...")
         for i in range(len(charts)):
             C = charts[i]
-            if not C.IsMonomial():
+            is_mono = C.IsMonomial() if monomial == None else monomial[i]
+            if not is_mono:
                 raise AssertionError("Expected these subcharts to be monomial. Something must have gone wrong with the subchart associated to vertex %s. If the code is correct, then the original chart is not locally monomial." % (verts[i]))
 
         self._subcharts = tuple(charts)
@@ -353,8 +496,26 @@ class Chart():
         return tuple(charts)
 
 
-    # Compute the integral for the zeta function on this chart
-    def ZetaIntegral(self, user_input=_user_input, verbose=_verbose):
+    # Drops the subcharts, the integrand, and the p-rational points of the 
+    # intersection lattice. These are recomputed when they are needed again.
+    def Release(self):
+        self._subcharts = None
+        self._integrand = None
+        self._mapped = None
+        if self.intLat != None:
+            self.intLat.p_points = None
+            self.intLat._vertexToPoints = None
+
+
+    # Compute the integral for the zeta function on this chart. With more than 
+    # one job, the subcharts are built and integrated by a pool of processes; 
+    # the integrals are still added up in the order of the subcharts. If a 
+    # checkpoint for the chart is given, the integrals of the subcharts are 
+    # saved there, and the ones already there are not computed again. If 
+    # symbolic is False, an integral that is a rational function in p and t 
+    # is given as an element of Frac(QQ[p, t]).
+    def ZetaIntegral(self, user_input=_user_input, verbose=_verbose, jobs=1,
+        checkpoint=None, symbolic=True):
         if verbose >= 1: 
             print("="*79)
             print("Solving the integral for Chart %s." % (self._id))
@@ -376,27 +537,50 @@ class Chart():
             if _verbose >= 2:
                 print("Constructing monomial subcharts.")
             # First we get the monomial subcharts
-            subcharts = self.Subcharts(verbose=verbose)
+            subcharts = self.Subcharts(verbose=verbose, jobs=jobs)
 
         if _verbose >= 2:
             print("Constructing integral.")
 
         # Now we determine the integrands for each subchart
-        build_int = lambda C: _map_integrand(self.atlas, C)
+        build_int = lambda C: C.Integrand()
         integrands = map(build_int, subcharts)
 
         if _verbose >= 1:
             print("Solving %s integrals." % (len(integrands)))
 
         chrt_int = zip(subcharts, integrands)
-        gen_funcs = []
-        for t in chrt_int:
+        gen_funcs = [None]*len(chrt_int)
+        if checkpoint != None:
+            for k in range(len(chrt_int)):
+                saved = checkpoint.load(chrt_int[k][0]._id)
+                if saved != None:
+                    gen_funcs[k] = saved[0]
+        todo = [k for k in range(len(chrt_int)) if gen_funcs[k] is None]
+
+        # Each finished integral is saved as soon as we have it.
+        def finish(k, Z):
+            gen_funcs[k] = Z
+            if checkpoint != None:
+                checkpoint.save(chrt_int[k][0]._id, Z)
+
+        if jobs > 1 and len(todo) > 1:
+            from parallel import _pool_map
+            _pool_integrals[0] = chrt_int
+            try:
+                results = _pool_map(_integral_worker, 
+                    [(k, verbose) for k in todo], jobs)
+            finally:
+                _pool_integrals[0] = None
+            for k, Z in zip(todo, results):
+                finish(k, Z)
+            todo = []
+        for k in todo:
+            t = chrt_int[k]
             if verbose >= 1:
                 print("-"*79)
                 print("Solving the integral for Subchart %s." % (t[0]._id))
                 _integral_printout(t[0])
-            gen_funcs.append(_mono_chart_to_gen_func(t[0], t[1]))
-
-        add_up = lambda x, y: x + y
+            finish(k, _mono_chart_to_gen_func(t[0], t[1]))
 
-        return reduce(add_up, gen_funcs, 0)
+        return _rational_sum(gen_funcs, symbolic=symbolic)
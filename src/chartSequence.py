@@ -0,0 +1,131 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+from collections import OrderedDict as _ordered_dict
+
+
+# A tuple-like sequence of the charts of an atlas that loads a chart the first
+# time it is accessed. If resident is an integer, at most that many charts are
+# kept in memory; the one used least recently is dropped first and is loaded
+# again when it is needed.
+class ChartSequence():
+
+    def __init__(self, labels, loader, atlas=None, resident=None, cache=None):
+        self.labels = tuple(labels)
+        self.resident = resident
+        self.atlas = atlas
+
+        # Hidden
+        self._loader = loader
+        self._cache = cache
+        self._charts = _ordered_dict()
+        self._vertex_counts = {}
+
+
+    def __repr__(self):
+        return "A sequence of %s charts with %s loaded." % (len(self), len(self._charts))
+
+
+    def __len__(self):
+        return len(self.labels)
+
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return tuple([self[i] for i in range(*k.indices(len(self)))])
+        if k < 0:
+            k += len(self)
+        if k < 0 or k >= len(self):
+            raise IndexError("Chart index out of range.")
+        if k in self._charts:
+            # Mark it as the most recently used.
+            C = self._charts.pop(k)
+            self._charts[k] = C
+            return C
+        C = self._load(k)
+        self._charts[k] = C
+        if self.resident != None:
+            while len(self._charts) > max(self.resident, 1):
+                _ = self._charts.popitem(last=False)
+        return C
+
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+
+    def _load(self, k):
+        C = self._loader(self.labels[k])
+        C.atlas = self.atlas
+        self._vertex_counts[k] = _vertex_count(C)
+        return C
+
+
+    # Decides if the kth chart is currently in memory.
+    def IsLoaded(self, k):
+        return k in self._charts
+
+
+    # Returns the kth chart and forgets it, so the chart is freed as soon as
+    # the caller is done with it.
+    def Pop(self, k):
+        if k in self._charts:
+            return self._charts.pop(k)
+        return self._load(k)
+
+
+    # Changes the labels of the sequence. Loaded charts keep their place if 
+    # their label is still there and keep returns True for it; the rest are 
+    # loaded again when they are needed.
+    def Relabel(self, labels, keep=lambda label: True, cache=None):
+        labels = tuple(labels)
+        index = {labels[i] : i for i in range(len(labels))}
+        kept = lambda k: self.labels[k] in index and keep(self.labels[k])
+        charts = _ordered_dict()
+        for k, C in self._charts.items():
+            if kept(k):
+                charts[index[self.labels[k]]] = C
+        counts = {}
+        for k, n in self._vertex_counts.items():
+            if kept(k):
+                counts[index[self.labels[k]]] = n
+        self.labels = labels
+        self._cache = cache
+        self._charts = charts
+        self._vertex_counts = counts
+
+
+    # Drops all the charts from memory.
+    def Release(self):
+        self._charts = _ordered_dict()
+
+
+    # Returns the number of vertices of the intersection lattice of the kth
+    # chart. This is looked up in the cache if possible, so the chart is only
+    # loaded if it has to be. If load is False, the chart is never loaded, and 
+    # None is returned when the count is not known.
+    def VertexCount(self, k, load=True):
+        if not k in self._vertex_counts and self._cache != None:
+            n = self._cache.vertex_count(self.labels[k])
+            if n != None:
+                self._vertex_counts[k] = n
+        if not k in self._vertex_counts:
+            if not load:
+                return None
+            _ = self[k]
+        return self._vertex_counts[k]
+
+
+# Returns the number of vertices of the intersection lattice of C, and 0 if
+# there is no lattice.
+def _vertex_count(C):
+    # TODO: Eventually when the bug from ambient spaces is fixed, turn into
+    # lambda function.
+    try:
+        return len(C.intLat.vertices)
+    except:
+        return 0
@@ -0,0 +1,127 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os as _os
+from globalVars import _CHECKPOINT_DIR
+from chartCache import _make_directory, _num_str, _save_atomic
+from sage.all import load as _load
+
+
+# A store for the integrals of the charts of an atlas, and of their subcharts, 
+# kept in the atlas directory. An entry is keyed by the path of the atlas, the 
+# chart, the hashes of the chart files on the path from the root to the chart, 
+# and the parameters of the integrand, so results for an old version of a 
+# chart, or for another integrand, are never used. Charts that could not be 
+# integrated are marked as failed together with the error.
+class Checkpoint():
+
+    def __init__(self, direc, params={}):
+        if direc[-1] != "/":
+            direc += "/"
+        self.atlas_directory = direc
+        self.directory = direc + _CHECKPOINT_DIR
+        self.params = params
+
+
+    def __repr__(self):
+        return "A checkpoint store in %s." % (self.directory)
+
+
+    def _prefix(self, label, content_hash):
+        from hashlib import sha1
+        data = [_os.path.abspath(self.atlas_directory), _num_str(label), 
+            content_hash, sorted(self.params.items())]
+        return self.directory + "Chart%s-%s" % (_num_str(label), 
+            sha1(str(data).encode()).hexdigest())
+
+
+    def _read(self, path):
+        if not _os.path.exists(path):
+            return None
+        try:
+            return [_load(path)]
+        except Exception:
+            # A broken entry is just missing.
+            return None
+
+
+    def _write(self, path, obj):
+        _make_directory(self.directory)
+        _save_atomic(obj, path)
+
+
+    # Returns a list containing the integral of the chart, or None if it has 
+    # not been saved.
+    def load(self, label, content_hash):
+        return self._read(self._prefix(label, content_hash) + ".sobj")
+
+
+    # Saves the integral of the chart and clears any earlier failure.
+    def save(self, label, content_hash, Z):
+        prefix = self._prefix(label, content_hash)
+        self._write(prefix + ".sobj", Z)
+        if _os.path.exists(prefix + ".failed"):
+            _os.remove(prefix + ".failed")
+
+
+    # Marks the chart as failed with the given error.
+    def fail(self, label, content_hash, err):
+        _make_directory(self.directory)
+        with open(self._prefix(label, content_hash) + ".failed", 'w') as F:
+            F.write("%s: %s" % (type(err).__name__, err))
+
+
+    # Returns 'done', 'failed', or 'pending' for the chart.
+    def status(self, label, content_hash):
+        prefix = self._prefix(label, content_hash)
+        if _os.path.exists(prefix + ".sobj"):
+            return "done"
+        if _os.path.exists(prefix + ".failed"):
+            return "failed"
+        return "pending"
+
+
+    # Returns the subchart store for the chart.
+    def chart(self, label, content_hash):
+        return _SubchartCheckpoint(self, self._prefix(label, content_hash))
+
+
+    # Deletes every entry in the store.
+    def clear(self):
+        if _os.path.isdir(self.directory):
+            for f in _os.listdir(self.directory):
+                _os.remove(self.directory + f)
+
+
+# The part of a checkpoint store holding the integrals of the subcharts of one 
+# chart, keyed by the id of the subchart.
+class _SubchartCheckpoint():
+
+    def __init__(self, store, prefix):
+        self.store = store
+        self.prefix = prefix
+
+
+    def _path(self, sub_id):
+        return self.prefix + "-%s.sobj" % (sub_id)
+
+
+    # Returns a list containing the integral of the subchart, or None.
+    def load(self, sub_id):
+        return self.store._read(self._path(sub_id))
+
+
+    def save(self, sub_id, Z):
+        self.store._write(self._path(sub_id), Z)
+
+
+    # Deletes the integrals of the subcharts of the chart.
+    def clear(self):
+        direc, name = _os.path.split(self.prefix)
+        if _os.path.isdir(direc):
+            for f in _os.listdir(direc):
+                if f.startswith(name + "-"):
+                    _os.remove(_os.path.join(direc, f))
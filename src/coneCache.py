@@ -0,0 +1,105 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os as _os
+from globalVars import _DEFAULT_CONE_CACHE, _CONE_CACHE_DIR
+from sage.all import load as _load
+
+# Bump this whenever the canonical form of a cone or the way Zeta is called 
+# changes in a way that makes old entries unusable.
+_CONE_FORMAT = 1
+
+
+# Given the rows (b, a_1, ..., a_n) of the inequalities b + a.x >= 0 defining a
+# polyhedron in n dimensions, return a canonical form of the rows together with the 
+# permutation of the coordinates used: the jth column of the canonical form is 
+# column perm[j] of the original. Polyhedron removes the redundant rows and 
+# makes the rest primitive, equations become two inequalities, and then the 
+# columns and rows are sorted. Columns with the same entries are kept in the 
+# order given, so the same cone might still get more than one form.
+def _canonical_cone(cone_mat, n):
+    from sage.all import Polyhedron as _polyhedron
+    P = _polyhedron(ieqs=cone_mat, ambient_dim=n)
+    rows = [tuple(h.vector()) for h in P.inequalities()]
+    for h in P.equations():
+        v = tuple(h.vector())
+        rows += [v, tuple([-x for x in v])]
+    column = lambda j: sorted([r[j + 1] for r in rows])
+    perm = sorted(range(n), key=lambda j: (column(j), j))
+    canon = sorted([tuple([r[0]] + [r[j + 1] for j in perm]) for r in rows])
+    return tuple(canon), perm
+
+
+# A store for the generating functions Zeta gives for cones, keyed by their 
+# canonical form. Entries are kept in memory, and also on disk if a directory 
+# is given, so they can be used by every atlas.
+class ConeCache():
+
+    def __init__(self, direc=None):
+        if direc != None:
+            direc = _os.path.expanduser(direc)
+            if direc[-1] != "/":
+                direc += "/"
+        self.directory = direc
+        self.entries = {}
+
+
+    def __repr__(self):
+        if self.directory == None:
+            return "A cone cache with %s entries." % (len(self.entries))
+        return "A cone cache with %s entries in %s." % (len(self.entries), self.directory)
+
+
+    # Returns the key of the canonical form of a cone in n dimensions.
+    def key(self, canon, n):
+        from hashlib import sha1
+        data = [_CONE_FORMAT, n, [[str(x) for x in r] for r in canon]]
+        return sha1(str(data).encode()).hexdigest()
+
+
+    # Returns a list containing the generating function with the given key, or 
+    # None if it is not there.
+    def load(self, key):
+        if key in self.entries:
+            return [self.entries[key]]
+        if self.directory == None:
+            return None
+        path = self.directory + "Cone-%s.sobj" % (key)
+        if not _os.path.exists(path):
+            return None
+        try:
+            Z = _load(path)
+        except Exception:
+            # A broken entry is just missing.
+            return None
+        self.entries[key] = Z
+        return [Z]
+
+
+    def save(self, key, Z):
+        from chartCache import _make_directory, _save_atomic
+        self.entries[key] = Z
+        if self.directory == None:
+            return
+        _make_directory(self.directory)
+        _save_atomic(Z, self.directory + "Cone-%s.sobj" % (key))
+
+
+    # Removes every entry, including the ones on disk.
+    def clear(self):
+        self.entries = {}
+        if self.directory == None or not _os.path.isdir(self.directory):
+            return
+        for name in _os.listdir(self.directory):
+            if name.startswith("Cone-"):
+                _os.remove(self.directory + name)
+
+
+# The store used by SingularZeta.
+if _DEFAULT_CONE_CACHE:
+    _CONES = ConeCache(_CONE_CACHE_DIR)
+else:
+    _CONES = ConeCache()
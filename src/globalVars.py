@@ -10,8 +10,12 @@ from sage.rings.integer import Integer as _int
 
 # Variables for user settings. These can be changed without affecting the 
 # mathematics.
+_DEFAULT_CACHE = False          # Boolean
+_DEFAULT_CONE_CACHE = False     # Boolean
 _DEFAULT_INDENT = " "*4         # String
+_DEFAULT_LAZY_LOAD = False      # Boolean
 _DEFAULT_LOAD_DB = True         # Boolean
+_DEFAULT_NATIVE_SSI = False     # Boolean
 _DEFAULT_p = 'p'                # String
 _DEFAULT_t = 't'                # String
 _DEFAULT_USER_INPUT = True      # Boolean
@@ -25,6 +29,96 @@ _INT_LAT_LIB_V1 = "intersectionLattice.lib"
 _CHART_LIB = "load_Charts2.lib"
 _chart_num = lambda x: "Chart" + str(x) + ".ssi" 
 
+# The position of the objects we read from the list saved in a ChartN.ssi file 
+# when reading it without Singular (see parseSsi.py).
+_SSI_CHART_LAYOUT = {
+    "BO": 1, 
+    "cent": 2, 
+    "Cone": 3, 
+    "jacDet": 4, 
+    "lastMap": 5, 
+    "focus": 6, 
+    "ILattice": 7
+}
+
+# The directory, inside an atlas directory, where parsed charts are cached.
+_CHART_CACHE_DIR = ".SingularZetaCache/"
+
+# The directory, inside an atlas directory, where finished integrals are kept 
+# so that an interrupted run can pick up where it left off.
+_CHECKPOINT_DIR = ".SingularZetaCheckpoints/"
+
+# The directory where the generating functions of cones are kept when 
+# _DEFAULT_CONE_CACHE is True. It is shared by all atlases.
+_CONE_CACHE_DIR = "~/.SingularZetaCones/"
+
+# The number of times a worker restarts Singular and tries to load a chart 
+# again before giving up.
+_LOAD_RETRIES = 2
+
+# The number of Singular identifiers we let pile up before killing them.
+_KILL_BATCH = 32
+
+# A Singular procedure printing all the data of a (version 2) chart at once, so 
+# that loading a chart costs one round trip. Each field is printed after a line 
+# containing _PAYLOAD_SEP followed by the name of the field.
+_PAYLOAD_SEP = "@@SZ@@"
+_PAYLOAD_PROC = """proc szChartPayload(int lat)
+{
+    int i;
+    print("@@SZ@@ring");
+    basering;
+    print("@@SZ@@ambient");
+    print(BO[1]);
+    print("@@SZ@@birat");
+    print(BO[5]);
+    print("@@SZ@@cent");
+    print(cent);
+    print("@@SZ@@cone");
+    Cone;
+    for (i = 1; i <= size(BO[4]); i++)
+    {
+        print("@@SZ@@exDiv");
+        print(BO[4][i]);
+    }
+    if (defined(jacDet))
+    {
+        print("@@SZ@@jacDet");
+        jacDet;
+    }
+    if (defined(lastMap))
+    {
+        print("@@SZ@@lastMap");
+        print(lastMap);
+    }
+    print("@@SZ@@focus");
+    print(focus);
+    if (lat)
+    {
+        print("@@SZ@@lat1");
+        ILattice[1];
+        print("@@SZ@@lat2");
+        ILattice[2];
+        print("@@SZ@@lat3");
+        ILattice[3];
+        print("@@SZ@@lat4");
+        print(ILattice[4]);
+    }
+}"""
+
+
+# Enables us to turn off printing.
+from os import devnull as _DEVNULL
+import sys as _sys
+class _HiddenPrints:
+    def __enter__(self):
+        self._original_stdout = _sys.stdout
+        _sys.stdout = open(_DEVNULL, 'w')
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _sys.stdout.close()
+        _sys.stdout = self._original_stdout
+
 
 # Variables for type checking in Sage
 _is_int = lambda x: isinstance(x, int) or isinstance(x, _int)
@@ -5,15 +5,15 @@
 #
 
 from globalVars import _DEFAULT_INDENT as _indent
-from globalVars import _DEFAULT_p as _p
 from globalVars import _DEFAULT_USER_INPUT as _input
 from globalVars import _DEFAULT_VERBOSE as _verbose
 from sage.all import AffineSpace as _affine
 from sage.all import QQ as _QQ
 from sage.all import Set as _set
-from sage.all import var as _var
 from sage.all import PolynomialRing as _polyring
+from rationalFunctions import _rational_sum
 from rationalPoints import _rational_points, _get_smaller_poly_ring
+from ringFactory import _get_ring
 
 # Parses the list of vertices. Changes from {0, 1}-tuple to a set.
 def _parse_vertices(vert_list):
@@ -41,7 +41,7 @@ def _parse_divisors(div_list, varbs=None):
     if varbs == None:
         divs = [d.polynomial(_QQ) for d in div_list]
     else:
-        P = _polyring(_QQ, varbs)
+        P = _get_ring(_QQ, varbs)
         divs = [P(d) for d in div_list]
     return divs
 
@@ -87,7 +87,7 @@ def _get_defining_ideal(divs, v):
 
 def _inc_exc(n, verts, edges, counts):
     level = {n}
-    total = counts[n][0] + _var(_p)*0
+    terms = [counts[n][0]]
     next_level = _set()
     sign = -1
     while len(level) > 0:
@@ -99,19 +99,19 @@ def _inc_exc(n, verts, edges, counts):
             # Grab the neighbors whose numbers are strictly larger
             next_neigh = filter(lambda x: x > k, neighbors)
             next_level = next_level + _set(next_neigh)
-        # We add up the counts for the next neighbors
-        part_tot = reduce(lambda x, y: x + y, [counts[i][0] for i in next_level], 0)
-        total += sign*part_tot
+        # We collect the counts for the next neighbors
+        terms += [sign*counts[i][0] for i in next_level]
         # We get ready to recurse.
         sign *= -1
         level = next_level
         next_level = _set([])
-    if total == 0:
-        return 0
-    return total.simplify().factor()
+    return _rational_sum(terms)
 
 
-class IntLattice():
+class IntLattice(object):
+
+    __slots__ = ("bad_primes", "chart", "components", "divisors", "edges", 
+        "p_points", "vertices", "_vertexToPoints")
 
     def __init__(self, comps, divs, edges, verts, ppts=None):
         self.bad_primes = None
@@ -132,6 +132,16 @@ class IntLattice():
         return "An intersection lattice with %s vertices and %s edges." % (Nverts, Nedges)
 
 
+    # Without a __dict__, pickling needs to be told what the state is.
+    def __getstate__(self):
+        return {k : getattr(self, k) for k in self.__slots__ if hasattr(self, k)}
+
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+
     # Determine the p-rational points of the varieties associated to the 
     # intersection lattice. 
     def pRationalPoints(self, user_input=_input, recompute=False, verbose=_verbose):
@@ -8,9 +8,13 @@ from globalVars import _is_int
 from globalVars import _DEFAULT_p as _p
 from globalVars import _DEFAULT_t as _t
 from globalVars import _DEFAULT_INDENT as _indent
+from parseEdges import _id_label
 from parseSingularExpr import _term_to_factors, _str_to_vars
+from polynomialBackend import _backend_ring, _to_backend, _variable_names
+from polynomialBackend import _is_term
 from sage.all import factor as _factor
-from sage.all import var as _var
+import numpy as _np
+from symbolTable import _symbol
 
 # A function to printout the integral needed to solve, given a chart.
 def _integral_printout(chart, integrand=None):
@@ -41,6 +45,39 @@ def _remove_negative(list_of_terms):
     return new_terms
     
 
+# Given the images of the factors of an integrand, their exponent vectors, and 
+# the Jacobian, return the variables of the pulled back integrand and the 
+# matrix of their exponent vectors, provided the images and the Jacobian are 
+# monomials with coefficient 1 or -1. Their exponents form an integer matrix M,
+# and the exponent vectors of the pulled back integrand are the rows of M^t*A, 
+# where A has the given vectors as rows. Otherwise, return None.
+def _monomial_pullback(images, vectors, jacDet):
+    monos = list(images) + [jacDet]
+    names = set()
+    for f in monos:
+        names |= _variable_names(f)
+    P = _backend_ring(sorted(names))
+    rows = []
+    for f in monos:
+        g = _to_backend(f, P)
+        if g == None or g == 0 or not _is_term(g) or not g.lc() in {1, -1}:
+            return None
+        rows.append([int(e) for e in g.exponents()[0]])
+    M = _np.array(rows, dtype=_np.int64)
+    A = _np.array([[int(v[0]), int(v[1])] for v in vectors] + [[1, 0]], 
+        dtype=_np.int64)
+    E = M.T.dot(A)
+    keep = [k for k in range(E.shape[0]) if E[k].any()]
+    gens = P.gens()
+    return [_symbol(str(gens[k])) for k in keep], E[keep]
+
+
+# Given terms and the matrix whose rows are their exponent vectors, return the 
+# list of factors [f, (a, b)] of an integrand.
+def _exponent_factors(terms, E):
+    return [[terms[k], (int(E[k][0]), int(E[k][1]))] for k in range(len(terms))]
+
+
 # Given a list of (old) variables, a birational map, an (old) integrand, and a 
 # jacobian, return the updated integrand with the birational map and jacobian.
 def _get_integrand(varbs, biratMap, integrand, jacDet, integralFactor):
@@ -48,6 +85,20 @@ def _get_integrand(varbs, biratMap, integrand, jacDet, integralFactor):
     birat_map = _get_birat_map(varbs, biratMap)
     init_integrand = integrand
     map_it = lambda x: [birat_map(x[0]), x[1]]
+    factor = integrand.factor + [[integralFactor, [1, 0]]]
+
+    # For monomial maps, pulling back is just integer linear algebra on the 
+    # exponents. 
+    try:
+        images = [birat_map(x[0]) for x in init_integrand]
+    except KeyError:
+        images = None
+    if images != None:
+        pulled = _monomial_pullback(images, [x[1] for x in init_integrand], 
+            jacDet)
+        if pulled != None:
+            return Integrand(_exponent_factors(*pulled), factor=factor, 
+                clean=False)
 
     # Map the initial integrand to the current with the birational map
     int_mapped = map(map_it, init_integrand) 
@@ -58,21 +109,79 @@ def _get_integrand(varbs, biratMap, integrand, jacDet, integralFactor):
     else:
         int_jac = []
 
-    factor = integrand.factor + [[integralFactor, [1, 0]]]
-
     return Integrand(int_mapped + int_jac, factor=factor)
 
 
+# Given the factors [f, (a, b)] of an integrand and a function giving the 
+# image of each (non-constant) f, return the factors of the pulled back 
+# integrand. If every image is a monomial, the exponent vectors come from the 
+# exponent matrix as in _monomial_pullback; otherwise the images are factored 
+# and grouped in the symbolic ring.
+def _map_factors(factors, image):
+    consts = [[f, vec] for f, vec in factors if _is_int(f)]
+    others = [[f, vec] for f, vec in factors if not _is_int(f)]
+    images = [image(f) for f, _ in others]
+    pulled = _monomial_pullback(images, [vec for _, vec in others], 1)
+    if pulled != None:
+        return _clean_integrand(consts) + _exponent_factors(*pulled)
+    mapped = [[images[k], others[k][1]] for k in range(len(others))]
+    return _clean_integrand(consts + mapped)
+
+
+# Given the factors [f, (a, b)] of an integrand in the variables varbs and the 
+# images of varbs under a map, return the factors of the integrand pulled back 
+# through the map, factored and simplified.
+def _pull_back(factors, varbs, images):
+    if images == None or len(images) != len(varbs):
+        raise ValueError("Expected an image for each of the %s variables." % (len(varbs)))
+    subst = {varbs[k] : images[k] for k in range(len(varbs))}
+    return _map_factors(factors, lambda f: f.subs(subst))
+
+
+# Given an atlas and a chart, return the factors of the root integrand pulled 
+# back to the chart, without the Jacobian. A subchart gets them from its parent 
+# chart by the same simplification that built it. If the atlas is incremental, 
+# a chart gets them from its parent in the blow-up tree by its last map. 
+# Otherwise, they are pulled back through the birational map from the root. 
+# The factors are remembered by the chart.
+def _mapped_factors(atlas, chart):
+    if chart._mapped != None:
+        return chart._mapped
+    label = _id_label(chart._id) if atlas.incremental else None
+    if chart._step != None:
+        from chartClass import _classifier, _simplify_expr
+        units, non_units, repl = chart._step
+        classifier = _classifier(units, non_units)
+        simplify = lambda f: _simplify_expr(f, units, non_units, repl, 
+            classifier=classifier)
+        mapped = _map_factors(_mapped_factors(atlas, chart._parent), simplify)
+    elif label != None and label in atlas.tree:
+        mapped = atlas._node_factors(label, chart=chart)
+    else:
+        mapped = _pull_back(atlas.integrand.list, atlas.root.variables, 
+            chart.birationalMap)
+    chart._mapped = mapped
+    return mapped
+
+
 # Given an atlas and a chart, modify the integrand for the chart according to 
 # the data. This is a wrapper, using the atlas and chart classes, for 
-# _get_integrand
+# _get_integrand. Subcharts, and the charts of an incremental atlas, start from
+# the factors of the chart above them instead of the root.
 def MapIntegrand(atlas, chart):
     if chart.atlas == None:
         raise ValueError("Expected the chart to come from an atlas.")
     if atlas.directory != chart.atlas.directory:
         raise ValueError("Expected the chart to be contained in the given atlas.")
-    return _get_integrand(atlas.root.variables, chart.birationalMap, 
-        atlas.integrand, chart.jacDet, chart._integralFactor)
+    if chart._step == None and not atlas.incremental:
+        return _get_integrand(atlas.root.variables, chart.birationalMap, 
+            atlas.integrand, chart.jacDet, chart._integralFactor)
+    factor = atlas.integrand.factor + [[chart._integralFactor, [1, 0]]]
+    if str(chart.jacDet) != "1":
+        int_jac = [[chart.jacDet, (1, 0)]]
+    else:
+        int_jac = []
+    return Integrand(_mapped_factors(atlas, chart) + int_jac, factor=factor)
 
 
 # Given a list of factors corresponding to the integrand, return a list of the 
@@ -92,24 +201,19 @@ def _clean_integrand(integrand):
                 scl_vec = [f[1]*u for u in vec]
                 cleaned_int.append([f[0], scl_vec])
 
-    # Now we group together like variables. 
-    simplif_int = cleaned_int
-    index = 0
-    while index < len(simplif_int):
-        X = str(simplif_int[index][0])
-        index2 = index + 1
-        # Search for other variables equal to X
-        while index2 < len(simplif_int):
-            Y = str(simplif_int[index2][0])
-            # If we find one, add up their exponent vectors
-            if X == Y:
-                a, b = simplif_int[index][1]
-                c, d = simplif_int[index2][1]
-                simplif_int[index][1] = (a + c, b + d)
-                del simplif_int[index2]
-            else: 
-                index2 += 1
-        index += 1
+    # Now we group together like variables, adding up their exponent vectors.
+    # They are kept in the order they first show up.
+    simplif_int = []
+    position = {}
+    for fact in cleaned_int:
+        X = str(fact[0])
+        if X in position:
+            a, b = simplif_int[position[X]][1]
+            c, d = fact[1]
+            simplif_int[position[X]][1] = (a + c, b + d)
+        else:
+            position[X] = len(simplif_int)
+            simplif_int.append([fact[0], fact[1]])
 
     return simplif_int
         
@@ -124,7 +228,7 @@ def _remove_p_powers(int_list):
     if len(p_part) != 0:
         p_part = [[p_part[0][0], [-a for a in p_part[0][1]]]]
     else:
-        p_part = [[_var(_p), [0, 0]]]
+        p_part = [[_symbol(_p), [0, 0]]]
     return p_part, list(filter(not_p, int_list))
     
 
@@ -133,17 +237,26 @@ def _remove_p_powers(int_list):
 # There is one major attribute: 'list'.
 # This should be given as a list of lists of the form [f(X), (a, b)], where f(X)
 # is a polynomial in the variables X and (a, b) is a tuple of integers. This 
-# will correspond to the factor |f(X)|^{b*s + a} in the integral.
+# will correspond to the factor |f(X)|^{b*s + a} in the integral. If clean is 
+# False, the factors in data_list are taken to be distinct and irreducible 
+# already. The exponent vectors are also kept as the rows of the integer 
+# matrix 'exponents', in the order of 'list', so monomial maps can pull the 
+# integrand back with integer linear algebra.
 class Integrand():
 
-    def __init__(self, data_list, factor=[]):
+    def __init__(self, data_list, factor=[], clean=True):
         # First we make sure to clean the data up
-        data = _clean_integrand(data_list)
+        if clean:
+            data = _clean_integrand(data_list)
+        else:
+            data = [[x[0], x[1]] for x in data_list]
         # Now we split off the p-powers
         p_powers, cleaned_list = _remove_p_powers(data)
         
         self.list = cleaned_list
         self.terms = [T[0] for T in self.list]
+        self.exponents = _np.array([[int(a) for a in T[1]] for T in self.list],
+            dtype=_np.int64).reshape(len(self.list), 2)
         self.factor = _clean_integrand(factor + p_powers)
 
         # 'Hidden' attribute
@@ -155,11 +268,11 @@ class Integrand():
         int_sign = lambda x, y: '%s   _\n%s  | `\n%s ._|  ' % (' '*x, ' '*x, y)
         # Mapping functions
         def fact_to_str(fact):
-            s = _var('s')
+            s = _symbol('s')
             out = "|%s|^(%s)*" % (fact[0], fact[1][1]*s + fact[1][0])
             return out
         def out_to_str(fact):
-            s = _var('s')
+            s = _symbol('s')
             expr = str(fact[0])
             if '-' in expr or '+' in expr or '*' in expr or '/' in expr:
                 out = "(%s)^(%s)*" % (fact[0], fact[1][1]*s + fact[1][0])
@@ -185,16 +298,18 @@ class Integrand():
     def pFactor(self):
         # Given a list x = [expr, (a, b)], return (expr)^a*(expr)^(bs).
         # We call the first factor the "real" factor and the second factor the 
-        # "complex" factor. No, it's not particularly accurate.
-        def convert_to_expr(x): 
-            real_factor = x[0]**(x[1][0])
-            if x[1][1] != 0:
-                if x[0] != _var(_p):
-                    raise AssertionError("Integrand is not as expected. Contains a factor of the form %s." % (x[0]**(x[1][1]*_var('s'))))
-                else:
-                    complex_factor = _var(_t)**(-x[1][1])
-            else:
-                complex_factor = 1
-            return real_factor * complex_factor
+        # "complex" factor. No, it's not particularly accurate. The powers of 
+        # p are added up first, so p and t are only raised to a power once.
+        p = _symbol(_p)
+        p_exp = [0, 0]
+        others = []
+        for x in self.factor:
+            if str(x[0]) == _p:
+                p_exp[0] += x[1][0]
+                p_exp[1] += x[1][1]
+            elif x[1][1] != 0:
+                raise AssertionError("Integrand is not as expected. Contains a factor of the form %s." % (x[0]**(x[1][1]*_symbol('s'))))
+            elif x[1][0] != 0:
+                others.append(x[0]**(x[1][0]))
         mult = lambda x, y: x*y
-        return reduce(mult, map(convert_to_expr, self.factor), 1)
\ No newline at end of file
+        return reduce(mult, others, p**p_exp[0] * _symbol(_t)**(-p_exp[1]))
\ No newline at end of file
@@ -1,39 +1,100 @@
 #
-#   Copyright 2019--2020 Joshua Maglione 
+#   Copyright 2019--2020 Joshua Maglione
 #
 #   Distributed under MIT License
 #
 
-from sage.all import singular as _SING
-from sage.all import randint as _RAND
 from sage.all import factor as _factor
+from sage.all import PolynomialRing as _polyring
+from sage.all import QQ as _QQ
 from globalVars import _is_int, _CHART_LIB, _CHART_LIB_V1, _INT_LAT_LIB_V1,_chart_num
+from globalVars import _PAYLOAD_PROC, _PAYLOAD_SEP
 from globalVars import _DEFAULT_INDENT as _indent
+from globalVars import _DEFAULT_NATIVE_SSI as _native
 from globalVars import _DEFAULT_VERBOSE as _verbose
 from chartClass import Chart as _chart
-from parseSingularBasics import _parse_printout, _parse_list
+from parseSingularBasics import _parse_printout, _parse_list, _iter_lines
+from parseSingularExpr import _to_symbolic
 from intLatticeClass import _parse_lattice_data
-
-# Randomly generates an unused variable name in Singular.
-def _get_safe_var():
-    unsafe = True
-    while unsafe:
-        rand_chars = (chr(_RAND(97, 122)) for i in range(_RAND(4, 16)))
-        cat_chars = lambda x, y: x + y
-        r_var = reduce(cat_chars, rand_chars, "")
-        # We will get an error if the variable is *not* defined.
+from parseSsi import _read_chart_ssi
+from singularSession import _get_session
+from ringFactory import _get_ring
+
+# Given the output of the payload procedure, return a dictionary whose keys are
+# the field names and whose values are the lists of printouts for that field.
+# Only the exceptional divisors have more than one printout.
+def _split_payload(output):
+    fields = {}
+    name = None
+    for line in output.split("\n"):
+        if line.startswith(_PAYLOAD_SEP):
+            name = line[len(_PAYLOAD_SEP):].strip()
+            fields.setdefault(name, []).append([])
+        elif name != None:
+            fields[name][-1].append(line)
+    join = lambda L: "\n".join(L).strip("\n")
+    return {k : [join(L) for L in v] for k, v in fields.items()}
+
+
+# Get the printouts of the chart data one Singular call at a time. This is the
+# way charts are read from version 1 data, where there is no payload procedure.
+# The output has the same form as _split_payload.
+def _eval_chart_fields(r_var, get_lat=False, session=None):
+    if session == None:
+        session = _get_session()
+    def _try_eval(entry):
         try:
-            _ = _SING.eval(r_var + ";")
+            return [session.eval(entry)]
         except:
-            unsafe = False
-    return r_var
+            return []
+    fields = {
+        "ring": [session.eval(r_var + ";")],
+        "ambient": [session.eval("print(BO[1]);")],
+        "birat": [session.eval("print(BO[5]);")],
+        "cent": [session.eval("print(cent);")],
+        "cone": [session.eval("Cone;")],
+        "jacDet": _try_eval("jacDet;"),
+        "lastMap": _try_eval("print(lastMap);"),
+        "focus": [session.eval("print(focus);")]
+    }
+    num_exc_divs = int(session.eval("size(BO[4]);"))
+    fields["exDiv"] = [session.eval("print(BO[4][%s]);" % (i+1)) for i in range(num_exc_divs)]
+    if get_lat:
+        fields["lat1"] = [session.eval('ILattice[1];')]
+        fields["lat2"] = [session.eval('ILattice[2];')]
+        fields["lat3"] = [session.eval('ILattice[3];')]
+        fields["lat4"] = [session.eval('print(ILattice[4]);')]
+    return fields
+
+
+# Given the printouts of the four entries of ILattice, return the intersection
+# lattice.
+def _parse_inter_lattice(sing_vert, sing_comp, sing_edge, sing_divs, focus=None, varbs=None):
+    # The printouts can be huge, so they are read one line at a time.
+    lat_vert = _parse_list(_iter_lines(sing_vert), var_expr=False)
+    lat_comp = _parse_list(_iter_lines(sing_comp), var_expr=False)
+    lat_edge = _parse_list(_iter_lines(sing_edge), var_expr=False)
+    sing_lat_divs_str = sing_divs.replace(",", "").replace("_[1]=", "").split("\n")
+    if not "empty list" in sing_lat_divs_str:
+        # The divisors become polynomials anyway, so we parse them directly.
+        P = _get_ring(_QQ, varbs) if varbs != None else None
+        lat_divs = _parse_list(sing_lat_divs_str, ring=P)
+
+        # Put all the data together
+        lattice = _parse_lattice_data(lat_comp, lat_divs, lat_edge, lat_vert, focus=focus, variables=varbs)
+    else:
+        lattice = _parse_lattice_data([], [], [], [[]], focus=focus)
+    return lattice
 
 
-def _get_inter_lattice(data=None, verbose=_verbose, varbs=None, ver=2):
+def _get_inter_lattice(data=None, verbose=_verbose, varbs=None, ver=2, 
+    session=None):
+    if session == None:
+        session = _get_session()
     if ver <= 1:
         num, direc, focus = data
         # Get the info read for the intersection lattice
-        r_var2 = _get_safe_var()
+        r_var2 = session.new_name()
         str_load_lat = 'def %s = createInterLattice(%s, "%s");' % (r_var2, num, direc)
         str_set_lat = 'setring %s;' % (r_var2)
 
@@ -43,75 +104,134 @@ def _get_inter_lattice(data=None, verbose=_verbose, varbs=None, ver=2):
             print("Running the following Singular code:")
             print("> " + str_load_lat)
             print("> " + str_set_lat)
-        
+
         # Get all the data from the int lattice individually
-        _ = _SING.eval(str_load_lat)
-        _ = _SING.eval(str_set_lat)
-        sing_lat_vert_str = _SING.eval('retlist[1];').split("\n")
+        _ = session.eval(str_load_lat)
+        _ = session.eval(str_set_lat)
+        sing_lat_vert_str = _iter_lines(session.eval('retlist[1];'))
         lat_vert = _parse_list(sing_lat_vert_str, var_expr=False)
-        sing_lat_comp_str = _SING.eval('retlist[2];').split("\n")
+        sing_lat_comp_str = _iter_lines(session.eval('retlist[2];'))
         lat_comp = _parse_list(sing_lat_comp_str, var_expr=False)
-        sing_lat_edge_str = _SING.eval('retlist[3];').split("\n")
+        sing_lat_edge_str = _iter_lines(session.eval('retlist[3];'))
         lat_edge = _parse_list(sing_lat_edge_str, var_expr=False)
-        sing_lat_divs_str = _SING.eval('print(retlist[4]);').replace(",", "").replace("_[1]=", "").split("\n")
-        lat_divs = _parse_list(sing_lat_divs_str)
+        sing_lat_divs_str = session.eval('print(retlist[4]);').replace(",", "").replace("_[1]=", "").split("\n")
+        P = _get_ring(_QQ, varbs) if varbs != None else None
+        lat_divs = _parse_list(sing_lat_divs_str, ring=P)
 
         # Put all the data together
         lattice = _parse_lattice_data(lat_comp, lat_divs, lat_edge, lat_vert, focus=focus, variables=varbs, ver=1)
-        
+
         if verbose >= 2:
             print(lattice)
-        
-        _ = _SING.eval("kill %s;" % (r_var2))
-    else:
-        sing_lat_vert_str = _SING.eval('ILattice[1];').split("\n")
-        lat_vert = _parse_list(sing_lat_vert_str, var_expr=False)
-        sing_lat_comp_str = _SING.eval('ILattice[2];').split("\n")
-        lat_comp = _parse_list(sing_lat_comp_str, var_expr=False)
-        sing_lat_edge_str = _SING.eval('ILattice[3];').split("\n")
-        lat_edge = _parse_list(sing_lat_edge_str, var_expr=False)
-        sing_lat_divs_str = _SING.eval('print(ILattice[4]);').replace(",", "").replace("_[1]=", "").split("\n")
-        if not "empty list" in sing_lat_divs_str:
-            lat_divs = _parse_list(sing_lat_divs_str)
 
-            # Put all the data together
-            lattice = _parse_lattice_data(lat_comp, lat_divs, lat_edge, lat_vert, focus=data[2], variables=varbs)
-        else:
-            lattice = _parse_lattice_data([], [], [], [[]], focus=data[2])
+        session.release(r_var2)
+    else:
+        lattice = _parse_inter_lattice(session.eval('ILattice[1];'),
+            session.eval('ILattice[2];'),
+            session.eval('ILattice[3];'),
+            session.eval('print(ILattice[4]);'),
+            focus=data[2], varbs=varbs)
 
     return lattice
 
 
-def LoadChart(num, direc, 
-    atlas=None, 
-    verbose=_verbose, 
-    get_lat=True, 
-    version=2):
+# Given the dictionary of printouts from either _split_payload or
+# _eval_chart_fields, return a dictionary with the parsed chart data.
+def _parse_chart_fields(fields, verbose=_verbose):
+    lines = lambda x: x.replace(",", "").split("\n")
+    data = {}
 
-    # We check that the input is the correct type.
-    if not (_is_int(num) or isinstance(num, list)):
-        raise TypeError("First argument must be a list or an integer.")
-    if not isinstance(direc, str): 
-        raise TypeError("Second argument must be a string.")
+    # Get the basics: coeff ring and vars.
+    coeff, varbs = _parse_printout(fields["ring"][0])
+    data["coefficients"] = coeff
+    data["variables"] = varbs
 
-    # We need to grab the parent directory.
-    # If a value error is raised, then we are in the parent dir. 
-    if direc[-1] == "/":
-        direc = direc[:-1]
-    try:
-        index = direc.rindex('/')
-        pdir = direc[:index+1]
-    except ValueError:
-        pdir = './'
+    # Expressions are parsed straight into a polynomial ring and only become 
+    # symbolic expressions at the end.
+    P = _get_ring(_QQ, varbs)
+    parse = lambda x, factor=False: _to_symbolic(_parse_list(x, ring=P), factor=factor)
 
-    # Convert the number into a string.
-    if _is_int(num):
-        num = str(num)
+    # A wrapper for our _parse_list function
+    _parse_list_wrapped = lambda x: tuple([parse(y) for y in x])
+
+    # Get the factor of the ambient space.
+    sing_amb_fact = lines(fields["ambient"][0])
+    if sing_amb_fact[0] != "0":
+        # Print info about the ambient space
+        if verbose >= 2:
+            print("Ambient space not necessarily affine.")
+        data["factor"] = _parse_list_wrapped(sing_amb_fact)
     else:
-        num = str(num[0]) + "." + str(num[1])
+        data["factor"] = tuple([0])
+
+    # Get the birational map data
+    birat = lines(fields["birat"][0])
+    data["biratMap"] = tuple([parse(im, factor=True) for im in birat])
+
+    # Get the center of the blow-up
+    data["cent"] = _parse_list_wrapped(lines(fields["cent"][0]))
+
+    # Get the cone data
+    cone = _parse_list(_iter_lines(fields["cone"][0]), ring=P) # Do not want the wrapped version
+    # Here, we clean up the cone data a little bit.
+    # We make sure that the first term is positive and everything is factored
+    # as much as possible.
+    def pos(x):
+        y = str(x)
+        if y[0] == "-":
+            return -x
+        else:
+            return x
+    factor_pair = lambda x: tuple([pos(_to_symbolic(y, factor=True)) for y in x])
+    data["cone"] = map(factor_pair, cone)
+
+    # Get the exceptional divisors
+    exDivs = [_parse_list_wrapped(lines(div)) for div in fields.get("exDiv", [])]
+    data["exDivs"] = tuple(exDivs)
+
+    # Get the Jacobian determinant
+    try:
+        sing_jacobian_str = fields["jacDet"][0]
+        jacDet = parse(sing_jacobian_str, factor=True) # Not wrapped version
+        if str(jacDet)[0] == '-': # Remove the negative if it's there
+            jacDet = -jacDet
+    except:
+        jacDet = 1
+    data["jacDet"] = jacDet
+
+    # Get the last map
+    try:
+        data["lastMap"] = _parse_list_wrapped(lines(fields["lastMap"][0]))
+    except:
+        data["lastMap"] = None
+
+    # Get the focus
+    data["focus"] = _parse_list_wrapped(lines(fields["focus"][0]))
+
+    return data
+
+
+# Given the printouts of a version 2 chart, return its parsed data and its 
+# intersection lattice, which is None unless get_lat is True.
+def _parse_chart_payload(fields, get_lat=True, verbose=_verbose):
+    data = _parse_chart_fields(fields, verbose=verbose)
+    lattice = None
+    if get_lat:
+        lattice = _parse_inter_lattice(fields["lat1"][0], fields["lat2"][0],
+            fields["lat3"][0], fields["lat4"][0], focus=data["focus"],
+            varbs=data["variables"])
+    return data, lattice
+
+
+# Load the chart num in direc (with parent directory pdir) into Singular and
+# return the printouts of its data in the same form as _split_payload.
+def _singular_chart_fields(num, direc, pdir, get_lat=True, verbose=_verbose,
+    version=2, session=None):
+    if session == None:
+        session = _get_session()
 
     # We need to find a safe variable name for our Singular run.
-    r_var = _get_safe_var()
+    r_var = session.new_name()
 
     # Singular code to run.
     str_load_lib1 = 'LIB "' + pdir + 'LIB/primdec.lib";'
@@ -123,14 +243,15 @@ def LoadChart(num, direc,
     else:
         str_load_lib2 = 'LIB "' + pdir + _CHART_LIB + '";'
         load_strs = [str_load_lib1, str_load_lib2]
-        iv_var = _get_safe_var()
+        iv_var = session.new_name()
         if "." in num:
             str_input = 'intvec %s=%s;' % (iv_var, num.replace(".", ","))
-        else: 
+        else:
             str_input = 'int %s=%s;' % (iv_var, num)
         str_load_char = 'def %s = load_Chart2(%s, "%s");' % (r_var, iv_var, direc)
-    
+
     str_set_ring = 'setring %s;' % (r_var)
+    str_payload = 'szChartPayload(%s);' % (int(bool(get_lat)))
 
     # Print statements for the user.
     if verbose >= 2:
@@ -143,101 +264,104 @@ def LoadChart(num, direc,
         if version >= 2:
             print("> " + str_input)
         print("> " + str_load_char)
-        print("> " + str_set_ring + "\n")
-
-    # A wrapper for our _parse_list function
-    _parse_list_wrapped = lambda x: tuple([_parse_list(y) for y in x])
-
-    def _exDivs_wrap(size):
-        divs = []
-        for i in range(size):
-            entry = "print(BO[4][%s]);" % (i+1)
-            data = _SING.eval(entry).replace(",", "").split("\n")
-            divs += [_parse_list_wrapped(data)]
-        return tuple(divs)
-
-    # In Sage, the Singular run is continuous, so we can make multiple calls to 
-    # the same variables for example. 
-    # Currently, no error checking here. 
-    _ = _SING.lib(pdir + 'LIB/primdec.lib')
+        print("> " + str_set_ring)
+        if version >= 2:
+            print("> " + str_payload)
+        print("")
+
+    # In Sage, the Singular run is continuous, so we can make multiple calls to
+    # the same variables for example. The session makes sure that libraries
+    # and helpers are only loaded once per Singular process.
+    # Currently, no error checking here.
+    session.lib(pdir + 'LIB/primdec.lib')
     if version <= 1:
-        _ = _SING.lib(pdir + _CHART_LIB_V1)
-        _ = _SING.lib(pdir + _INT_LAT_LIB_V1)
-    else:
-        _ = _SING.lib(pdir + _CHART_LIB)
-        _ = _SING.eval("ring r;") # Work around to a bug.
-        _ = _SING.eval(str_input)
-    _ = _SING.eval(str_load_char + "\n" + str_set_ring)
-
-    # Get the basics: coeff ring and vars.
-    sing_ring_printout = _SING.eval(r_var + ";")
-    coeff, varbs = _parse_printout(sing_ring_printout)
-
-    # Get the factor of the ambient space.
-    sing_amb_fact = _SING.eval("print(BO[1]);").replace(",", "").split("\n")
-    if sing_amb_fact[0] != "0":
-        # Print info about the ambient space 
-        if verbose >= 2:
-            print("Ambient space not necessarily affine.")
-        amb_fact = _parse_list_wrapped(sing_amb_fact)
+        session.lib(pdir + _CHART_LIB_V1)
+        session.lib(pdir + _INT_LAT_LIB_V1)
+        _ = session.eval(str_load_char + "\n" + str_set_ring)
+        fields = _eval_chart_fields(r_var, session=session)
     else:
-        amb_fact = tuple([0])
+        session.lib(pdir + _CHART_LIB)
+        session.ring("r", "ring r;", base=True) # Work around to a bug.
+        session.proc("szChartPayload", _PAYLOAD_PROC)
+        # Everything about the chart comes back in one round trip. The ring of
+        # the last chart may have been killed at the start of this round trip,
+        # and load_Chart2 needs a basering, so we switch to r first.
+        payload = session.eval("\n".join(["setring r;", str_input, 
+            str_load_char, str_set_ring, str_payload]))
+        fields = _split_payload(payload)
+        session.release(iv_var)
+
+    # Clean up the Singular run. The ring is killed with the next batch.
+    session.release(r_var)
+    return fields
+
+
+def LoadChart(num, direc,
+    atlas=None,
+    verbose=_verbose,
+    get_lat=True,
+    native=_native,
+    singular=None,
+    version=2):
 
+    # We check that the input is the correct type.
+    if not (_is_int(num) or isinstance(num, (list, tuple))):
+        raise TypeError("First argument must be a list, a tuple, or an integer.")
+    if not isinstance(direc, str):
+        raise TypeError("Second argument must be a string.")
 
-    # Get the birational map data
-    sing_birat_str = _SING.eval("print(BO[5]);").replace(",", "").split("\n")
-    birat = _parse_list_wrapped(sing_birat_str)
-    birat = tuple([im.factor() for im in birat])
+    # We need to grab the parent directory.
+    # If a value error is raised, then we are in the parent dir.
+    if direc[-1] == "/":
+        direc = direc[:-1]
+    try:
+        index = direc.rindex('/')
+        pdir = direc[:index+1]
+    except ValueError:
+        pdir = './'
 
-    # Get the center of the blow-up
-    sing_cent_str = _SING.eval("print(cent);").replace(",", "").split("\n")
-    cent = _parse_list_wrapped(sing_cent_str)
+    # Convert the number into a string.
+    if _is_int(num):
+        num = str(num)
+    else:
+        num = str(num[0]) + "." + str(num[1])
 
-    # Get the cone data
-    # cone_size = _SING.eval("size(Cone);")
-    sing_cone_printout = _SING.eval("Cone;").split("\n")
-    cone = _parse_list(sing_cone_printout) # Do not want the wrapped version
-    # Here, we clean up the cone data a little bit. 
-    # We make sure that the first term is positive and everything is factored 
-    # as much as possible. 
-    def pos(x):
-        y = str(x)
-        if y[0] == "-":
-            return -x
+    # We can read version 2 charts without Singular. If something in the file
+    # is not understood, either while decoding or while parsing the data, we 
+    # fall back on Singular.
+    parsed = None
+    if native and version >= 2:
+        try:
+            fields = _read_chart_ssi(num, direc, get_lat=get_lat)
+            parsed = _parse_chart_payload(fields, get_lat=get_lat, 
+                verbose=verbose)
+            if verbose >= 2:
+                print("Read %s without Singular." % (_chart_num(num)))
+        except (IOError, ValueError, IndexError, KeyError, AttributeError, 
+            TypeError) as err:
+            parsed = None
+            if verbose >= 2:
+                print("Could not read %s without Singular: %s" % (_chart_num(num), err))
+
+    # Unless another Singular interface is given, we use the one from Sage.
+    session = _get_session(singular)
+    if parsed == None:
+        fields = _singular_chart_fields(num, direc, pdir, get_lat=get_lat,
+            verbose=verbose, version=version, session=session)
+        if version >= 2:
+            parsed = _parse_chart_payload(fields, get_lat=get_lat, 
+                verbose=verbose)
         else:
-            return x
-    factor_pair = lambda x: tuple([pos(_factor(y)) for y in x])
-    cone_factored = map(factor_pair, cone)
-
-    # Get the exceptional divisors
-    num_exc_divs = int(_SING.eval("size(BO[4]);"))
-    exDivs = _exDivs_wrap(num_exc_divs)
+            parsed = (_parse_chart_fields(fields, verbose=verbose), None)
 
-    # Get the Jacobian determinant
-    try:
-        sing_jacobian_str = _SING.eval("jacDet;")
-        jacDet = _parse_list(sing_jacobian_str).factor() # Not wrapped version
-        if str(jacDet)[0] == '-': # Remove the negative if it's there
-            jacDet = -jacDet
-    except:
-        jacDet = 1 
-    
-    # Get the last map
-    try:
-        sing_lm_str = _SING.eval("print(lastMap);").replace(",", "").split("\n")
-        lastmap = _parse_list_wrapped(sing_lm_str)
-    except:
-        lastmap = None
-
-    # Get the focus
-    sing_foc_str = _SING.eval("print(focus);").replace(",", "").split("\n")
-    focus = _parse_list_wrapped(sing_foc_str)
+    data, lattice = parsed
+    varbs = data["variables"]
+    amb_fact = data["factor"]
 
-    # Get the intersection lattice
-    if get_lat and (version >= 2 or amb_fact[0] == 0):
-        lattice = _get_inter_lattice(data=(num, direc, focus), varbs=varbs, ver=version)
-    else: 
-        lattice = None
+    # Get the intersection lattice. Version 2 charts come with it.
+    if get_lat and version <= 1 and amb_fact[0] == 0:
+        lattice = _get_inter_lattice(data=(num, direc, data["focus"]), varbs=varbs, ver=version, session=session)
+    elif not get_lat or version <= 1:
         if verbose <= 1 and amb_fact[0] != 0:
             print("Cannot compute intersection lattice due to non-trivial ambient space.")
 
@@ -245,21 +369,25 @@ def LoadChart(num, direc,
     if version <= 1 and 'n4_' in direc and num == 66:
         lattice = None
 
-    # Clean up the Singular run
-    _ = _SING.eval("kill %s;" % (r_var))
-
     # Now we construct our ring to keep all of this data in one place.
-    C = _chart(coeff, varbs, \
+    C = _chart(data["coefficients"], varbs, \
         atlas=atlas,
-        biratMap=birat, 
-        cent=cent, 
-        cone=cone_factored,
-        exDivs=exDivs,
+        biratMap=data["biratMap"],
+        cent=data["cent"],
+        cone=data["cone"],
+        exDivs=data["exDivs"],
         factor=amb_fact,
-        focus=focus,
+        focus=data["focus"],
         identity=num,
         intLat=lattice,
-        jacDet=jacDet,
-        lastMap=lastmap)
+        jacDet=data["jacDet"],
+        lastMap=data["lastMap"])
+
+    return C
+
 
-    return C
\ No newline at end of file
+# Returns the counters of the Singular session used to load charts: how many
+# evaluations were made and how many library loads, procedure definitions, and
+# helper rings were set up or skipped because they were already there.
+def SingularSessionCounts():
+    return _get_session().Counts()
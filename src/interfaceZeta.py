@@ -8,73 +8,92 @@ from globalVars import _DEFAULT_INDENT as _indent
 from globalVars import _DEFAULT_p as _p
 from globalVars import _DEFAULT_t as _t
 from globalVars import _DEFAULT_VERBOSE as _verbose
+from globalVars import _HiddenPrints
 from sage.all import Matrix as _matrix
-from sage.all import var as _var
+from symbolTable import _symbol
 from sage.all import Permutations as _perms
 from sage.all import Polyhedron as _polyhedron
 from sage.all import PolynomialRing as _polyring
 from sage.all import QQ as _QQ
-from Zeta.smurf import SMURF as _Zeta_smurf
+from coneCache import _canonical_cone, _CONES
+from polynomialBackend import _backend_pairs, _degree
+from rationalFunctions import _rational_substitution
 
 # There is a problem with nonpositive vectors in the Polyhedron code, so we 
 # clean up our cone data.
 def _clean_cone_data(varbs, cone):
+    clean_varbs, keep, trivial = _clean_cone_indices(varbs, cone)
+    return clean_varbs, [cone[k] for k in keep], trivial
+
+
+# Does the clean up of _clean_cone_data, but returns the indices of the pairs 
+# of the cone data that are kept, so other data on the pairs can follow along.
+def _clean_cone_indices(varbs, cone):
     clean_varbs = list(varbs)
-    clean_cone = cone
+    keep = list(range(len(cone)))
     i = 0
     j = 0
-    p = _var(_p)
+    p = _symbol(_p)
 
     # First we check the left hand side
-    while i < len(clean_cone):
-        if clean_cone[i][0] == 1:
-            clean_cone = clean_cone[:i] + clean_cone[i + 1:]
+    while i < len(keep):
+        if cone[keep[i]][0] == 1:
+            keep = keep[:i] + keep[i + 1:]
         else: 
             i += 1
     
     # Now we handle the right hand side
-    while j < len(clean_cone):
-        if clean_cone[j][1] == 1:
-            f = clean_cone[j][0]
+    while j < len(keep):
+        if cone[keep[j]][1] == 1:
+            f = cone[keep[j]][0]
             if p in f.variables():
                 return [], [], True
             for x in f.variables():
                 if x in clean_varbs:
                     clean_varbs.remove(x)
-            clean_cone = clean_cone[:j] + clean_cone[j + 1:]
+            keep = keep[:j] + keep[j + 1:]
         else:
             j += 1
     
-    return clean_varbs, clean_cone, False
+    return clean_varbs, keep, False
 
 
-# Given cone data and variables, return the corresponding matrix
-def _cone_mat(varbs, cone):
+# Given cone data and variables, return the corresponding matrix. The pairs of 
+# the cone data in QQ[p, vars] can be given in backend, which saves converting 
+# them.
+def _cone_mat(varbs, cone, backend=None):
     a = len(varbs)
     b = len(cone)
-    p = _var(_p)
+    p = _symbol(_p)
     cone_conditions = [[0 for i in range(a + 1)] for j in range(a + b)]
 
     # Get the rows corresponding to nonnegative integers
     for i in range(len(varbs)):
         cone_conditions[i][i + 1] = 1
 
-    # For some reason f.degree(x) returns a symbolic expression... UGHHH
-    def my_deg(f, x): 
+    # The degrees are read off the exponents in QQ[p, vars], where p is the 
+    # 0th variable. For some reason f.degree(x) returns a symbolic 
+    # expression... UGHHH, so that is only the fallback.
+    if backend == None:
+        backend = _backend_pairs(varbs, cone)
+    def my_deg(f, g, x): 
+        if g != None:
+            names = g.parent().variable_names()
+            return _QQ(_degree(g, names.index(str(x))))
         return _QQ.coerce(int(str(f.degree(x))))
 
     # Get the rows from the actual cone data
     for i in range(b):
-        lhs = cone[i][0]
-        rhs = cone[i][1]
+        lhs, rhs = cone[i]
+        g_lhs, g_rhs = backend[i]
         if lhs != 1:
-            cone_conditions[a + i][0] -= my_deg(lhs, p)
+            cone_conditions[a + i][0] -= my_deg(lhs, g_lhs, p)
             for j in range(len(varbs)):
-                cone_conditions[a + i][j + 1] -= my_deg(lhs, varbs[j])
+                cone_conditions[a + i][j + 1] -= my_deg(lhs, g_lhs, varbs[j])
             if rhs != 1:
-                cone_conditions[a + i][0] += my_deg(rhs, p)
+                cone_conditions[a + i][0] += my_deg(rhs, g_rhs, p)
                 for j in range(len(varbs)):
-                    cone_conditions[a + i][j + 1] += my_deg(rhs, varbs[j])
+                    cone_conditions[a + i][j + 1] += my_deg(rhs, g_rhs, varbs[j])
 
     to_tup = lambda x: tuple(x)
     return list(map(to_tup, cone_conditions))
@@ -127,11 +146,41 @@ def _get_sub(Z, subs):
     return (funcs[k].simplify().factor()).subs(remaining).simplify().factor()
 
 
+# Given the matrix of inequalities of a cone in n dimensions, return the 
+# generating function Zeta gives for it, in the variables Z0, ..., Z(n-1) (or 
+# Z if n = 1). The generating function only depends on the cone, so Zeta is 
+# run once for every canonical form of a cone, and the result is permuted back 
+# to the coordinates given.
+def _cone_gen_func(cone_mat, n, verbose=_verbose):
+    canon, perm = _canonical_cone(cone_mat, n)
+    key = _CONES.key(canon, n)
+    saved = _CONES.load(key)
+    if saved != None:
+        if verbose >= 2:
+            print("Found the generating function of the cone in the cache.")
+        Z = saved[0]
+    else:
+        # Run Zeta, which we only import once it is needed.
+        with _HiddenPrints():
+            from Zeta.smurf import SMURF as _Zeta_smurf
+        R = _polyring(_QQ, 'Z', n)
+        S = _Zeta_smurf.from_polyhedron(_polyhedron(ieqs=list(canon), 
+            ambient_dim=n), R)
+        Z = S.evaluate()
+        _CONES.save(key, Z)
+    if n > 1 and perm != list(range(n)):
+        names = lambda k: _symbol('Z' + str(k))
+        Z = Z.subs({names(k) : names(perm[k]) for k in range(n)})
+    return Z
+
+
 # Given a monomial chart and its integrand, return its generating function. The 
-# output is from Zeta.
+# output is from Zeta. When it is a rational function in p and t, it is given 
+# as an element of Frac(QQ[p, t]).
 def _mono_chart_to_gen_func(C, I, verbose=_verbose):
     # Clean up the variables and cone data
-    c_varbs, c_cone, trivial = _clean_cone_data(C.variables, C.cone)
+    c_varbs, keep, trivial = _clean_cone_indices(C.variables, C.cone)
+    c_cone = [C.cone[k] for k in keep]
 
     if trivial:
         if verbose >= 1:
@@ -147,21 +196,19 @@ def _mono_chart_to_gen_func(C, I, verbose=_verbose):
         print("%sCone data: %s\n" % (_indent, c_cone))
 
     # Get the matrix of inequalities so Polyhedron can read it
-    cone_mat = _cone_mat(c_varbs, c_cone)
-    P = _polyhedron(ieqs=cone_mat)
+    ring_cone = C._ring_cone()
+    cone_mat = _cone_mat(c_varbs, c_cone, [ring_cone[k] for k in keep])
     n = len(c_varbs)
-    R = _polyring(_QQ, 'Z', n)
 
     if verbose >= 2:
         print("Running Zeta via the polyhedron:")
         print("%s" % (_matrix(cone_mat)))
 
-    # Run Zeta
-    S = _Zeta_smurf.from_polyhedron(P, R)
+    gen_func = _cone_gen_func(cone_mat, n, verbose=verbose)
 
     # Clean up the output
-    p = _var(_p)
-    t = _var(_t)
+    p = _symbol(_p)
+    t = _symbol(_t)
     tup_to_p_t = lambda T: p**(-T[0] - 1)*t**(T[1])
     def p_val(x): 
         if str(x) in I._term_dict.keys():
@@ -171,24 +218,32 @@ def _mono_chart_to_gen_func(C, I, verbose=_verbose):
     
     # Different naming convention if it is univariate.
     if n > 1:
-        var_change = {_var('Z' + str(i)) : p_val(c_varbs[i]) for i in range(n)}
+        var_change = {_symbol('Z' + str(i)) : p_val(c_varbs[i]) for i in range(n)}
     else:
-        var_change = {_var('Z') : p_val(c_varbs[0])}
+        var_change = {_symbol('Z') : p_val(c_varbs[0])}
     
     if verbose >= 1:
         print("Applying the following change of variables:")
         if n > 1: 
             for i in range(n):
-                print("%s%s -> %s" % (_indent, c_varbs[i], var_change[_var('Z' + str(i))]))
+                print("%s%s -> %s" % (_indent, c_varbs[i], var_change[_symbol('Z' + str(i))]))
         else:
-            print("%s%s -> %s" % (_indent, c_varbs[0], var_change[_var('Z')]))
+            print("%s%s -> %s" % (_indent, c_varbs[0], var_change[_symbol('Z')]))
 
-    zed = I.pFactor() * (1 - p**(-1))**n * S.evaluate()
+    factor = I.pFactor() * (1 - p**(-1))**n
 
     if verbose >= 1:
         print("Multiplying by:")
-        print("%s%s" % (_indent, I.pFactor() * (1 - p**(-1))**n))
+        print("%s%s" % (_indent, factor))
+
+    # If we can, we substitute in Frac(QQ[p, t]).
+    names = [str(Z) for Z in var_change.keys()]
+    images = [var_change[_symbol(x)] for x in names]
+    F = _rational_substitution(gen_func, names, images, factor)
+    if F != None:
+        return F
 
+    zed = factor * gen_func
     if zed == 0:
         return 0
     try:
@@ -0,0 +1,84 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Helpers for spreading work over a pool of processes. The pool is forked, so
+# every worker starts with a copy of everything loaded so far.
+
+from globalVars import _LOAD_RETRIES
+from chartCache import _cached_load
+from singularSession import _drop_session
+
+# The Singular interface of a worker process. Every worker runs its own
+# Singular, so workers never share an interpreter.
+_worker_singular = [None]
+
+
+def _start_singular():
+    from sage.interfaces.singular import Singular
+    _worker_singular[0] = Singular()
+
+
+def _restart_singular():
+    old = _worker_singular[0]
+    try:
+        old.quit()
+    except:
+        pass
+    _drop_session(old)
+    _start_singular()
+
+
+# Decides if err means that the Singular process of the worker fell over, 
+# rather than that something is wrong with what we asked it to do. Only then 
+# is it worth trying again.
+def _singular_failed(err):
+    from pexpect import ExceptionPexpect
+    if isinstance(err, (ExceptionPexpect, EOFError)):
+        return True
+    try:
+        expect = _worker_singular[0]._expect
+        return expect == None or not expect.isalive()
+    except AttributeError:
+        return False
+
+
+# Apply func to every entry of args with jobs worker processes and return the
+# list of results in the same order as args.
+def _pool_map(func, args, jobs, initializer=None):
+    from multiprocessing import Pool
+    pool = Pool(processes=jobs, initializer=initializer)
+    try:
+        return pool.map(func, args, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+# Loads one chart in a worker. If Singular falls over, it is restarted and the
+# chart is loaded again, up to the given number of retries. Other errors, like 
+# a missing or broken chart file, would only happen again, so they are raised.
+def _load_chart_worker(args):
+    num, direc, cache, get_lat, version, retries = args
+    attempt = 0
+    while True:
+        try:
+            C = _cached_load(num, direc, cache=cache, get_lat=get_lat,
+                version=version, singular=_worker_singular[0])
+            return C
+        except Exception as err:
+            if attempt >= retries or not _singular_failed(err):
+                raise
+            attempt += 1
+            _restart_singular()
+
+
+# Load the charts nums from direc with jobs Singular processes. The charts are
+# returned in the same order as nums.
+def _parallel_load_charts(nums, direc, jobs, cache=None, get_lat=True,
+    version=2, retries=_LOAD_RETRIES):
+    args = [(n, direc, cache, get_lat, version, retries) for n in nums]
+    return _pool_map(_load_chart_worker, args, jobs,
+        initializer=_start_singular)
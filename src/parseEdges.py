@@ -4,8 +4,6 @@
 #   Distributed under MIT License
 #
 
-from sage.all import Set as _set
-
 # Given a directory, search for the 'Edges' file, and return a list of pairs 
 # corresponding to the edges of the blow-up tree.
 def _parse_edges(direc, version=1):
@@ -25,10 +23,11 @@ def _parse_edges(direc, version=1):
     # Per Anne's change (18-12-2019), there is another level to consider.
     if version != 1:
         from os import listdir
-        other_files = filter(lambda x: "Edges_" in x, listdir(direc))
-        vertices = map(lambda x: int(x[6:]), other_files)
+        other_files = [x for x in listdir(direc) if "Edges_" in x]
+        vertices = [int(x[6:]) for x in other_files]
+        vertex_set = set(vertices)
         for i in range(len(edges)):
-            if edges[i][1] in vertices:
+            if edges[i][1] in vertex_set:
                 edges[i] = [edges[i][0], [edges[i][1], 1]]
         for v in vertices:
             with open(edge_file + "_" + str(v)) as NEF:
@@ -38,22 +37,165 @@ def _parse_edges(direc, version=1):
                 if "--" in e:
                     c, d = e.split("--")
                     edges.append([[v, int(c)], [v, int(d)]])
-    return map(lambda e: tuple(e), edges)
+    return [tuple(e) for e in edges]
+
+# Chart labels are either integers or pairs [v, k] for the kth chart coming 
+# from the Edges_v file. We use tuples for the pairs so that labels can be 
+# hashed.
+def _label(x):
+    if isinstance(x, (list, tuple)):
+        return (int(x[0]), int(x[1]))
+    return int(x)
+
+
+# Returns the label of a chart from its id, which is the chart number used in 
+# file names: "v" is the label v and "v.k" is the label (v, k). Returns None if 
+# the id is not of this form, as for subcharts.
+def _id_label(identity):
+    try:
+        parts = [int(x) for x in str(identity).split(".")]
+    except ValueError:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    if len(parts) == 2:
+        return tuple(parts)
+    return None
+
+
+# The order we list charts in: n comes before all (n, k), which are ordered by 
+# k.
+def _label_key(x):
+    if isinstance(x, tuple):
+        return x
+    return (x, 0)
+
+
+# The blow-up tree of an atlas. The vertices are numbered 0, ..., n-1 in the 
+# order of their labels, and the tree is stored in arrays indexed by these 
+# numbers, so all the queries below are dictionary or list lookups. 
+class BlowupTree():
+
+    def __init__(self, edges):
+        edges = [(_label(e[0]), _label(e[1])) for e in edges]
+        labels = {1}
+        for a, b in edges:
+            labels.add(a)
+            labels.add(b)
+        self.labels = tuple(sorted(labels, key=_label_key))
+        self.index = {self.labels[i] : i for i in range(len(self.labels))}
+        n = len(self.labels)
+
+        # Adjacency arrays
+        self.parent = [-1]*n
+        self.children = [[] for _ in range(n)]
+        for a, b in edges:
+            i = self.index[a]
+            j = self.index[b]
+            self.parent[j] = i
+            self.children[i].append(j)
+        for C in self.children:
+            C.sort()
+
+        # The depth of every vertex, and the times we enter and leave each 
+        # vertex in a depth-first search. The vertex u is an ancestor of v if 
+        # and only if the interval of v is inside the interval of u.
+        self.depth = [0]*n
+        self._enter = [0]*n
+        self._leave = [0]*n
+        clock = 0
+        for r in range(n):
+            if self.parent[r] != -1:
+                continue
+            stack = [(r, 0)]
+            while len(stack) > 0:
+                v, k = stack.pop()
+                if k == 0:
+                    self._enter[v] = clock
+                    clock += 1
+                if k < len(self.children[v]):
+                    stack.append((v, k + 1))
+                    c = self.children[v][k]
+                    self.depth[c] = self.depth[v] + 1
+                    stack.append((c, 0))
+                else:
+                    self._leave[v] = clock
+                    clock += 1
+
+
+    def __repr__(self):
+        return "A blow-up tree with %s vertices and %s leaves." % (len(self), len(self.Leaves()))
+
+
+    def __len__(self):
+        return len(self.labels)
+
+
+    def __contains__(self, label):
+        return _label(label) in self.index
+
+
+    def _vertex(self, label):
+        return self.index[_label(label)]
+
+
+    # Returns the labels of the children of the vertex with the given label.
+    def Children(self, label):
+        return tuple([self.labels[c] for c in self.children[self._vertex(label)]])
+
+
+    def Depth(self, label):
+        return self.depth[self._vertex(label)]
+
+
+    # Decides if the vertex labeled u is an ancestor of the vertex labeled v. 
+    # Every vertex is an ancestor of itself.
+    def IsAncestor(self, u, v):
+        i = self._vertex(u)
+        j = self._vertex(v)
+        return self._enter[i] <= self._enter[j] and self._leave[j] <= self._leave[i]
+
+
+    def IsLeaf(self, label):
+        return len(self.children[self._vertex(label)]) == 0
+
+
+    # Returns the labels of the leaves in order.
+    def Leaves(self):
+        return tuple([self.labels[i] for i in range(len(self)) if len(self.children[i]) == 0])
+
+
+    # Returns the label of the parent, or None for the root.
+    def Parent(self, label):
+        i = self.parent[self._vertex(label)]
+        if i == -1:
+            return None
+        return self.labels[i]
+
+
+    # Returns the labels on the path from the root to the given vertex.
+    def Path(self, label):
+        i = self._vertex(label)
+        path = []
+        while i != -1:
+            path.append(self.labels[i])
+            i = self.parent[i]
+        return tuple(path[::-1])
+
+
+# Returns the blow-up tree from the Edges files in direc.
+def _blowup_tree(direc, version=1):
+    return BlowupTree(_parse_edges(direc, version=version))
+
 
 # Assume we get the output from _parse_edges: a list of tuples of ints or lists.
 def _get_vertex_labels(edges):
-    S = _set([e[1] for e in edges])
-    return list(_set([1]).union(S))
+    return list(BlowupTree(edges).labels)
 
 # Assume we get the output from _parse_edges: a list of tuples of ints or lists.
 def _get_total_charts(edges):
-    return len(_get_vertex_labels(edges))
+    return len(BlowupTree(edges))
 
 # Assume we get the output from _parse_edges and the number of vertices.
 def _get_leaves(edges):
-    verts = _get_vertex_labels(edges)
-    n = len(verts)
-    is_leaf = [1 for _ in verts]
-    for e in edges:
-        is_leaf[verts.index(e[0])] = 0
-    return tuple([verts[k] for k in range(n) if is_leaf[k]])
+    return BlowupTree(edges).Leaves()
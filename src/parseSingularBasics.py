@@ -4,10 +4,15 @@
 #   Distributed under MIT License
 #
 
+import re as _re
 from sage.all import QQ as _QQ
 from sage.all import ZZ as _ZZ
-from sage.all import var as _var
-from parseSingularExpr import _expr_to_tup, _format_var
+from symbolTable import _symbol
+from itertools import chain as _chain
+from parseSingularExpr import _expr_to_tup, _expr_to_poly, _format_var
+
+# The line starting an entry of a Singular list, e.g. '   [2]:'.
+_LIST_HEADER = _re.compile(r"( *)\[\d+\]:\s*$")
 
 
 # Given the Singular printout of the ring from the data set, and an attribute 
@@ -15,7 +20,9 @@ from parseSingularExpr import _expr_to_tup, _format_var
 def _attr_value(printout, attr):
     start = printout.rindex(attr)
     p_out = printout[start:]
-    end = p_out.index("\n")
+    end = p_out.find("\n")
+    if end < 0:
+        end = len(p_out)
     exerpt = p_out[:end]
     space = exerpt.index(" ")
     result = exerpt[space + 1:]
@@ -54,7 +61,7 @@ def _parse_array(str_array):
 # Assumed variables are separated by white space.
 def _parse_vars(str_vars):
     str_vars_form = _format_var(str_vars).split(" ")
-    varbs = [_var(s) for s in str_vars_form]
+    varbs = [_symbol(s) for s in str_vars_form]
     return tuple(varbs)
 
 
@@ -65,36 +72,98 @@ def _parse_printout(printout):
     return (coeff, varbs)
 
 
-# Given list of lines of a Singular printout of a list, create a tuple whose 
-# entries are the strings in the given list. Note that sing_list is assumed to 
-# essentially be a singular list split by '\n'
-def _parse_list(sing_list, var_expr=True):
+# Yields the lines of the string s one at a time, without splitting the whole 
+# string first.
+def _iter_lines(s):
+    start = 0
+    end = s.find("\n")
+    while end >= 0:
+        yield s[start:end]
+        start = end + 1
+        end = s.find("\n", start)
+    yield s[start:]
+
+
+# Given the lines of an entry of a Singular list that is not itself a list, 
+# return the parsed entry.
+def _parse_entry(lines, var_expr=True, ring=None):
+    one_line = "".join(lines)
+    if var_expr:
+        if ring != None:
+            try:
+                return _expr_to_poly(one_line, ring)
+            except (KeyError, ValueError):
+                pass
+        return _expr_to_tup(one_line)
+    else:
+        return _parse_array(one_line)
+
+
+# Given an iterable of the lines of a Singular printout of a list, yield the 
+# parsed top level entries one at a time. This reads each line once, keeping a 
+# stack of the lists that are still open.
+def _iter_parse_list(lines, var_expr=True, ring=None):
     # Singular indents with 3 spaces.
     indent = 3
 
-    # If it is not a list, just return it. This is the "base" case.
-    if not "[1]:" in sing_list[0]:
-        one_line = reduce(lambda x, y: x + y, sing_list, "")
-        if var_expr:
-            return _expr_to_tup(one_line)
-        else:
-            return _parse_array(one_line)
-
-    # Now we recurse.
-    L = []
-    i = 0
-    while i < len(sing_list):
-        if "[" == sing_list[i][0]:
-            i += 1
-            j = i + 1
-            while j < len(sing_list) and sing_list[j][:indent] == " "*indent: 
-                j += 1
-            # Remove the indent and recurse.
-            sub_list = map(lambda x: x[indent:], sing_list[i:j])
-            L.append(_parse_list(sub_list, var_expr=var_expr))
+    root = []
+    stack = [root]
+    entry = [None] # The lines of the current entry, if it is not a list.
+
+    def end_entry():
+        if entry[0] != None:
+            stack[-1].append(_parse_entry(entry[0], var_expr=var_expr, ring=ring))
+            entry[0] = None
+
+    def end_list():
+        L = stack.pop()
+        stack[-1].append(L)
+
+    for line in lines:
+        m = _LIST_HEADER.match(line)
+        if m != None:
+            depth = len(m.group(1))//indent
+            if depth == len(stack):
+                # The previous entry is a list itself.
+                entry[0] = None
+                stack.append([])
+            elif depth < len(stack):
+                end_entry()
+                while len(stack) > depth + 1:
+                    end_list()
+            else:
+                raise AssertionError("Wasn't expecting to be here...")
+            if depth == 0:
+                for x in root:
+                    yield x
+                del root[:]
+            entry[0] = []
+        elif entry[0] != None:
+            entry[0].append(line[indent*len(stack):])
         else:
             raise AssertionError("Wasn't expecting to be here...")
-        # i is either the next line starting with [n]: or i is too large.
-        i = j
-    
-    return L
+
+    end_entry()
+    while len(stack) > 1:
+        end_list()
+    for x in root:
+        yield x
+
+
+# Given list of lines of a Singular printout of a list, create a tuple whose 
+# entries are the strings in the given list. Note that sing_list is assumed to 
+# essentially be a singular list split by '\n', but any iterable of lines will 
+# do. If a polynomial ring is given, expressions are parsed into that ring; 
+# this falls back on the Symbolic Ring for expressions with variables that are 
+# not in the ring.
+def _parse_list(sing_list, var_expr=True, ring=None):
+    if isinstance(sing_list, str):
+        return _parse_entry(sing_list, var_expr=var_expr, ring=ring)
+    lines = iter(sing_list)
+    first = next(lines)
+
+    # If it is not a list, just return it. This is the "base" case.
+    if not "[1]:" in first:
+        return _parse_entry(_chain([first], lines), var_expr=var_expr, ring=ring)
+
+    return list(_iter_parse_list(_chain([first], lines), var_expr=var_expr, ring=ring))
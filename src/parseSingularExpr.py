@@ -4,11 +4,22 @@
 #   Distributed under MIT License
 #
 
+import re as _re
 from globalVars import _DEFAULT_p as _p
 from sage.all import PolynomialRing as _poly_ring
 from sage.all import QQ as _QQ
-from sage.all import var as _var
+from sage.all import SR as _SR
+from symbolTable import _symbol
 from sage.all import ZZ as _ZZ
+from sage.rings.polynomial.polynomial_ring import is_PolynomialRing as _is_univariate
+
+# One token of a Singular expression: a sign, a '*', a module component 
+# gen(i), a rational constant with an optional power, or a variable with an 
+# optional power.
+_TOKEN = _re.compile(r"\s*(?:([+-])|(\*)|gen\((\d+)\)|(\d+)(?:/(\d+))?(?:\^(\d+))?|([A-Za-z_]\w*(?:\([\d,]*\))?)(?:\^(\d+))?)")
+
+# The position of each variable of a polynomial ring, keyed by the ring.
+_RING_INDICES = {}
 
 
 def _get_row_num(factors):
@@ -67,7 +78,7 @@ def _str_to_vars(factor):
         return constant**exponent
     except ValueError: # if factor is not an int, we receive ValErr.
         if not "gen(" in s:
-            varb = _var(_format_var(s))
+            varb = _symbol(_format_var(s))
             return varb**exponent
     return 1
 
@@ -100,6 +111,93 @@ def _expr_to_tup(exp):
     else:
         return tuple(t)
 
+# Returns a dictionary sending the variable names of P to their positions.
+def _ring_index(P):
+    if not P in _RING_INDICES:
+        names = P.variable_names()
+        _RING_INDICES[P] = {names[i] : i for i in range(len(names))}
+    return _RING_INDICES[P]
+
+
+# Given a Singular expression as a string and a polynomial ring P, return the 
+# corresponding element of P. This reads the string once, building a 
+# dictionary from exponents to coefficients, and does not go through the 
+# Symbolic Ring. Like _expr_to_tup, if gen(i) shows up, a tuple of elements is 
+# returned instead. A KeyError is raised if a variable is not in P, and a 
+# ValueError if the string is not understood.
+def _expr_to_poly(exp, P):
+    index = _ring_index(P)
+    n = len(index)
+    exp = exp.strip()
+    rows = {}
+
+    # The data of the term we are reading.
+    term = [1, _QQ(1), [0]*n, 0, True] # sign, coeff, exponents, row, empty
+    def flush():
+        sign, coeff, exps, row, empty = term
+        if not empty:
+            key = tuple(exps)
+            poly = rows.setdefault(row, {})
+            poly[key] = poly.get(key, 0) + sign*coeff
+        term[:] = [1, _QQ(1), [0]*n, 0, True]
+
+    pos = 0
+    while pos < len(exp):
+        m = _TOKEN.match(exp, pos)
+        if m == None or m.end() == pos:
+            raise ValueError("Cannot parse '%s' at position %s." % (exp, pos))
+        pos = m.end()
+        sign, star, gen, num, den, num_e, name, name_e = m.groups()
+        if sign != None:
+            if not term[4]:
+                flush()
+            if sign == "-":
+                term[0] *= -1
+        elif gen != None:
+            term[3] = int(gen)
+            term[4] = False
+        elif num != None:
+            c = _QQ(num) if den == None else _QQ(num)/_QQ(den)
+            if num_e != None:
+                c = c**int(num_e)
+            term[1] *= c
+            term[4] = False
+        elif name != None:
+            term[2][index[_format_var(name)]] += 1 if name_e == None else int(name_e)
+            term[4] = False
+    flush()
+
+    # Univariate rings want the exponents as integers.
+    if _is_univariate(P):
+        to_poly = lambda d: P({k[0] : c for k, c in d.items()})
+    else:
+        to_poly = lambda d: P(d)
+    N = max([0] + list(rows.keys()))
+    if N == 0:
+        return to_poly(rows.get(0, {}))
+    t = [to_poly({}) for _ in range(N)]
+    for row, poly in rows.items():
+        t[row - 1] += to_poly(poly)
+    return tuple(t)
+
+
+# Convert the output of _expr_to_poly into symbolic expressions. If factor is 
+# True, the polynomials are factored in their polynomial ring, which is much 
+# faster than factoring in the Symbolic Ring.
+def _to_symbolic(f, factor=False):
+    if isinstance(f, (list, tuple)):
+        return tuple([_to_symbolic(g, factor=factor) for g in f])
+    if f.parent() is _SR:
+        if factor:
+            return f.factor()
+        return f
+    if not factor or f.is_constant():
+        return _SR(f)
+    F = f.factor()
+    mult = lambda x, y: x*y
+    return reduce(mult, [_SR(g)**e for g, e in F], _SR(F.unit()))
+
+
 def _parse_user_input(inp):
     try:
         # First try to see if it is an integer
@@ -0,0 +1,348 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# A reader for the parts of Singular's ssi serialization that the chart files
+# use. We follow the encoding of Singular 4 (ssiLink.cc): every object is a
+# type number followed by its data, all separated by single spaces. The chart
+# data is turned into the same printouts that Singular gives us, so that the
+# rest of the parsing does not care where the data came from.
+
+from globalVars import _SSI_CHART_LAYOUT, _chart_num
+
+# Singular's ring orderings (rRingOrder_t) that carry a weight vector, and the
+# one that carries a matrix.
+_WEIGHTED_ORDERS = {1, 12, 13, 17, 18, 21}
+_MATRIX_ORDER = 5
+
+# The names Singular prints for the ring orderings, indexed by rRingOrder_t.
+_ORDER_NAMES = ["no", "a", "a64", "c", "C", "M", "S", "s", "lp", "dp", "rp", 
+    "Dp", "wp", "Wp", "ls", "ds", "Ds", "ws", "Ws", "am", "L", "aa", "rs", "IS"]
+
+# The orderings on the components, which do not list any variables.
+_MODULE_ORDERS = {3, 4}
+
+# Integers in numbers are written in base 16.
+_SSI_BASE = 16
+
+
+class _SsiRing():
+    # blocks is a list of triples (order, variables, weights), where variables 
+    # are the 1-based positions of the first and last variable of the block.
+    def __init__(self, char, names, blocks=[]):
+        self.characteristic = char
+        self.names = names
+        self.blocks = blocks
+
+
+class _SsiPoly():
+    # terms is a list of triples (coeff, component, exponents), where coeff is
+    # a string.
+    def __init__(self, ring, terms):
+        self.ring = ring
+        self.terms = terms
+
+
+class _SsiIdeal():
+    def __init__(self, polys):
+        self.polys = polys
+
+
+class _SsiIntvec():
+    def __init__(self, entries):
+        self.entries = entries
+
+
+# Reads through the contents of an ssi file one object at a time.
+class _SsiReader():
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.ring = None
+
+
+    def at_end(self):
+        while self.pos < len(self.text) and self.text[self.pos].isspace():
+            self.pos += 1
+        return self.pos >= len(self.text)
+
+
+    def token(self):
+        if self.at_end():
+            raise ValueError("Unexpected end of ssi data.")
+        start = self.pos
+        while self.pos < len(self.text) and not self.text[self.pos].isspace():
+            self.pos += 1
+        return self.text[start:self.pos]
+
+
+    def int(self):
+        return int(self.token())
+
+
+    def string(self):
+        n = self.int()
+        # Exactly one space separates the length from the string.
+        start = self.pos + 1
+        self.pos = start + n
+        return self.text[start:self.pos]
+
+
+    # Returns a number as a string that our expression parser understands.
+    def number(self):
+        if self.ring != None and self.ring.characteristic != 0:
+            return str(self.int())
+        tag = self.int()
+        if tag == 4:
+            return str(self.int())
+        if tag in {3, 8}:
+            return str(int(self.token(), _SSI_BASE))
+        if tag in {0, 1}:
+            num = int(self.token(), _SSI_BASE)
+            den = int(self.token(), _SSI_BASE)
+            if den == 1:
+                return str(num)
+            return "%s/%s" % (num, den)
+        raise ValueError("Unsupported ssi number encoding %s." % (tag))
+
+
+    def read_ring(self):
+        char = self.int()
+        N = self.int()
+        if char < 0:
+            raise ValueError("Only prime fields and QQ are supported.")
+        names = [self.string() for _ in range(N)]
+        blocks = []
+        for _ in range(self.int()):
+            order = self.int()
+            b0 = self.int()
+            b1 = self.int()
+            if order in _WEIGHTED_ORDERS:
+                weights = [self.int() for _ in range(b1 - b0 + 1)]
+            elif order == _MATRIX_ORDER:
+                weights = [self.int() for _ in range((b1 - b0 + 1)**2)]
+            else:
+                weights = None
+            if order < 0 or order >= len(_ORDER_NAMES):
+                raise ValueError("Unknown ring ordering %s." % (order))
+            blocks.append((order, (b0, b1), weights))
+        # A quotient ideal
+        if self.int() != 0:
+            raise ValueError("Quotient rings are not supported.")
+        return _SsiRing(char, names, blocks)
+
+
+    def read_poly(self):
+        if self.ring == None:
+            raise ValueError("Polynomial data before any ring.")
+        N = len(self.ring.names)
+        terms = []
+        for _ in range(self.int()):
+            coeff = self.number()
+            comp = self.int()
+            exps = tuple([self.int() for _ in range(N)])
+            terms.append((coeff, comp, exps))
+        return _SsiPoly(self.ring, terms)
+
+
+    def read_ideal(self, count):
+        return _SsiIdeal([self.read_poly() for _ in range(count)])
+
+
+    # Reads the next object and returns it.
+    def read(self):
+        tag = self.int()
+        if tag == 1:
+            return self.int()
+        if tag == 2:
+            return self.string()
+        if tag == 3:
+            return int(self.token(), _SSI_BASE)
+        if tag == 4:
+            return self.number()
+        if tag == 5:
+            return self.read_ring()
+        if tag in {6, 9}:
+            return self.read_poly()
+        if tag == 7:
+            return self.read_ideal(self.int())
+        if tag == 8:
+            rows = self.int()
+            cols = self.int()
+            return self.read_ideal(rows*cols)
+        if tag == 10:
+            _ = self.int() # rank
+            return self.read_ideal(self.int())
+        if tag == 13:
+            return [self.read() for _ in range(self.int())]
+        if tag == 15:
+            self.ring = self.read_ring()
+            return self.read()
+        if tag == 16:
+            return None
+        if tag == 17:
+            return _SsiIntvec([self.int() for _ in range(self.int())])
+        if tag == 18:
+            rows = self.int()
+            cols = self.int()
+            return _SsiIntvec([self.int() for _ in range(rows*cols)])
+        if tag == 98:
+            _ = [self.int() for _ in range(4)]
+            return self.read()
+        raise ValueError("Unsupported ssi type %s." % (tag))
+
+
+# Reads all of the objects in the given ssi data.
+def _read_ssi(text):
+    R = _SsiReader(text)
+    objs = []
+    while not R.at_end():
+        # 99 marks the end of the data.
+        start = R.pos
+        if R.int() == 99:
+            break
+        R.pos = start
+        objs.append(R.read())
+    return objs, R.ring
+
+
+# ------------------------------------------------------------------------------
+#   Converting to Singular printouts
+# ------------------------------------------------------------------------------
+
+def _term_to_str(names, term):
+    coeff, comp, exps = term
+    factors = []
+    for x, e in zip(names, exps):
+        if e == 1:
+            factors.append(x)
+        elif e > 1:
+            factors.append("%s^%s" % (x, e))
+    if comp > 0:
+        factors.append("gen(%s)" % (comp))
+    if len(factors) == 0:
+        return coeff
+    if coeff == "1":
+        return "*".join(factors)
+    if coeff == "-1":
+        return "-" + "*".join(factors)
+    return coeff + "*" + "*".join(factors)
+
+
+def _poly_to_str(f):
+    if len(f.terms) == 0:
+        return "0"
+    out = ""
+    for term in f.terms:
+        s = _term_to_str(f.ring.names, term)
+        if out != "" and s[0] != "-":
+            out += "+"
+        out += s
+    return out
+
+
+# Mimics Singular's 'print' of an ideal, which is all we read from them.
+def _ideal_to_str(I):
+    if isinstance(I, _SsiPoly):
+        return _poly_to_str(I)
+    if len(I.polys) == 0:
+        return "0"
+    return ",\n".join([_poly_to_str(f) for f in I.polys])
+
+
+# Mimics the Singular printout of a list.
+def _list_to_str(L, indent=0):
+    space = " "*indent
+    if isinstance(L, list):
+        if len(L) == 0:
+            return space + "empty list"
+        lines = []
+        for k in range(len(L)):
+            lines.append("%s[%s]:" % (space, k + 1))
+            lines.append(_list_to_str(L[k], indent=indent + 3))
+        return "\n".join(lines)
+    if isinstance(L, _SsiIntvec):
+        return space + ",".join([str(a) for a in L.entries])
+    if isinstance(L, _SsiPoly):
+        return space + _poly_to_str(L)
+    if isinstance(L, _SsiIdeal):
+        return "\n".join([space + _poly_to_str(f) for f in L.polys])
+    return space + str(L)
+
+
+# Mimics the Singular printout of a ring (rWrite in ring.cc).
+def _ring_to_str(R):
+    if R.characteristic == 0:
+        coeff = "QQ"
+    else:
+        coeff = "ZZ/%s" % (R.characteristic)
+    lines = ["// coefficients: %s" % (coeff), 
+        "// number of vars : %s" % (len(R.names))]
+    for l in range(len(R.blocks)):
+        order, (b0, b1), weights = R.blocks[l]
+        lines.append("//        block %3d : ordering %s" % (l + 1, _ORDER_NAMES[order]))
+        if order in _MODULE_ORDERS:
+            continue
+        names = R.names[b0 - 1:b1]
+        lines.append("//                  : names   " + "".join([" %s" % (x) for x in names]))
+        if weights != None:
+            # Singular pads the weights to the length of the last name.
+            width = len(names[-1]) if len(names) > 0 else 0
+            n = b1 - b0 + 1
+            for j in range(0, len(weights), max(n, 1)):
+                row = weights[j:j + n]
+                lines.append("//                  : weights " + "".join([" %*d" % (width, w) for w in row]))
+    return "\n".join(lines)
+
+
+# Given a chart number and its directory, read the ssi file and return the
+# printouts of the chart data in the same form as _split_payload.
+def _read_chart_ssi(num, direc, get_lat=True):
+    if direc[-1] != "/":
+        direc += "/"
+    with open(direc + _chart_num(num)) as ssi_file:
+        objs, R = _read_ssi(ssi_file.read())
+    if R == None:
+        raise ValueError("No ring in the chart file.")
+    # The chart file is either one list or a sequence of objects.
+    if len(objs) == 1 and isinstance(objs[0], list):
+        objs = objs[0]
+    get = lambda name: objs[_SSI_CHART_LAYOUT[name] - 1]
+
+    # The layout is checked against what the objects have to be, so a file 
+    # laid out differently is not read into the wrong fields.
+    polys = (_SsiPoly, _SsiIdeal)
+    expected = [("BO", list), ("cent", polys), ("Cone", list), 
+        ("focus", polys)]
+    if get_lat:
+        expected.append(("ILattice", list))
+    for name, kind in expected:
+        if not isinstance(get(name), kind):
+            raise ValueError("Unexpected %s in the chart file." % (name))
+    BO = get("BO")
+    if len(BO) < 5 or not isinstance(BO[3], list):
+        raise ValueError("Unexpected BO in the chart file.")
+    if get_lat and len(get("ILattice")) < 4:
+        raise ValueError("Unexpected ILattice in the chart file.")
+
+    fields = {
+        "ring": [_ring_to_str(R)],
+        "ambient": [_ideal_to_str(BO[0])],
+        "birat": [_ideal_to_str(BO[4])],
+        "cent": [_ideal_to_str(get("cent"))],
+        "cone": [_list_to_str(get("Cone"))],
+        "exDiv": [_ideal_to_str(D) for D in BO[3]],
+        "focus": [_ideal_to_str(get("focus"))]
+    }
+    for name in ["jacDet", "lastMap"]:
+        obj = get(name)
+        if obj != None:
+            fields[name] = [_ideal_to_str(obj)]
+    if get_lat:
+        ILattice = get("ILattice")
+        for k in range(4):
+            fields["lat%s" % (k + 1)] = [_list_to_str(ILattice[k])]
+    return fields
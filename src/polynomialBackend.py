@@ -0,0 +1,59 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Charts keep their data as symbolic expressions, but the questions we ask
+# about it -- is it a monomial, which variables show up, what is the degree in
+# a variable -- are questions about polynomials. Here we answer them in the
+# polynomial ring QQ[p, vars], where the answers can be read off the terms.
+
+from globalVars import _DEFAULT_p as _p
+from ringFactory import _get_ring
+from sage.all import QQ as _QQ
+
+
+# Returns the polynomial ring over QQ with variables p followed by varbs.
+def _backend_ring(varbs):
+    return _get_ring(_QQ, [_p] + [str(x) for x in varbs if str(x) != _p])
+
+
+# Returns f as an element of P, or None if f is not a polynomial in the
+# variables of P. Elements of quotient rings are lifted first.
+def _to_backend(f, P):
+    if hasattr(f, "parent") and hasattr(f.parent(), "cover_ring"):
+        f = f.lift()
+    try:
+        return P(f)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+
+
+# Returns the set of names of the variables in f.
+def _variable_names(f):
+    if hasattr(f, "parent") and hasattr(f.parent(), "cover_ring"):
+        f = f.lift()
+    try:
+        return {str(x) for x in f.variables()}
+    except AttributeError: # constants that are not Sage elements
+        return set()
+
+
+# Decides if f, an element of P, has at most one term.
+def _is_term(f):
+    return len(f.dict()) <= 1
+
+
+# Returns the degree of f, an element of P, in the kth variable of P.
+def _degree(f, k):
+    if f == 0:
+        return 0
+    return max([e[k] for e in f.exponents()])
+
+
+# Returns the pairs of the cone data of a chart in the variables varbs as
+# pairs in QQ[p, varbs]. Entries that are not polynomials there are None.
+def _backend_pairs(varbs, pairs):
+    P = _backend_ring(varbs)
+    return tuple([tuple([_to_backend(f, P) for f in pair]) for pair in pairs])
@@ -12,17 +12,16 @@ from globalVars import _DEFAULT_VERBOSE as _verbose
 from integrandClass import _get_integrand, _integral_printout
 from integrandClass import Integrand as _integrand 
 from interfaceZeta import _clean_cone_data, _cone_mat, _mono_chart_to_gen_func
+from interfaceZeta import _cone_gen_func
+from rationalFunctions import _from_field, _rational_substitution
+from rationalFunctions import _rational_sum
 from sage.all import AffineSpace as _Aff
 from sage.all import GF as _GF
 from sage.all import Matrix as _matrix
-from sage.all import Polyhedron as _polyhedron
-from sage.all import PolynomialRing as _polyring
 from sage.all import Primes as _Primes
-from sage.all import QQ as _QQ
 from sage.all import symbolic_expression as _symb_expr
-from sage.all import var as _var
+from symbolTable import _symbol
 from sage.all import ZZ as _ZZ
-from Zeta.smurf import SMURF as _Zeta_smurf
 
 
 ################################################################################
@@ -48,20 +47,17 @@ def _trivial_cone(C, I, verbose=_verbose):
 
     # Get the matrix of inequalities so Polyhedron can read it
     cone_mat = _cone_mat(c_varbs, c_cone)
-    P = _polyhedron(ieqs=cone_mat)
     n = len(c_varbs)
-    R = _polyring(_QQ, 'Z', n)
 
     if verbose >= 2:
         print("Running Zeta via the polyhedron:")
         print("%s" % (_matrix(cone_mat)))
 
-    # Run Zeta
-    S = _Zeta_smurf.from_polyhedron(P, R)
+    gen_func = _cone_gen_func(cone_mat, n, verbose=verbose)
 
     # Clean up the output
-    p = _var(_p)
-    t = _var(_t)
+    p = _symbol(_p)
+    t = _symbol(_t)
     tup_to_p_t = lambda T: p**(-T[0] - 1)*t**(T[1])
     def p_val(x): 
         if str(x) in I._term_dict.keys():
@@ -71,24 +67,32 @@ def _trivial_cone(C, I, verbose=_verbose):
     
     # Different naming convention if it is univariate.
     if n > 1:
-        var_change = {_var('Z' + str(i)) : p_val(c_varbs[i]) for i in range(n)}
+        var_change = {_symbol('Z' + str(i)) : p_val(c_varbs[i]) for i in range(n)}
     else:
-        var_change = {_var('Z') : p_val(c_varbs[0])}
+        var_change = {_symbol('Z') : p_val(c_varbs[0])}
     
     if verbose >= 1:
         print("Applying the following change of variables:")
         if n > 1: 
             for i in range(n):
-                print("%s%s -> %s" % (_indent, c_varbs[i], var_change[_var('Z' + str(i))]))
+                print("%s%s -> %s" % (_indent, c_varbs[i], var_change[_symbol('Z' + str(i))]))
         else:
-            print("%s%s -> %s" % (_indent, c_varbs[0], var_change[_var('Z')]))
+            print("%s%s -> %s" % (_indent, c_varbs[0], var_change[_symbol('Z')]))
 
-    zed = I.pFactor() * (1 - p**(-1))**n * S.evaluate()
+    factor = I.pFactor() * (1 - p**(-1))**n
 
     if verbose >= 1:
         print("Multiplying by:")
-        print("%s%s" % (_indent, I.pFactor() * (1 - p**(-1))**n))
+        print("%s%s" % (_indent, factor))
 
+    # If we can, we substitute in Frac(QQ[p, t]).
+    names = [str(Z) for Z in var_change.keys()]
+    images = [var_change[_symbol(x)] for x in names]
+    F = _rational_substitution(gen_func, names, images, factor)
+    if F != None:
+        return _from_field(F)
+
+    zed = factor * gen_func
     if zed == 0:
         return 0
     zed = zed.subs(var_change).simplify().factor()
@@ -138,13 +142,11 @@ def _zeta_solve(C, verbose=_verbose, integ=True, cone=True):
         else:
             gen_funcs.append(_mono_chart_to_gen_func(t[0], t[1]))
 
-    add_up = lambda x, y: x + y
-
-    return reduce(add_up, gen_funcs, 0)
+    return _rational_sum(gen_funcs)
 
 
 def IntegralTests(A, chart_filter=None, cone_condition=True, integrand=True):
-    add_up_ints = lambda x, y: x + _zeta_solve(y, cone=cone_condition, integ=integrand)
+    solve = lambda x: _zeta_solve(x, cone=cone_condition, integ=integrand)
     # Currently we do not have the intersection lattice of a chart with an 
     # ambient space different from the standard affine space.
     AVOID_BUG = lambda x: x.intLat != None
@@ -155,7 +157,7 @@ def IntegralTests(A, chart_filter=None, cone_condition=True, integrand=True):
             raise TypeError("Expected chart_filter to be a function compatible with filter.")
         wrap = chart_filter
     relevant_charts = filter(wrap, filter(AVOID_BUG, A.charts))
-    return reduce(add_up_ints, relevant_charts, 0)
+    return _rational_sum(map(solve, relevant_charts))
 
 ################################################################################
 ################################################################################
@@ -170,7 +172,7 @@ def _count_p(tup, p):
     S = tup[1]
     K = _GF(p)
     S_K = S.change_ring(K)
-    target_p = target.subs({_var(_p) : p})
+    target_p = target.subs({_symbol(_p) : p})
     return len(S_K.rational_points()) == target_p
 
 def _vertex_p(target, vertex, divisor, p):
@@ -184,7 +186,7 @@ def _vertex_p(target, vertex, divisor, p):
     points_off = reduce(lambda x,y: y.union(x), map(get_points, sys_off), set())
     points_on = get_points(sys_on)
     relevant_points = points_on.difference(points_off)
-    target_p = _symb_expr(target).subs({_var(_p) : p})
+    target_p = _symb_expr(target).subs({_symbol(_p) : p})
     return target_p == len(relevant_points)
 
 
@@ -0,0 +1,103 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Once Zeta is done, everything we do with generating functions -- substitute 
+# powers of p and t, multiply, and add them up -- is arithmetic with rational 
+# functions in p and t. We do it in Frac(QQ[p, t]), where it is exact and 
+# normalizing is cheap, instead of simplifying in the symbolic ring. Anything 
+# that is not a rational function in p and t, like the unknown constants from 
+# counting rational points, stays in the symbolic ring.
+
+from globalVars import _DEFAULT_p as _p
+from globalVars import _DEFAULT_t as _t
+from ringFactory import _get_ring
+from sage.all import QQ as _QQ
+from sage.all import SR as _SR
+
+
+# Returns the field Frac(QQ[p, t]).
+def _field():
+    return _get_ring(_QQ, [_p, _t]).fraction_field()
+
+
+# Returns the polynomial f in the variables of P as an element of P, or None if
+# it is not one.
+def _to_poly(f, P):
+    try:
+        return P(f)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+
+
+# Decides if f is an element of Frac(QQ[p, t]).
+def _in_field(f):
+    return hasattr(f, "parent") and f.parent() == _field()
+
+
+# Returns f as an element of Frac(QQ[p, t]), or None if it is not a rational 
+# function in p and t.
+def _to_field(f):
+    K = _field()
+    if _in_field(f):
+        return f
+    if not hasattr(f, "numerator") or not hasattr(f, "variables"):
+        return _to_poly(f, K)
+    if not {str(x) for x in f.variables()} <= {_p, _t}:
+        return None
+    P = K.ring()
+    num = _to_poly(f.numerator(), P)
+    den = _to_poly(f.denominator(), P)
+    if num == None or den == None or den == 0:
+        return None
+    return K(num)/K(den)
+
+
+# Returns the element F of Frac(QQ[p, t]) as a factored symbolic expression.
+def _from_field(F):
+    if F == 0:
+        return 0
+    mult = lambda x, y: x*y
+    def to_SR(fact):
+        return reduce(mult, [_SR(g)**e for g, e in fact], _SR(fact.unit()))
+    return to_SR(F.numerator().factor())/to_SR(F.denominator().factor())
+
+
+# Given a generating function Z in the variables with the given names, the 
+# images of these variables, and a factor, return factor*Z after substituting 
+# the images into Z, as an element of Frac(QQ[p, t]). Returns None if the 
+# images or the factor are not rational functions in p and t, or the 
+# substitution is not defined.
+def _rational_substitution(Z, names, images, factor):
+    fac = _to_field(factor)
+    imgs = [_to_field(x) for x in images]
+    if fac == None or None in imgs:
+        return None
+    R = _get_ring(_QQ, names)
+    try:
+        num = R(_SR(Z).numerator())
+        den = R(_SR(Z).denominator())
+        return fac*num(*imgs)/den(*imgs)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+
+
+# Returns the sum of the given expressions, factored. The sum is done in 
+# Frac(QQ[p, t]) if every term is a rational function in p and t, and in the 
+# symbolic ring otherwise. If symbolic is False, a sum done in the field stays 
+# there, so sums of sums are only brought back to the symbolic ring once.
+def _rational_sum(terms, symbolic=True):
+    K = _field()
+    field_terms = [_to_field(x) for x in terms]
+    if not None in field_terms:
+        total = reduce(lambda x, y: x + y, field_terms, K(0))
+        if symbolic:
+            return _from_field(total)
+        return total
+    to_SR = lambda x: _from_field(x) if _in_field(x) else x
+    total = reduce(lambda x, y: x + y, map(to_SR, terms), 0)
+    if total == 0:
+        return 0
+    return _SR(total).simplify().factor()
@@ -9,7 +9,8 @@ from globalVars import _DEFAULT_p as _p
 from globalVars import _DEFAULT_USER_INPUT as _user_input
 from globalVars import _DEFAULT_VERBOSE as _verbose
 from globalVars import _Lookup_Table as _lookup
-from sage.all import var as _var
+from globalVars import _HiddenPrints
+from symbolTable import _symbol
 from sage.all import AffineSpace as _affine_space
 from sage.all import PolynomialRing as _poly_ring
 from sage.all import Subsets as _subsets
@@ -17,9 +18,9 @@ from sage.all import GF as _GF
 from sage.all import SR as _SR
 from sage.all import QQ as _QQ
 from sage.all import Word as _word
+from ringFactory import _get_ring
 from sage.all import Set as _set
 from parseSingularExpr import _parse_user_input
-from Zeta.torus import CountException as _CountException
 
 
 # The following is a function written by Tobias Rossmann for counting the 
@@ -48,21 +49,21 @@ def _count_pts(F, q=None, torus=False):
             if all(g(x) == 0 for g in G):
                 res += 1
         return res
-    q = _var(_p)
+    q = _symbol(_p)
     R = F[0].parent()
     n = R.ngens()
 
     from Zeta.torus import SubvarietyOfTorus
 
     if torus:
-        return SubvarietyOfTorus([F]).count().subs({_var('q') : q})
+        return SubvarietyOfTorus([F]).count().subs({_symbol('q') : q})
     
     total = _SR(0)
     for S in _subsets(R.gens()):
         D = {str(x): R(0) if x in S else x for x in R.gens()}
         G = [f(**D) for f in F]
         V = SubvarietyOfTorus(G)
-        cnt = V.count().subs({_var('q') : q})/(q-1)**len(S)
+        cnt = V.count().subs({_symbol('q') : q})/(q-1)**len(S)
         total += cnt
     return total.factor() if total else total
 
@@ -88,7 +89,7 @@ def _guess_polynomial(P, S):
     b_flat = map(lambda p: [_count_pts(S, q=p)], primes)
     b = Matrix(_QQ, b_flat)
     X = A.solve_right(b)
-    p = _var('X')
+    p = _symbol('X')
     data = zip(X.list(), [p**k for k in range(d + 3)])
     guess = reduce(lambda x, y: x + y[0]*y[1], data, 0)
     print(guess)
@@ -143,7 +144,7 @@ def _build_data(S, varbs, verbose=_verbose):
     perm = _word(deg_vecs).standard_permutation().inverse()
 
     # Build the change of variables dictionary
-    var_change = {varbs[perm[i]-1] : _var("X" + str(i)) for i in range(n)}
+    var_change = {varbs[perm[i]-1] : _symbol("X" + str(i)) for i in range(n)}
     # Build the change of variables function
     def embed(f): 
         if f != 0:
@@ -272,13 +273,13 @@ def _ask_user(Aff, S, label):
     for f in S:
         print(_indent + '%s' % (f))
     need_input = True
-    not_poly = {_var('n'), _var('N')}
+    not_poly = {_symbol('n'), _symbol('N')}
     while need_input:
         print('If not a polynomial in p, write N.')
         exp_str = input('How many? Use %s if needed.\n' % (_p))
         if exp_str in not_poly:
             need_input = False
-            C = _var('C' + label.replace(".", "_"))
+            C = _symbol('C' + label.replace(".", "_"))
         else:
             try:
                 need_input = False
@@ -295,12 +296,13 @@ def _get_smaller_poly_ring(S, R, ambient=None):
         ambient_new = ambient
     else:
         ambient_new = []
+    S = list(S)
     while 0 in S:
         k = S.index(0)
         S = S[:k] + S[k+1:]
-    hyper = reduce(lambda x, y: x*y, S + ambient_new)
+    hyper = reduce(lambda x, y: x*y, list(S) + list(ambient_new))
     varbs = hyper.variables()
-    P = _poly_ring(R, len(varbs), varbs)
+    P = _get_ring(R, varbs)
     embed = lambda f: P(f)
     S_new = map(embed, S)
     if ambient != None:
@@ -356,9 +358,12 @@ def _rational_points(P, S,
     user_input=_user_input, 
     label=''):
 
-    import Zeta as Z
+    # Zeta is only imported once we need to count points.
+    with _HiddenPrints():
+        import Zeta as Z
+        from Zeta.torus import CountException as _CountException
     d = len(P.gens())
-    p = _var(_p)
+    p = _symbol(_p)
     T = S
     P_new = P
 
@@ -437,7 +442,7 @@ def _rational_points(P, S,
                             N = _ask_user(P, S, label)
                             _save_to_lookup(P, S, data, N)
                         else:
-                            N = _var('C' + label.replace(".", "_"))
+                            N = _symbol('C' + label.replace(".", "_"))
 
     data = {
         "original_ring": P, 
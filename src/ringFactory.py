@@ -0,0 +1,40 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Charts with the same variables should share their rings. Sage already keeps 
+# one polynomial ring per base ring and names, but ideals and quotient rings 
+# are built anew every time. Here we hand out one ring per base ring and 
+# variables, and one quotient per base ring, variables, and ideal. Rings are 
+# always multivariate, even with one variable, so that the rings we hand out 
+# for the same variables are the same.
+
+from sage.all import Ideal as _ideal
+from sage.all import PolynomialRing as _polyring
+
+# The rings keyed by (base ring, names), and the quotients keyed by (base 
+# ring, names, generators).
+_RINGS = {}
+_QUOTIENTS = {}
+
+
+# Returns the polynomial ring over R in the variables varbs.
+def _get_ring(R, varbs):
+    names = tuple([str(x) for x in varbs])
+    key = (R, names)
+    if not key in _RINGS:
+        _RINGS[key] = _polyring(R, len(names), names)
+    return _RINGS[key]
+
+
+# Returns the quotient of the polynomial ring over R in the variables varbs by 
+# the ideal generated by gens.
+def _get_quotient(R, varbs, gens):
+    P = _get_ring(R, varbs)
+    gens = [P(f) for f in gens]
+    key = (R, P.variable_names(), tuple(sorted(set(gens), key=str)))
+    if not key in _QUOTIENTS:
+        _QUOTIENTS[key] = P.quotient(_ideal(P, gens))
+    return _QUOTIENTS[key]
@@ -0,0 +1,170 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+from globalVars import _KILL_BATCH
+from sage.all import randint as _RAND
+from sage.all import singular as _SING
+
+
+# Keeps track of what we have already loaded into a Singular process, so that
+# libraries, procedures, and helper rings are only set up once per process. If
+# the process restarts, everything is forgotten and set up again on demand.
+# It also hands out the identifiers we use in Singular: a prefix that is fixed
+# for the session followed by a counter, so no round trip is needed to find an
+# unused name. Identifiers we are done with are killed in batches. One of the 
+# helper rings can be the base ring: we switch to it before killing anything, 
+# since what we kill might be the current basering.
+class SingularSession():
+
+    def __init__(self, interface):
+        self.interface = interface
+        self.counts = {
+            "evals": 0,
+            "lib loads": 0,
+            "lib skips": 0,
+            "proc defs": 0,
+            "proc skips": 0,
+            "ring defs": 0,
+            "ring skips": 0,
+            "names": 0,
+            "kills": 0,
+            "restarts": 0
+        }
+        rand_chars = [chr(_RAND(97, 122)) for _ in range(4)]
+        self.prefix = "sz" + "".join(rand_chars) + "v"
+
+        # Hidden
+        self._pid = None
+        self._libraries = set()
+        self._procedures = set()
+        self._rings = set()
+        self._base_ring = None
+        self._counter = 0
+        self._to_kill = []
+
+
+    def __repr__(self):
+        return "A Singular session with %s libraries, %s procedures, and %s helper rings loaded." % (len(self._libraries), len(self._procedures), len(self._rings))
+
+
+    # If the Singular process changed since we last looked, then nothing we
+    # loaded before is there anymore.
+    def _check_process(self):
+        pid = self.interface.pid()
+        if pid != self._pid:
+            if self._pid != None:
+                self.counts["restarts"] += 1
+            self._pid = pid
+            self._libraries = set()
+            self._procedures = set()
+            self._rings = set()
+            self._base_ring = None
+            self._to_kill = []
+
+
+    # Returns the Singular code killing all the identifiers we released. If 
+    # there is a base ring, we switch to it first.
+    def _kill_code(self):
+        code = "kill %s;" % (", ".join(self._to_kill))
+        if self._base_ring != None:
+            code = "setring %s; " % (self._base_ring) + code
+        self.counts["kills"] += len(self._to_kill)
+        self._to_kill = []
+        return code
+
+
+    # Evaluate a string of Singular code. If enough identifiers have been
+    # released, they are killed at the start of the same evaluation.
+    def eval(self, code):
+        self._check_process()
+        self.counts["evals"] += 1
+        if len(self._to_kill) >= _KILL_BATCH:
+            code = self._kill_code() + "\n" + code
+        return self.interface.eval(code)
+
+
+    # Returns a new identifier for Singular that is not used yet.
+    def new_name(self):
+        self._counter += 1
+        self.counts["names"] += 1
+        return self.prefix + str(self._counter)
+
+
+    # Mark the given identifiers as no longer needed. They are killed with the
+    # next batch. The base ring is never killed.
+    def release(self, *names):
+        self._check_process()
+        self._to_kill += [x for x in names if x != self._base_ring]
+
+
+    # Kill all released identifiers now.
+    def flush(self):
+        self._check_process()
+        if len(self._to_kill) > 0:
+            self.counts["evals"] += 1
+            _ = self.interface.eval(self._kill_code())
+
+
+    # Load the Singular library at path if it is not already loaded.
+    def lib(self, path):
+        self._check_process()
+        if path in self._libraries:
+            self.counts["lib skips"] += 1
+            return
+        self.interface.lib(path)
+        self._libraries.add(path)
+        self.counts["lib loads"] += 1
+
+
+    # Define the Singular procedure called name with the given code if it is
+    # not already defined.
+    def proc(self, name, code):
+        self._check_process()
+        if name in self._procedures:
+            self.counts["proc skips"] += 1
+            return
+        _ = self.interface.eval(code)
+        self._procedures.add(name)
+        self.counts["proc defs"] += 1
+
+
+    # Define a helper ring with the given Singular code if it is not already
+    # defined. If base is True, it becomes the base ring.
+    def ring(self, name, code, base=False):
+        self._check_process()
+        if base:
+            self._base_ring = name
+        if name in self._rings:
+            self.counts["ring skips"] += 1
+            return
+        _ = self.interface.eval(code)
+        self._rings.add(name)
+        self.counts["ring defs"] += 1
+
+
+    # Returns a copy of the counters.
+    def Counts(self):
+        return dict(self.counts)
+
+
+# One session for every Singular interface we have seen, keyed by its id.
+_sessions = {}
+
+# Returns the session for the given Singular interface, which is the global
+# Singular interface of Sage by default.
+def _get_session(interface=None):
+    if interface == None:
+        interface = _SING
+    key = id(interface)
+    if not key in _sessions:
+        _sessions[key] = SingularSession(interface)
+    return _sessions[key]
+
+
+# Forgets the session of the given Singular interface, once the interface is 
+# no longer used.
+def _drop_session(interface):
+    _ = _sessions.pop(id(interface), None)
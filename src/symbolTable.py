@@ -0,0 +1,50 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+from sage.all import SR as _SR
+
+# A table of the symbolic variables we use, keyed by their names. Each name is
+# made into a variable once; after that it is a dictionary lookup. Unlike
+# Sage's var, nothing is injected into the global namespace.
+#
+# The table holds variables of the Symbolic Ring, not ring generators. The 
+# integrands and the Zeta interface work with symbolic expressions, so that is 
+# what the parsers and charts need. Polynomial rings, and so their generators, 
+# are shared through ringFactory instead.
+class SymbolTable():
+
+    def __init__(self):
+        self.symbols = {}
+        self.lookups = 0
+
+
+    def __repr__(self):
+        return "A symbol table with %s symbols and %s lookups." % (len(self.symbols), self.lookups)
+
+
+    def __call__(self, name):
+        self.lookups += 1
+        try:
+            return self.symbols[name]
+        except KeyError:
+            x = _SR.var(name)
+            self.symbols[name] = x
+            return x
+
+
+    # Returns the tuple of variables with the given names.
+    def Symbols(self, names):
+        return tuple([self(name) for name in names])
+
+
+# The table shared by everything in SingularZeta. Since the Symbolic Ring has 
+# one variable for each name anyway, one table serves every atlas; an atlas 
+# keeps a reference to it as Atlas.symbols.
+_SYMBOLS = SymbolTable()
+
+
+def _symbol(name):
+    return _SYMBOLS(name)
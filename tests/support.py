@@ -0,0 +1,57 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Shared set up for the tests. The modules in src import each other by name, 
+# so src is put on the path. Most of them need Sage, and a few tests need an 
+# atlas directory (with its Singular libraries next to it), given by the 
+# environment variable SINGULARZETA_TEST_ATLAS.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if not SRC in sys.path:
+    sys.path.insert(0, SRC)
+
+try:
+    import sage.all
+    HAS_SAGE = True
+except ImportError:
+    HAS_SAGE = False
+
+ATLAS = os.environ.get("SINGULARZETA_TEST_ATLAS", "")
+
+needs_sage = unittest.skipUnless(HAS_SAGE, "needs Sage")
+needs_atlas = unittest.skipUnless(HAS_SAGE and ATLAS != "", 
+    "needs Sage and SINGULARZETA_TEST_ATLAS")
+
+
+# Returns the labels of the charts saved in the atlas directory.
+def atlas_chart_labels(direc):
+    labels = []
+    for name in sorted(os.listdir(direc)):
+        if name.startswith("Chart") and name.endswith(".ssi"):
+            num = name[5:-4]
+            if "." in num:
+                labels.append(tuple([int(x) for x in num.split(".")]))
+            else:
+                labels.append(int(num))
+    return labels
+
+
+# Copies the test atlas into a new directory next to it, so that the Singular
+# libraries are found in the same place. Returns the new directory.
+def copy_atlas():
+    parent = os.path.dirname(os.path.abspath(ATLAS.rstrip("/")))
+    direc = tempfile.mkdtemp(dir=parent)
+    for name in os.listdir(ATLAS):
+        path = os.path.join(ATLAS, name)
+        if os.path.isfile(path):
+            shutil.copy(path, direc)
+    return direc + "/"
@@ -0,0 +1,129 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import shutil
+import unittest
+from support import copy_atlas, needs_atlas, ATLAS
+
+
+# Returns a vertex of the tree whose children are all leaves with integer
+# labels.
+def _last_blowup(tree):
+    for l in tree.labels:
+        C = tree.Children(l)
+        if len(C) > 0 and all(isinstance(c, int) and tree.IsLeaf(c) for c in C):
+            return l
+
+
+@needs_atlas
+class RefreshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direc = copy_atlas()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+
+    def test_nothing_changed(self):
+        from atlasClass import Atlas
+        A = Atlas(self.direc, verbose=0, cache=False)
+        Z = A.ZetaIntegral(verbose=0)
+        delta = A.Refresh(verbose=0)
+        self.assertEqual(delta, {"added": (), "changed": (), "removed": ()})
+        self.assertEqual(len(A._chart_integrals), len(A.leaves))
+        self.assertEqual(A.ZetaIntegral(verbose=0), Z)
+
+
+    # The integrals of the charts are kept in Frac(QQ[p, t]), unless they are
+    # not rational functions in p and t.
+    def test_chart_integrals_in_field(self):
+        from atlasClass import Atlas
+        from rationalFunctions import _in_field, _rational_sum, _to_field
+        A = Atlas(self.direc, verbose=0, cache=False)
+        Z = A.ZetaIntegral(verbose=0)
+        integrals = [A._chart_integrals[l] for l in A.leaves]
+        for F in integrals:
+            self.assertTrue(_in_field(F) or _to_field(F) == None)
+        self.assertEqual(_rational_sum(integrals), Z)
+
+
+    def test_changed_chart(self):
+        from atlasClass import Atlas
+        A = Atlas(self.direc, verbose=0, cache=False)
+        Z = A.ZetaIntegral(verbose=0)
+        l = A.leaves[0]
+        C = A.charts[1]
+        name = "Chart%s.ssi" % (".".join(map(str, l)) if isinstance(l, tuple) else l)
+        with open(self.direc + name, 'a') as F:
+            F.write("\n")
+        delta = A.Refresh(verbose=0)
+        self.assertEqual(delta["changed"], (l,))
+        self.assertFalse(l in A._chart_integrals)
+        self.assertIs(A.charts[1], C)
+        self.assertEqual(A.ZetaIntegral(verbose=0), Z)
+
+
+    # Starts from the atlas without its last blow-up, and then puts it back.
+    def test_growing_atlas(self):
+        from atlasClass import Atlas
+        Z = Atlas(self.direc, verbose=0, cache=False).ZetaIntegral(verbose=0)
+        edge_file = self.direc + "Edges"
+        with open(edge_file) as F:
+            edges = F.read()
+        v = _last_blowup(Atlas(self.direc, verbose=0, lazy=True, cache=False).tree)
+        cut = "\n".join([e for e in edges.split("\n")
+            if not e.replace(" ", "").startswith("%s--" % (v))])
+
+        for lazy in [False, True]:
+            with open(edge_file, 'w') as F:
+                F.write(cut)
+            A = Atlas(self.direc, verbose=0, lazy=lazy, cache=False)
+            self.assertTrue(v in A.leaves)
+            _ = A.ZetaIntegral(verbose=0)
+            with open(edge_file, 'w') as F:
+                F.write(edges)
+            delta = A.Refresh(verbose=0)
+            self.assertEqual(delta["removed"], (v,))
+            self.assertEqual(delta["added"], A.tree.Children(v))
+            self.assertEqual(A.ZetaIntegral(verbose=0), Z)
+
+
+# Returns the factors of the integrand I as a dictionary from their printouts
+# to their exponent vectors, leaving out the trivial ones.
+def _factors(I):
+    return {str(f) : tuple(vec) for f, vec in I.list if tuple(vec) != (0, 0)}
+
+
+@needs_atlas
+class IncrementalTest(unittest.TestCase):
+
+    def test_same_integrands(self):
+        from atlasClass import Atlas
+        A = Atlas(ATLAS, verbose=0)
+        B = Atlas(ATLAS, verbose=0, incremental=True)
+        for C, D in zip(A.charts, B.charts):
+            I = C.Integrand()
+            J = D.Integrand()
+            self.assertEqual(_factors(I), _factors(J))
+            self.assertEqual(I.pFactor(), J.pFactor())
+        # Every vertex on the way to a leaf was visited once.
+        labels = set()
+        for l in B.leaves:
+            labels |= set(B.tree.Path(l))
+        self.assertEqual(set(B._node_integrands.keys()), labels)
+
+
+    def test_same_integral(self):
+        from atlasClass import Atlas
+        A = Atlas(ATLAS, verbose=0)
+        B = Atlas(ATLAS, verbose=0, lazy=True, incremental=True)
+        self.assertEqual(B.ZetaIntegral(verbose=0), A.ZetaIntegral(verbose=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
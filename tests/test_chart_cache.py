@@ -0,0 +1,85 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+from support import needs_sage
+
+
+# Stands in for a chart: the cache only needs the atlas and the lattice.
+class _Lattice():
+    def __init__(self, n):
+        self.vertices = list(range(n))
+
+
+class _Chart():
+    def __init__(self, name, n):
+        self.name = name
+        self.atlas = None
+        self.intLat = _Lattice(n)
+
+
+# Writes contents to the file name in direc.
+def _write(direc, name, contents):
+    with open(os.path.join(direc, name), 'w') as F:
+        F.write(contents)
+
+
+@needs_sage
+class ChartCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direc = tempfile.mkdtemp() + "/"
+        _write(self.direc, "Edges", "1--2;\n1--3;\n")
+        _write(self.direc, "Chart2.ssi", "chart two")
+        _write(self.direc, "Chart3.ssi", "chart three")
+
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+
+    def test_key_follows_the_inputs(self):
+        from chartCache import ChartCache
+        key = ChartCache(self.direc).key(2)
+        self.assertEqual(ChartCache(self.direc).key(2), key)
+        self.assertNotEqual(ChartCache(self.direc).key(3), key)
+        self.assertNotEqual(ChartCache(self.direc).key(2, get_lat=False), key)
+        self.assertNotEqual(ChartCache(self.direc, version=1).key(2), key)
+        _write(self.direc, "Chart2.ssi", "chart two, again")
+        self.assertNotEqual(ChartCache(self.direc).key(2), key)
+        _write(self.direc, "Chart2.ssi", "chart two")
+        _write(self.direc, "Edges_2", "1--2;\n")
+        self.assertNotEqual(ChartCache(self.direc).key(2), key)
+
+
+    def test_save_and_load(self):
+        from chartCache import ChartCache
+        cache = ChartCache(self.direc)
+        self.assertEqual(cache.load(2), None)
+        self.assertEqual(cache.vertex_count(2), None)
+        cache.save(2, _Chart("two", 5))
+        self.assertEqual(cache.load(2).name, "two")
+        self.assertEqual(cache.vertex_count(2), 5)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+    def test_changed_chart_misses_and_replaces_the_old_entry(self):
+        from chartCache import ChartCache
+        cache = ChartCache(self.direc)
+        cache.save(2, _Chart("old", 1))
+        _write(self.direc, "Chart2.ssi", "chart two, again")
+        self.assertEqual(cache.load(2), None)
+        cache.save(2, _Chart("new", 1))
+        entries = [f for f in os.listdir(cache.directory) if f.endswith(".sobj")]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(cache.load(2).name, "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
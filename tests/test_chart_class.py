@@ -0,0 +1,167 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_atlas, needs_sage, ATLAS
+
+
+@needs_sage
+class ClassifierTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import SR
+        self.x1, self.x2, self.y = SR.var('x1 x2 y')
+        self.units = [self.x1 + 1, 2*self.x2 - 4]
+        self.non_units = [self.x1 - self.x2, self.x2]
+
+
+    def test_normal_form(self):
+        from sage.all import PolynomialRing, QQ
+        from chartClass import _normal_form
+        P = PolynomialRing(QQ, 'p,x1,x2')
+        x1, x2 = self.x1, self.x2
+        self.assertEqual(_normal_form(-3*x1 + 6*x2, P), _normal_form(x1 - 2*x2, P))
+        self.assertEqual(_normal_form(2*x1 + 2, P), P('x1 + 1'))
+        self.assertEqual(_normal_form(0*x1, P), None)
+        self.assertEqual(_normal_form(self.y, P), None)
+
+
+    def test_lookup(self):
+        from chartClass import _classifier, _lookup
+        x1, x2 = self.x1, self.x2
+        sys_varbs, P, unit_table, non_unit_table = _classifier(self.units, self.non_units)
+        self.assertEqual(sys_varbs, {'x1', 'x2'})
+        self.assertEqual(_lookup(-3*x1 - 3, self.units, P, unit_table), (True, 0))
+        self.assertEqual(_lookup(x2 - 2, self.units, P, unit_table), (True, 1))
+        self.assertEqual(_lookup(x2 - x1, self.non_units, P, non_unit_table), (True, 0))
+        self.assertEqual(_lookup(5*x2, self.non_units, P, non_unit_table), (True, 1))
+        self.assertEqual(_lookup(x1, self.non_units, P, non_unit_table), (False, -1))
+
+
+    # The lookups agree with comparing against every element.
+    def test_agrees_with_is_contained(self):
+        from chartClass import _classifier, _is_contained, _lookup
+        x1, x2 = self.x1, self.x2
+        _, P, unit_table, non_unit_table = _classifier(self.units, self.non_units)
+        for f in [x1 + 1, 7*x1 + 7, x2 - 2, x1 - x2, x2, x1, x1 + x2, x1*x2]:
+            self.assertEqual(_lookup(f, self.units, P, unit_table),
+                _is_contained(f, self.units))
+            self.assertEqual(_lookup(f, self.non_units, P, non_unit_table),
+                _is_contained(f, self.non_units))
+
+
+    def test_simplify_expr(self):
+        from sage.all import SR
+        from chartClass import _classifier, _simplify_expr
+        x1, x2, y = self.x1, self.x2, self.y
+        p, z0, z1 = SR.var('p z0 z1')
+        repl = [z0, z1]
+        expr = (x1 + 1)**2*(x1 - x2)**3*x2*y**2
+        C = _classifier(self.units, self.non_units)
+        f = _simplify_expr(expr, self.units, self.non_units, repl, classifier=C)
+        g = _simplify_expr(expr, self.units, self.non_units, repl)
+        self.assertEqual((f - (p*z0)**3*p*z1*y**2).expand(), 0)
+        self.assertEqual((f - g).expand(), 0)
+
+
+@needs_sage
+class PickleTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import QQ, SR
+        from chartClass import Chart
+        from intLatticeClass import IntLattice
+        x1, x2 = SR.var('x1 x2')
+        L = IntLattice([[x1], [x2]], [x1, x2], [[0, 1]], [[0], [1]])
+        self.C = Chart(QQ, (x1, x2), biratMap=(x1, x1*x2), cone=[(x1, x2)],
+            factor=[x1*x2 - 1], identity="2", intLat=L, jacDet=x1)
+
+
+    # Checks that D is a copy of the chart from setUp.
+    def check_copy(self, D):
+        C = self.C
+        self.assertFalse(hasattr(D, "__dict__"))
+        for k in ["_id", "variables", "birationalMap", "cone", "jacDet",
+            "ambientFactor", "_integralFactor", "atlas"]:
+            self.assertEqual(getattr(D, k), getattr(C, k))
+        self.assertEqual(D.intLat.divisors, C.intLat.divisors)
+        self.assertEqual(D.intLat.vertices, C.intLat.vertices)
+        self.assertIs(D.intLat.chart, D)
+
+
+    def test_pickle(self):
+        import pickle
+        for protocol in [0, 2]:
+            self.check_copy(pickle.loads(pickle.dumps(self.C, protocol)))
+
+
+    def test_sage_pickle(self):
+        from sage.all import dumps, loads
+        self.check_copy(loads(dumps(self.C)))
+
+
+    # Attributes that were never set stay unset.
+    def test_unset_slots(self):
+        import pickle
+        from chartClass import Chart
+        C = Chart.__new__(Chart)
+        C._id = "3"
+        D = pickle.loads(pickle.dumps(C, 2))
+        self.assertEqual(D._id, "3")
+        self.assertFalse(hasattr(D, "cone"))
+
+
+# Returns a chart of the test atlas that is not monomial.
+def _non_monomial_chart():
+    from atlasClass import Atlas
+    A = Atlas(ATLAS, verbose=0, lazy=True, cache=False)
+    for k in range(len(A.charts)):
+        if not A.charts[k].IsMonomial():
+            return A.charts[k]
+
+
+@needs_atlas
+class PoolSubchartsTest(unittest.TestCase):
+
+    def test_pool_matches_serial(self):
+        C = _non_monomial_chart()
+        if C == None:
+            self.skipTest("every chart of the test atlas is monomial")
+        serial = C.Subcharts(verbose=0, jobs=1)
+        pooled = C.Subcharts(verbose=0, jobs=2, recompute=True)
+        self.assertEqual(len(serial), len(pooled))
+        for S, T in zip(serial, pooled):
+            self.assertEqual(S._id, T._id)
+            self.assertEqual(S.variables, T.variables)
+            self.assertEqual(S.birationalMap, T.birationalMap)
+            self.assertEqual(S.cone, T.cone)
+            self.assertEqual(S.jacDet, T.jacDet)
+            self.assertEqual(S._integralFactor, T._integralFactor)
+            self.assertIs(T._parent, C)
+            self.assertIs(T.atlas, C.atlas)
+
+
+@needs_atlas
+class PoolIntegralsTest(unittest.TestCase):
+
+    def test_pool_matches_serial(self):
+        C = _non_monomial_chart()
+        if C == None:
+            self.skipTest("every chart of the test atlas is monomial")
+        serial = C.ZetaIntegral(verbose=0, jobs=1)
+        C.Release()
+        self.assertEqual(C.ZetaIntegral(verbose=0, jobs=2), serial)
+
+
+    def test_atlas_pool_matches_serial(self):
+        from atlasClass import Atlas
+        serial = Atlas(ATLAS, verbose=0).ZetaIntegral(verbose=0, jobs=1)
+        pooled = Atlas(ATLAS, verbose=0).ZetaIntegral(verbose=0, jobs=2)
+        self.assertEqual(pooled, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_atlas, ATLAS
+
+
+class _Lattice():
+    def __init__(self, n):
+        self.vertices = list(range(n))
+
+
+class _Chart():
+    def __init__(self, label):
+        self.label = label
+        self.atlas = None
+        self.intLat = _Lattice(label)
+
+
+# Loads charts whose lattice has label many vertices, and remembers what it 
+# loaded.
+class _Loader():
+    def __init__(self):
+        self.loaded = []
+
+    def __call__(self, label):
+        self.loaded.append(label)
+        return _Chart(label)
+
+
+class _Cache():
+    def __init__(self, counts):
+        self.counts = counts
+
+    def vertex_count(self, label):
+        return self.counts.get(label)
+
+
+class LazyChartsTest(unittest.TestCase):
+
+    def test_charts_load_on_first_use(self):
+        from chartSequence import ChartSequence
+        L = _Loader()
+        S = ChartSequence([2, 3, 5], L)
+        self.assertEqual(L.loaded, [])
+        self.assertEqual(S[1].label, 3)
+        self.assertEqual(S[-1].label, 5)
+        _ = S[1]
+        self.assertEqual(L.loaded, [3, 5])
+        self.assertEqual([C.label for C in S[0:2]], [2, 3])
+
+
+    def test_resident_keeps_the_most_recent(self):
+        from chartSequence import ChartSequence
+        L = _Loader()
+        S = ChartSequence([2, 3, 5], L, resident=2)
+        _ = S[0]
+        _ = S[1]
+        _ = S[0]
+        _ = S[2]
+        self.assertEqual([S.IsLoaded(k) for k in range(3)], [True, False, True])
+
+
+    def test_vertex_counts_without_loading(self):
+        from chartSequence import ChartSequence
+        L = _Loader()
+        S = ChartSequence([2, 3, 5], L, cache=_Cache({3: 3}))
+        self.assertEqual(S.VertexCount(1, load=False), 3)
+        self.assertEqual(S.VertexCount(0, load=False), None)
+        self.assertEqual(L.loaded, [])
+        self.assertEqual(S.VertexCount(0), 2)
+        self.assertEqual(L.loaded, [2])
+
+
+class PopTest(unittest.TestCase):
+
+    def test_pop_forgets_the_chart(self):
+        from chartSequence import ChartSequence
+        L = _Loader()
+        S = ChartSequence([2, 3], L)
+        _ = S[0]
+        self.assertEqual(S.Pop(0).label, 2)
+        self.assertFalse(S.IsLoaded(0))
+        self.assertEqual(S.Pop(1).label, 3)
+        self.assertFalse(S.IsLoaded(1))
+        self.assertEqual(L.loaded, [2, 3])
+
+
+class RelabelTest(unittest.TestCase):
+
+    def test_relabel_keeps_loaded_charts(self):
+        from chartSequence import ChartSequence
+        L = _Loader()
+        S = ChartSequence([2, 3, 5], L)
+        _ = S[0]
+        _ = S[2]
+        S.Relabel([5, 7, 2])
+        self.assertEqual(S.labels, (5, 7, 2))
+        self.assertEqual([S.IsLoaded(k) for k in range(3)], [True, False, True])
+        self.assertEqual([C.label for C in S], [5, 7, 2])
+        self.assertEqual(L.loaded, [2, 5, 7])
+
+
+    def test_relabel_drops_stale_charts(self):
+        from chartSequence import ChartSequence
+        L = _Loader()
+        S = ChartSequence([2, 3], L)
+        self.assertEqual(S.VertexCount(0), 2)
+        self.assertEqual(S.VertexCount(1), 3)
+        S.Relabel([3, 2], keep=lambda l: l != 2, cache=_Cache({}))
+        self.assertEqual([S.IsLoaded(k) for k in range(2)], [True, False])
+        self.assertEqual(S.VertexCount(0, load=False), 3)
+        self.assertEqual(S.VertexCount(1, load=False), None)
+        self.assertEqual(S[1].label, 2)
+        self.assertEqual(L.loaded, [2, 3, 2])
+
+
+@needs_atlas
+class LazyAtlasTest(unittest.TestCase):
+
+    def test_printing_a_lazy_atlas_loads_no_charts(self):
+        from atlasClass import Atlas
+        A = Atlas(ATLAS, verbose=2, lazy=True, cache=False)
+        _ = repr(A)
+        self.assertFalse(any(A.charts.IsLoaded(k) for k in range(len(A.charts))))
+
+
+    # Streaming a lazy atlas leaves no chart in memory.
+    def test_streaming_keeps_no_charts(self):
+        from atlasClass import Atlas
+        A = Atlas(ATLAS, verbose=0, lazy=True)
+        Z = A.ZetaIntegral(verbose=0, stream=True)
+        self.assertFalse(any(A.charts.IsLoaded(k) for k in range(len(A.charts))))
+        self.assertEqual(Z, Atlas(ATLAS, verbose=0).ZetaIntegral(verbose=0))
+
+
+    # Streaming an atlas that is already loaded does not load charts again; 
+    # it releases what was built from them.
+    def test_streaming_a_loaded_atlas(self):
+        from atlasClass import Atlas
+        A = Atlas(ATLAS, verbose=0)
+        charts = A.charts
+        Z = A.ZetaIntegral(verbose=0, stream=True)
+        self.assertIs(A.charts, charts)
+        for C in A.charts:
+            self.assertEqual(C._subcharts, None)
+            self.assertEqual(C._integrand, None)
+        self.assertEqual(Z, Atlas(ATLAS, verbose=0).ZetaIntegral(verbose=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
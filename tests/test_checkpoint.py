@@ -0,0 +1,157 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+from support import copy_atlas, needs_atlas, needs_sage
+
+
+@needs_sage
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direc = tempfile.mkdtemp() + "/"
+
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+
+    def test_key(self):
+        from checkpoint import Checkpoint
+        store = Checkpoint(self.direc)
+        key = store._prefix(2, ("a", "b"))
+        self.assertEqual(Checkpoint(self.direc)._prefix(2, ("a", "b")), key)
+        self.assertNotEqual(store._prefix(3, ("a", "b")), key)
+        self.assertNotEqual(store._prefix((2, 1), ("a", "b")), key)
+        # Every chart on the path from the root counts.
+        self.assertNotEqual(store._prefix(2, ("c", "b")), key)
+        self.assertNotEqual(store._prefix(2, ("a", "c")), key)
+        # So do the parameters of the integrand.
+        LT = Checkpoint(self.direc, params={"lower_triangular": True})
+        UT = Checkpoint(self.direc, params={"lower_triangular": False})
+        self.assertNotEqual(LT._prefix(2, ("a", "b")), key)
+        self.assertNotEqual(LT._prefix(2, ("a", "b")), UT._prefix(2, ("a", "b")))
+
+
+    def test_save_and_load(self):
+        from checkpoint import Checkpoint
+        store = Checkpoint(self.direc)
+        self.assertEqual(store.load(2, ("a",)), None)
+        self.assertEqual(store.status(2, ("a",)), "pending")
+        store.save(2, ("a",), 17)
+        self.assertEqual(Checkpoint(self.direc).load(2, ("a",)), [17])
+        self.assertEqual(store.load(2, ("b",)), None)
+        self.assertEqual(store.status(2, ("a",)), "done")
+
+
+    def test_failures(self):
+        from checkpoint import Checkpoint
+        store = Checkpoint(self.direc)
+        store.fail(2, ("a",), ValueError("no integral"))
+        self.assertEqual(store.status(2, ("a",)), "failed")
+        store.save(2, ("a",), 17)
+        self.assertEqual(store.status(2, ("a",)), "done")
+
+
+    def test_subcharts(self):
+        from checkpoint import Checkpoint
+        store = Checkpoint(self.direc)
+        sub = store.chart(2, ("a",))
+        self.assertEqual(sub.load("2.1"), None)
+        sub.save("2.1", 5)
+        self.assertEqual(store.chart(2, ("a",)).load("2.1"), [5])
+        self.assertEqual(store.chart(2, ("b",)).load("2.1"), None)
+        store.clear()
+        self.assertEqual(sub.load("2.1"), None)
+
+
+    # Clearing the subcharts of one chart leaves everything else alone.
+    def test_clear_subcharts(self):
+        from checkpoint import Checkpoint
+        store = Checkpoint(self.direc)
+        sub = store.chart(2, ("a",))
+        other = store.chart(3, ("a",))
+        store.save(2, ("a",), 11)
+        sub.save("2.1", 5)
+        sub.save("2.2", 6)
+        other.save("3.1", 7)
+        sub.clear()
+        self.assertEqual(sub.load("2.1"), None)
+        self.assertEqual(sub.load("2.2"), None)
+        self.assertEqual(other.load("3.1"), [7])
+        self.assertEqual(store.load(2, ("a",)), [11])
+        Checkpoint(self.direc + "missing/").chart(2, ("a",)).clear()
+
+
+    # Another process may make the store directory first.
+    def test_existing_directory(self):
+        from checkpoint import Checkpoint
+        store = Checkpoint(self.direc)
+        os.makedirs(store.directory)
+        store.save(2, ("a",), 17)
+        store.fail(3, ("a",), ValueError("no integral"))
+        self.assertEqual(store.load(2, ("a",)), [17])
+
+
+@needs_atlas
+class AtlasCheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direc = copy_atlas()
+
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+
+    def test_resume(self):
+        from atlasClass import Atlas
+        A = Atlas(self.direc, verbose=0, cache=False)
+        Z = A.ZetaIntegral(verbose=0, checkpoint=True)
+        self.assertEqual(A.CheckpointStatus()["done"], A.leaves)
+        B = Atlas(self.direc, verbose=0, lazy=True, cache=False)
+        self.assertEqual(B.ZetaIntegral(verbose=0, checkpoint=True), Z)
+        self.assertFalse(any(B.charts.IsLoaded(k) for k in range(len(B.charts))))
+
+
+    # Recomputing does not use the saved integrals of the subcharts.
+    def test_recompute(self):
+        from atlasClass import Atlas
+        A = Atlas(self.direc, verbose=0, cache=False)
+        Z = A.ZetaIntegral(verbose=0, checkpoint=True)
+        hashes = A._path_hashes(A.leaves)
+        for l in A.leaves:
+            A.checkpoint.chart(l, hashes[l]).save("%s.0" % (l), 0)
+        self.assertEqual(A.ZetaIntegral(verbose=0, checkpoint=True, 
+            recompute=True), Z)
+        for l in A.leaves:
+            self.assertEqual(A.checkpoint.chart(l, hashes[l]).load("%s.0" % (l)), 
+                None)
+
+
+    def test_integrand_parameters(self):
+        from atlasClass import Atlas
+        A = Atlas(self.direc, verbose=0, cache=False)
+        _ = A.ZetaIntegral(verbose=0, checkpoint=True)
+        B = Atlas(self.direc, lower_triangular=False, verbose=0, lazy=True,
+            cache=False)
+        self.assertEqual(B.CheckpointStatus()["pending"], B.leaves)
+
+
+    def test_changed_root(self):
+        from atlasClass import Atlas
+        A = Atlas(self.direc, verbose=0, cache=False)
+        _ = A.ZetaIntegral(verbose=0, checkpoint=True)
+        with open(self.direc + "Chart1.ssi", 'a') as F:
+            F.write("\n")
+        self.assertEqual(A.CheckpointStatus()["pending"], A.leaves)
+
+
+if __name__ == "__main__":
+    unittest.main()
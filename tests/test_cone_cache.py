@@ -0,0 +1,152 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+from support import needs_sage
+
+# The cone x0 >= 0, x1 >= 2*x0, x2 >= 0, x2 >= 1 - x0 in 3 dimensions.
+_CONE = [(0, 1, 0, 0), (0, -2, 1, 0), (0, 0, 0, 1), (-1, 1, 0, 1)]
+
+
+# Returns the rows of cone_mat with the coordinates permuted: the jth column of
+# the result is column perm[j] of cone_mat.
+def _permute(cone_mat, perm):
+    return [tuple([r[0]] + [r[j + 1] for j in perm]) for r in cone_mat]
+
+
+# Undoes _permute.
+def _unpermute(cone_mat, perm):
+    rows = []
+    for r in cone_mat:
+        row = [r[0]] + [0]*len(perm)
+        for j in range(len(perm)):
+            row[perm[j] + 1] = r[j + 1]
+        rows.append(tuple(row))
+    return rows
+
+
+@needs_sage
+class CanonicalConeTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        from sage.all import Polyhedron
+        from coneCache import _canonical_cone
+        canon, perm = _canonical_cone(_CONE, 3)
+        self.assertEqual(sorted(perm), [0, 1, 2])
+        self.assertEqual(Polyhedron(ieqs=_unpermute(canon, perm), ambient_dim=3),
+            Polyhedron(ieqs=_CONE, ambient_dim=3))
+
+
+    def test_permuted_coordinates(self):
+        from coneCache import _canonical_cone
+        canon, perm = _canonical_cone(_CONE, 3)
+        for sigma in [[1, 0, 2], [2, 0, 1], [2, 1, 0]]:
+            other, tau = _canonical_cone(_permute(_CONE, sigma), 3)
+            self.assertEqual(other, canon)
+            self.assertEqual([sigma[j] for j in tau], perm)
+
+
+    # Redundant and scaled rows, and equations, do not change the form.
+    def test_same_polyhedron(self):
+        from coneCache import _canonical_cone
+        canon, _ = _canonical_cone(_CONE, 3)
+        more = _CONE + [(0, 3, 0, 0), (0, 1, 1, 0), (0, 0, 0, 2)]
+        self.assertEqual(_canonical_cone(more, 3)[0], canon)
+        line, _ = _canonical_cone([(0, 1, -1), (0, -1, 1)], 2)
+        self.assertEqual(len(line), 2)
+        self.assertEqual(_canonical_cone([(0, 2, -2), (0, -1, 1)], 2)[0], line)
+
+
+@needs_sage
+class ConeCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direc = tempfile.mkdtemp() + "/"
+
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+
+    def test_key(self):
+        from coneCache import ConeCache, _canonical_cone
+        canon, _ = _canonical_cone(_CONE, 3)
+        key = ConeCache().key(canon, 3)
+        self.assertEqual(ConeCache(self.direc).key(canon, 3), key)
+        self.assertNotEqual(ConeCache().key(canon[1:], 3), key)
+        self.assertNotEqual(ConeCache().key(canon, 4), key)
+
+
+    def test_memory(self):
+        from coneCache import ConeCache
+        cache = ConeCache()
+        self.assertEqual(cache.load("k"), None)
+        cache.save("k", 17)
+        self.assertEqual(cache.load("k"), [17])
+        cache.clear()
+        self.assertEqual(cache.load("k"), None)
+
+
+    def test_disk(self):
+        from coneCache import ConeCache
+        direc = self.direc + "cones"
+        ConeCache(direc).save("k", 17)
+        self.assertEqual(ConeCache(direc).load("k"), [17])
+        self.assertEqual(ConeCache(direc).load("j"), None)
+        ConeCache(direc).clear()
+        self.assertEqual(ConeCache(direc).load("k"), None)
+
+
+    # Another process may make the directory first.
+    def test_existing_directory(self):
+        from coneCache import ConeCache
+        cache = ConeCache(self.direc)
+        self.assertTrue(os.path.isdir(self.direc))
+        cache.save("k", 17)
+        self.assertEqual(ConeCache(self.direc).load("k"), [17])
+
+
+    # Writers of the same entry use their own temporary files, and leave none
+    # behind.
+    def test_same_entry(self):
+        from coneCache import ConeCache
+        first, second = ConeCache(self.direc), ConeCache(self.direc)
+        first.save("k", 17)
+        second.save("k", 17)
+        self.assertEqual(ConeCache(self.direc).load("k"), [17])
+        self.assertEqual(os.listdir(self.direc), ["Cone-k.sobj"])
+
+
+    # If the rename fails because another writer already put the entry there, 
+    # the save still succeeds.
+    def test_concurrent_winner(self):
+        import coneCache
+        import chartCache
+        cache = coneCache.ConeCache(self.direc)
+        cache.save("k", 17)
+        rename = chartCache._os.rename
+        def fail(src, dst):
+            raise OSError("entry is there already")
+        chartCache._os.rename = fail
+        try:
+            cache.save("k", 17)
+        finally:
+            chartCache._os.rename = rename
+        self.assertEqual(os.listdir(self.direc), ["Cone-k.sobj"])
+        self.assertEqual(coneCache.ConeCache(self.direc).load("k"), [17])
+        chartCache._os.rename = fail
+        try:
+            self.assertRaises(OSError, cache.save, "j", 3)
+        finally:
+            chartCache._os.rename = rename
+        self.assertEqual(os.listdir(self.direc), ["Cone-k.sobj"])
+
+
+if __name__ == "__main__":
+    unittest.main()
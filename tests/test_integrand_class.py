@@ -0,0 +1,137 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+
+# Returns the factors of the integrand I as a dictionary from their printouts
+# to their exponent vectors, leaving out the trivial ones.
+def _factors(I):
+    return {str(f) : tuple(vec) for f, vec in I.list if tuple(vec) != (0, 0)}
+
+
+@needs_sage
+class MonomialPullbackTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import SR
+        from integrandClass import Integrand
+        self.x1, self.x2, self.x3 = SR.var('x1 x2 x3')
+        self.y1, self.y2, self.y3 = SR.var('y1 y2 y3')
+        self.p = SR.var('p')
+        x1, x2, x3 = self.x1, self.x2, self.x3
+        self.integrand = Integrand([[x1, (1, 0)], [x2, (0, 1)], [x3, (2, 1)]])
+
+
+    # Pulls the integrand back the way _get_integrand does when the map is not
+    # monomial: substitute, then factor and group.
+    def symbolic(self, images, jacDet, integral_factor):
+        from integrandClass import Integrand
+        I = self.integrand
+        subst = dict(zip([self.x1, self.x2, self.x3], images))
+        mapped = [[f.subs(subst), vec] for f, vec in I.list]
+        return Integrand(mapped + [[jacDet, (1, 0)]],
+            factor=I.factor + [[integral_factor, [1, 0]]])
+
+
+    def check(self, images, jacDet, integral_factor=1):
+        from integrandClass import _get_integrand
+        I = _get_integrand((self.x1, self.x2, self.x3), images, self.integrand,
+            jacDet, integral_factor)
+        J = self.symbolic(images, jacDet, integral_factor)
+        self.assertEqual(_factors(I), _factors(J))
+        self.assertEqual(I.pFactor(), J.pFactor())
+
+
+    def test_matches_symbolic(self):
+        y1, y2, y3, p = self.y1, self.y2, self.y3, self.p
+        self.check((y1, y1*y2, y1*y3), y1**2)
+        self.check((y1*y2*y3, y2, y3**2), y1*y3)
+        self.check((y1 + y2, y2, y3), 2*y1)
+        self.check((-y1, y1**3*y2, y3), -y1**3, integral_factor=p - 1)
+
+
+    # The powers of p move outside the integral.
+    def test_p_powers(self):
+        y1, y2, y3, p = self.y1, self.y2, self.y3, self.p
+        self.check((p*y1, p**2*y1*y2, y3), p**3*y1)
+
+
+    def test_only_monomials(self):
+        from integrandClass import _monomial_pullback
+        y1, y2, y3 = self.y1, self.y2, self.y3
+        vecs = [(1, 0), (0, 1), (2, 1)]
+        self.assertEqual(_monomial_pullback((y1 + y2, y2, y3), vecs, y1), None)
+        self.assertEqual(_monomial_pullback((2*y1, y2, y3), vecs, y1), None)
+        self.assertEqual(_monomial_pullback((y1, y2, y3), vecs, 1/y1), None)
+        terms, E = _monomial_pullback((y1, y1*y2, y3), vecs, y1)
+        self.assertEqual({str(terms[k]) : tuple(E[k]) for k in range(len(terms))},
+            {'y1': (2, 1), 'y2': (0, 1), 'y3': (2, 1)})
+
+
+    # The exponent vectors are kept as the rows of a matrix, in the order of
+    # the factors.
+    def test_exponents(self):
+        from integrandClass import _get_integrand
+        y1, y2, y3, p = self.y1, self.y2, self.y3, self.p
+        I = _get_integrand((self.x1, self.x2, self.x3), (p*y1, y1*y2, y3), 
+            self.integrand, y1, 1)
+        self.assertEqual(I.exponents.shape, (len(I.list), 2))
+        for k in range(len(I.list)):
+            self.assertEqual(tuple(I.exponents[k]), tuple(I.list[k][1]))
+        self.assertEqual(self.integrand.exponents.tolist(), 
+            [[1, 0], [0, 1], [2, 1]])
+
+
+@needs_sage
+class PullBackTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import SR
+        self.x1, self.x2 = SR.var('x1 x2')
+        self.y1, self.y2 = SR.var('y1 y2')
+        self.p = SR.var('p')
+
+
+    # Pulls the factors back by substituting, then factoring and grouping.
+    def symbolic(self, factors, images):
+        from globalVars import _is_int
+        from integrandClass import _clean_integrand
+        subst = {self.x1 : images[0], self.x2 : images[1]}
+        return _clean_integrand([[f if _is_int(f) else f.subs(subst), vec] 
+            for f, vec in factors])
+
+
+    def check(self, factors, images):
+        from integrandClass import _pull_back
+        pulled = _pull_back(factors, (self.x1, self.x2), images)
+        self.assertEqual({str(f) : tuple(v) for f, v in pulled}, 
+            {str(f) : tuple(v) for f, v in self.symbolic(factors, images)})
+
+
+    def test_monomial_images(self):
+        x1, x2, y1, y2, p = self.x1, self.x2, self.y1, self.y2, self.p
+        self.check([[x1, (1, 0)], [x2, (-2, 1)]], (y1, y1*y2))
+        self.check([[x1, (1, 0)], [x2, (-2, 1)], [3, (1, 0)]], (p*y1, -y2**2))
+        self.check([[x1*x2, (1, 1)]], (y1*y2, y2))
+
+
+    def test_other_images(self):
+        x1, x2, y1, y2 = self.x1, self.x2, self.y1, self.y2
+        self.check([[x1, (1, 0)], [x2, (-2, 1)]], (y1 + y2, y1*y2))
+        self.check([[x1 + x2, (1, 0)]], (y1, y1*y2))
+        self.check([[x1, (1, 0)]], (2*y1, y2))
+
+
+    def test_wrong_number_of_images(self):
+        from integrandClass import _pull_back
+        with self.assertRaises(ValueError):
+            _pull_back([[self.x1, (1, 0)]], (self.x1, self.x2), (self.y1,))
+
+
+if __name__ == "__main__":
+    unittest.main()
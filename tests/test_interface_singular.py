@@ -0,0 +1,81 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage, needs_atlas, ATLAS, atlas_chart_labels
+
+
+@needs_sage
+class SplitPayloadTest(unittest.TestCase):
+
+    def test_fields_and_repeats(self):
+        from interfaceSingular import _split_payload
+        out = "\n".join(["@@SZ@@ring", "// coefficients: QQ", "@@SZ@@exDiv", 
+            "x", "@@SZ@@exDiv", "y,", "z", "@@SZ@@focus", "0", ""])
+        fields = _split_payload(out)
+        self.assertEqual(fields["ring"], ["// coefficients: QQ"])
+        self.assertEqual(fields["exDiv"], ["x", "y,\nz"])
+        self.assertEqual(fields["focus"], ["0"])
+
+
+    def test_output_before_the_first_field_is_ignored(self):
+        from interfaceSingular import _split_payload
+        fields = _split_payload("// ** loaded\n@@SZ@@cent\nx")
+        self.assertEqual(fields, {"cent": ["x"]})
+
+
+@needs_atlas
+class PayloadAgainstSeparateCallsTest(unittest.TestCase):
+
+    # One round trip gives the same printouts as asking for each field.
+    def test_payload_matches_separate_calls(self):
+        from interfaceSingular import _singular_chart_fields, _eval_chart_fields
+        from interfaceSingular import _parse_chart_fields
+        from chartCache import _num_str
+        from singularSession import _get_session
+        direc = ATLAS if ATLAS[-1] != "/" else ATLAS[:-1]
+        pdir = direc[:direc.rindex("/") + 1] if "/" in direc else "./"
+        session = _get_session()
+        label = atlas_chart_labels(direc)[-1]
+        num = _num_str(label)
+        payload = _singular_chart_fields(num, direc, pdir, get_lat=False, 
+            verbose=0, session=session)
+        r_var = session.new_name()
+        iv = session.new_name()
+        if "." in num:
+            decl = "intvec %s=%s;" % (iv, num.replace(".", ","))
+        else:
+            decl = "int %s=%s;" % (iv, num)
+        _ = session.eval('%s\ndef %s = load_Chart2(%s, "%s");\nsetring %s;' % (decl, r_var, iv, direc, r_var))
+        separate = _eval_chart_fields(r_var, session=session)
+        data_p = _parse_chart_fields(payload, verbose=0)
+        data_s = _parse_chart_fields(separate, verbose=0)
+        for k in data_p:
+            self.assertEqual(data_p[k], data_s[k], k)
+
+
+    # Every batch of kills takes the ring of the last chart, which is the 
+    # basering, with it. Loading charts has to keep working after that.
+    def test_loading_across_kill_batches(self):
+        from interfaceSingular import _singular_chart_fields
+        from chartCache import _num_str
+        from globalVars import _KILL_BATCH
+        from singularSession import _get_session
+        direc = ATLAS if ATLAS[-1] != "/" else ATLAS[:-1]
+        pdir = direc[:direc.rindex("/") + 1] if "/" in direc else "./"
+        session = _get_session()
+        num = _num_str(atlas_chart_labels(direc)[-1])
+        load = lambda: _singular_chart_fields(num, direc, pdir, get_lat=False,
+            verbose=0, session=session)
+        first = load()
+        kills = session.Counts()["kills"]
+        for _ in range(_KILL_BATCH):
+            self.assertEqual(load(), first)
+        self.assertTrue(session.Counts()["kills"] > kills)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Run with Sage from the directory containing SingularZeta:
+#   sage -python -m unittest discover -s SingularZeta/tests -t SingularZeta
+
+import os
+import subprocess
+import sys
+import unittest
+
+_PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import sage.all
+    _HAS_SAGE = True
+except ImportError:
+    _HAS_SAGE = False
+
+
+# Runs code in a fresh Python process next to the package, with the given 
+# value of SINGULARZETA_LAZY, and returns the last line it prints.
+def _run(code, lazy):
+    env = dict(os.environ)
+    env["SINGULARZETA_LAZY"] = lazy
+    name = os.path.basename(_PKG_DIR)
+    out = subprocess.check_output([sys.executable, "-c", code % {"pkg": name}],
+        cwd=os.path.dirname(_PKG_DIR), env=env)
+    return out.decode().strip().split("\n")[-1]
+
+
+@unittest.skipUnless(_HAS_SAGE, "needs Sage")
+class LazyStartTest(unittest.TestCase):
+
+    def test_lazy_import_skips_sage_all(self):
+        code = "import sys; import %(pkg)s; print('sage.all' in sys.modules)"
+        self.assertEqual(_run(code, "1"), "False")
+
+
+    def test_lazy_names_load_on_access(self):
+        code = "import sys; import %(pkg)s as S; A = S.Atlas; print('%%s %%s' %% ('sage.all' in sys.modules, A.__name__))"
+        self.assertEqual(_run(code, "1"), "True Atlas")
+
+
+    def test_eager_and_lazy_export_the_same_names(self):
+        code = "import %(pkg)s as S; print(sorted(n for n in S.__all__ if hasattr(S, n)))"
+        self.assertEqual(_run(code, "0"), _run(code, "1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+from support import needs_sage, needs_atlas, ATLAS
+
+
+class _Expect():
+    def __init__(self, alive):
+        self.alive = alive
+
+    def isalive(self):
+        return self.alive
+
+
+class _Singular():
+    def __init__(self, alive=True):
+        self._expect = _Expect(alive)
+
+    def quit(self):
+        pass
+
+
+@needs_sage
+class LoadRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        import parallel
+        self.parallel = parallel
+        self.saved = (parallel._cached_load, parallel._start_singular, 
+            parallel._worker_singular[0])
+        self.starts = []
+        def start():
+            self.starts.append(1)
+            parallel._worker_singular[0] = _Singular()
+        parallel._start_singular = start
+        parallel._worker_singular[0] = _Singular()
+
+
+    def tearDown(self):
+        P = self.parallel
+        P._cached_load, P._start_singular, P._worker_singular[0] = self.saved
+
+
+    # _cached_load raises the errors in order, then returns "chart".
+    def _fail_with(self, errors):
+        calls = []
+        def load(*args, **kwargs):
+            calls.append(1)
+            if len(errors) > 0:
+                raise errors.pop(0)
+            return "chart"
+        self.parallel._cached_load = load
+        return calls
+
+
+    def test_chart_errors_are_not_retried(self):
+        calls = self._fail_with([IOError("no such chart")])
+        with self.assertRaises(IOError):
+            self.parallel._load_chart_worker((2, "atlas/", None, True, 2, 2))
+        self.assertEqual((len(calls), len(self.starts)), (1, 0))
+
+
+    def test_dead_singular_is_restarted(self):
+        from pexpect import EOF
+        calls = self._fail_with([EOF("gone")])
+        C = self.parallel._load_chart_worker((2, "atlas/", None, True, 2, 2))
+        self.assertEqual(C, "chart")
+        self.assertEqual((len(calls), len(self.starts)), (2, 1))
+
+
+    def test_restart_drops_the_old_session(self):
+        from singularSession import _get_session, _sessions
+        old = self.parallel._worker_singular[0]
+        _ = _get_session(old)
+        self.parallel._restart_singular()
+        self.assertFalse(id(old) in _sessions)
+
+
+    def test_failed_singular_is_detected(self):
+        P = self.parallel
+        P._worker_singular[0] = _Singular(alive=True)
+        self.assertFalse(P._singular_failed(ValueError()))
+        P._worker_singular[0] = _Singular(alive=False)
+        self.assertTrue(P._singular_failed(ValueError()))
+
+
+@needs_sage
+class MakeDirectoryTest(unittest.TestCase):
+
+    def test_existing_directory_is_fine(self):
+        from chartCache import _make_directory
+        direc = tempfile.mkdtemp()
+        try:
+            _make_directory(direc + "/a/b")
+            _make_directory(direc + "/a/b")
+            self.assertTrue(os.path.isdir(direc + "/a/b"))
+        finally:
+            shutil.rmtree(direc)
+
+
+@needs_atlas
+class ParallelLoadTest(unittest.TestCase):
+
+    def test_parallel_load_matches_serial(self):
+        from atlasClass import Atlas
+        serial = Atlas(ATLAS, verbose=0, jobs=1)
+        parallel = Atlas(ATLAS, verbose=0, jobs=2)
+        self.assertEqual(len(serial.charts), len(parallel.charts))
+        for C, D in zip(serial.charts, parallel.charts):
+            self.assertEqual(C._id, D._id)
+            self.assertEqual(C.variables, D.variables)
+            self.assertEqual(C.cone, D.cone)
+
+
+if __name__ == "__main__":
+    unittest.main()
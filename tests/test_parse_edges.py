@@ -0,0 +1,131 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+import support
+
+# The tree
+#
+#         1
+#       /   \
+#      2     3
+#     / \     \
+#    4   5   (6,1)
+#             /   \
+#         (6,2)   (6,3)
+#                   |
+#                 (6,4)
+#
+_EDGES = [(1, 2), (1, 3), (2, 4), (2, 5), (3, [6, 1]), ([6, 1], [6, 2]),
+    ([6, 1], [6, 3]), ([6, 3], [6, 4])]
+
+
+class BlowupTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        from parseEdges import BlowupTree
+        self.tree = BlowupTree(_EDGES)
+
+
+    def test_labels(self):
+        T = self.tree
+        self.assertEqual(T.labels, (1, 2, 3, 4, 5, (6, 1), (6, 2), (6, 3), (6, 4)))
+        self.assertEqual(len(T), 9)
+        self.assertTrue((6, 2) in T)
+        self.assertTrue([6, 2] in T)
+        self.assertTrue(4 in T)
+        self.assertFalse(6 in T)
+
+
+    def test_structure(self):
+        T = self.tree
+        self.assertEqual(T.Children(1), (2, 3))
+        self.assertEqual(T.Children((6, 1)), ((6, 2), (6, 3)))
+        self.assertEqual(T.Parent(1), None)
+        self.assertEqual(T.Parent(5), 2)
+        self.assertEqual(T.Parent((6, 4)), (6, 3))
+        self.assertEqual(T.Depth(1), 0)
+        self.assertEqual(T.Depth(5), 2)
+        self.assertEqual(T.Depth((6, 4)), 4)
+
+
+    def test_leaves(self):
+        T = self.tree
+        self.assertEqual(T.Leaves(), (4, 5, (6, 2), (6, 4)))
+        self.assertTrue(T.IsLeaf(4))
+        self.assertFalse(T.IsLeaf(2))
+        self.assertFalse(T.IsLeaf((6, 3)))
+
+
+    def test_paths(self):
+        T = self.tree
+        self.assertEqual(T.Path(1), (1,))
+        self.assertEqual(T.Path(5), (1, 2, 5))
+        self.assertEqual(T.Path((6, 4)), (1, 3, (6, 1), (6, 3), (6, 4)))
+        self.assertTrue(T.IsAncestor(1, 5))
+        self.assertTrue(T.IsAncestor(5, 5))
+        self.assertFalse(T.IsAncestor(5, 1))
+        self.assertFalse(T.IsAncestor(3, 4))
+        self.assertTrue(T.IsAncestor((6, 1), (6, 4)))
+        self.assertFalse(T.IsAncestor((6, 2), (6, 4)))
+
+
+    def test_edge_helpers(self):
+        from parseEdges import _get_leaves, _get_total_charts, _get_vertex_labels
+        edges = [(1, 2), (1, 3), (3, 4)]
+        self.assertEqual(_get_vertex_labels(edges), [1, 2, 3, 4])
+        self.assertEqual(_get_total_charts(edges), 4)
+        self.assertEqual(_get_leaves(edges), (2, 4))
+        self.assertEqual(_get_total_charts([]), 1)
+
+
+    # Chart ids are the chart numbers used in file names.
+    def test_id_labels(self):
+        from parseEdges import _id_label
+        T = self.tree
+        self.assertEqual(_id_label("4"), 4)
+        self.assertEqual(_id_label(4), 4)
+        self.assertEqual(_id_label("6.3"), (6, 3))
+        self.assertTrue(_id_label("6.3") in T)
+        self.assertEqual(T.Path(_id_label("6.3")), (1, 3, (6, 1), (6, 3)))
+        self.assertEqual(_id_label("6.3.1"), None)
+        self.assertEqual(_id_label(None), None)
+        self.assertEqual(_id_label("x"), None)
+
+
+class ParseEdgesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.direc = tempfile.mkdtemp()
+        with open(os.path.join(self.direc, "Edges"), 'w') as F:
+            F.write("graph G{\n1--2;\n1--3;\n3--4;\n}\n")
+        with open(os.path.join(self.direc, "Edges_4"), 'w') as F:
+            F.write("graph G{\n1--2;\n1--3;\n}\n")
+
+
+    def tearDown(self):
+        shutil.rmtree(self.direc)
+
+
+    def test_version_1(self):
+        from parseEdges import _parse_edges
+        edges = _parse_edges(self.direc)
+        self.assertEqual(list(edges), [(1, 2), (1, 3), (3, 4)])
+
+
+    def test_version_2(self):
+        from parseEdges import _blowup_tree
+        T = _blowup_tree(self.direc, version=2)
+        self.assertEqual(T.labels, (1, 2, 3, (4, 1), (4, 2), (4, 3)))
+        self.assertEqual(T.Leaves(), (2, (4, 2), (4, 3)))
+        self.assertEqual(T.Path((4, 3)), (1, 3, (4, 1), (4, 3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
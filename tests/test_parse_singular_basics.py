@@ -0,0 +1,70 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+# The printout of the Singular list [[1, 2], x(1)^2-1, [[3]]].
+_NESTED = """[1]:
+   [1]:
+      1
+   [2]:
+      2
+[2]:
+   x(1)^2-1
+[3]:
+   [1]:
+      [1]:
+         3"""
+
+
+@needs_sage
+class ParseListTest(unittest.TestCase):
+
+    def test_nested(self):
+        from sage.all import SR
+        from parseSingularBasics import _parse_list
+        L = _parse_list(_NESTED.split("\n"))
+        self.assertEqual(len(L), 3)
+        self.assertEqual(L[0], [1, 2])
+        self.assertEqual((L[1] - (SR.var('x1')**2 - 1)).expand(), 0)
+        self.assertEqual(L[2], [[3]])
+
+
+    def test_iterable_input(self):
+        from parseSingularBasics import _parse_list, _iter_lines
+        lines = _NESTED.split("\n")
+        self.assertEqual(_parse_list(iter(lines)), _parse_list(lines))
+        self.assertEqual(_parse_list(_iter_lines(_NESTED)), _parse_list(lines))
+
+
+    def test_not_a_list(self):
+        from parseSingularBasics import _parse_list
+        self.assertEqual(_parse_list(["1,2,", "3"], var_expr=False), (1, 2, 3))
+        self.assertEqual(_parse_list("7"), 7)
+
+
+    def test_ring(self):
+        from sage.all import PolynomialRing, QQ, SR
+        from parseSingularBasics import _parse_list
+        P = PolynomialRing(QQ, 'x1')
+        L = _parse_list(_NESTED.split("\n"), ring=P)
+        self.assertEqual(L[1], P.gen()**2 - 1)
+        self.assertEqual(L[1].parent(), P)
+        # Variables outside the ring fall back on the Symbolic Ring.
+        y = _parse_list(["y(2)"], ring=P)
+        self.assertEqual(y.parent(), SR)
+
+
+    def test_iter_lines(self):
+        from parseSingularBasics import _iter_lines
+        s = "a\n\nb\nc"
+        self.assertEqual(list(_iter_lines(s)), s.split("\n"))
+        self.assertEqual(list(_iter_lines("")), [""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+
+@needs_sage
+class ExprToPolyTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import PolynomialRing, QQ
+        self.P = PolynomialRing(QQ, 'x1,x2,y')
+        self.x1, self.x2, self.y = self.P.gens()
+
+
+    def test_polynomial(self):
+        from parseSingularExpr import _expr_to_poly
+        x1, x2, y = self.x1, self.x2, self.y
+        f = _expr_to_poly("x(1)^2*x(2)-3*y+2", self.P)
+        self.assertEqual(f, x1**2*x2 - 3*y + 2)
+        self.assertEqual(f.parent(), self.P)
+
+
+    def test_signs_and_rationals(self):
+        from sage.all import QQ
+        from parseSingularExpr import _expr_to_poly
+        x1, y = self.x1, self.y
+        self.assertEqual(_expr_to_poly("-x(1)", self.P), -x1)
+        self.assertEqual(_expr_to_poly("1/2*x(1)-2/3", self.P),
+            QQ(1)/2*x1 - QQ(2)/3)
+        self.assertEqual(_expr_to_poly("2^3*y", self.P), 8*y)
+        self.assertEqual(_expr_to_poly("y-y", self.P), 0)
+        self.assertEqual(_expr_to_poly("0", self.P), 0)
+
+
+    def test_agrees_with_symbolic(self):
+        from sage.all import SR
+        from parseSingularExpr import _expr_to_poly, _expr_to_tup
+        for s in ["x(1)^2*x(2)-3*y+2", "-x(2)+x(1)*y^4", "7", "-y^2"]:
+            self.assertEqual(SR(_expr_to_poly(s, self.P)),
+                SR(_expr_to_tup(s)).expand())
+
+
+    def test_module_components(self):
+        from parseSingularExpr import _expr_to_poly
+        x1, y = self.x1, self.y
+        t = _expr_to_poly("x(1)*gen(2)+y*gen(1)-gen(2)", self.P)
+        self.assertEqual(t, (y, x1 - 1))
+        self.assertEqual(_expr_to_poly("gen(1)+x(1)*gen(2)", self.P), (1, x1))
+        self.assertEqual(_expr_to_poly("-gen(1)", self.P), (-1,))
+        self.assertEqual(_expr_to_poly("2*gen(2)", self.P), (0, 2))
+
+
+    def test_univariate(self):
+        from sage.all import PolynomialRing, QQ
+        from parseSingularExpr import _expr_to_poly
+        R = PolynomialRing(QQ, 'p')
+        p = R.gen()
+        self.assertEqual(_expr_to_poly("p^3-2*p+1", R), p**3 - 2*p + 1)
+
+
+    def test_unknown_input(self):
+        from parseSingularExpr import _expr_to_poly
+        self.assertRaises(KeyError, _expr_to_poly, "z+1", self.P)
+        self.assertRaises(ValueError, _expr_to_poly, "x(1)+#", self.P)
+
+
+    def test_to_symbolic(self):
+        from sage.all import SR
+        from parseSingularExpr import _expr_to_poly, _to_symbolic
+        f = _expr_to_poly("x(1)^2-y^2", self.P)
+        g = _to_symbolic(f, factor=True)
+        self.assertEqual(g.parent(), SR)
+        self.assertEqual((g - SR(f)).expand(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
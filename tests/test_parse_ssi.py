@@ -0,0 +1,73 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage, needs_atlas, ATLAS, atlas_chart_labels
+
+# The ring QQ[x, y] with ordering (dp, C), followed by the polynomial x + 3*y^2.
+_RING_AND_POLY = "15 0 2 1 x 1 y 2 9 1 2 4 0 0 0 6 2 4 1 0 1 0 4 3 0 0 2"
+
+_RING_PRINTOUT = "\n".join([
+    "// coefficients: QQ",
+    "// number of vars : 2",
+    "//        block   1 : ordering dp",
+    "//                  : names    x y",
+    "//        block   2 : ordering C"])
+
+
+@needs_sage
+class SsiDecodeTest(unittest.TestCase):
+
+    def test_ring_printout_matches_singular(self):
+        from parseSsi import _read_ssi, _ring_to_str
+        _, R = _read_ssi(_RING_AND_POLY)
+        self.assertEqual(_ring_to_str(R), _RING_PRINTOUT)
+
+
+    def test_ring_printout_parses(self):
+        from parseSsi import _read_ssi, _ring_to_str
+        from parseSingularBasics import _parse_printout
+        from sage.all import QQ
+        _, R = _read_ssi(_RING_AND_POLY)
+        coeff, varbs = _parse_printout(_ring_to_str(R))
+        self.assertEqual(coeff, QQ)
+        self.assertEqual([str(x) for x in varbs], ["x", "y"])
+
+
+    def test_poly_printout(self):
+        from parseSsi import _read_ssi, _poly_to_str
+        objs, _ = _read_ssi(_RING_AND_POLY)
+        self.assertEqual(_poly_to_str(objs[0]), "x+3*y^2")
+
+
+@needs_atlas
+class SsiAgainstSingularTest(unittest.TestCase):
+
+    # Every chart read without Singular has the same data as through Singular.
+    def test_native_matches_singular(self):
+        from interfaceSingular import _parse_chart_payload, _singular_chart_fields
+        from parseSsi import _read_chart_ssi
+        from chartCache import _num_str
+        direc = ATLAS if ATLAS[-1] != "/" else ATLAS[:-1]
+        pdir = direc[:direc.rindex("/") + 1] if "/" in direc else "./"
+        keys = ["coefficients", "variables", "factor", "biratMap", "cent", 
+            "cone", "exDivs", "jacDet", "lastMap", "focus"]
+        for label in atlas_chart_labels(direc):
+            num = _num_str(label)
+            native = _read_chart_ssi(num, direc)
+            singular = _singular_chart_fields(num, direc, pdir, verbose=0)
+            self.assertEqual(native["ring"], singular["ring"])
+            data_n, lat_n = _parse_chart_payload(native, verbose=0)
+            data_s, lat_s = _parse_chart_payload(singular, verbose=0)
+            for k in keys:
+                self.assertEqual(data_n[k], data_s[k], "%s of Chart %s" % (k, num))
+            for attr in ["components", "divisors", "edges", "vertices"]:
+                self.assertEqual(getattr(lat_n, attr), getattr(lat_s, attr), 
+                    "%s of the lattice of Chart %s" % (attr, num))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+
+@needs_sage
+class PolynomialBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import SR
+        self.p, self.x1, self.x2 = SR.var('p x1 x2')
+
+
+    def test_backend_ring(self):
+        from polynomialBackend import _backend_ring
+        P = _backend_ring([self.x1, self.x2])
+        self.assertEqual(P.variable_names(), ('p', 'x1', 'x2'))
+        self.assertIs(_backend_ring([self.x1, self.p, self.x2]), P)
+        self.assertEqual(_backend_ring([]).variable_names(), ('p',))
+
+
+    def test_to_backend(self):
+        from sage.all import SR
+        from polynomialBackend import _backend_ring, _to_backend
+        P = _backend_ring([self.x1, self.x2])
+        p, x1, x2 = self.p, self.x1, self.x2
+        self.assertEqual(_to_backend(p*x1**2 - x2, P), P('p*x1^2 - x2'))
+        self.assertEqual(_to_backend(3, P), P(3))
+        self.assertEqual(_to_backend(1/x1, P), None)
+        self.assertEqual(_to_backend(SR.var('y')*x1, P), None)
+
+
+    def test_to_backend_lifts_quotients(self):
+        from sage.all import PolynomialRing, QQ
+        from polynomialBackend import _backend_ring, _to_backend
+        R = PolynomialRing(QQ, 'x1,x2')
+        Q = R.quotient(R.ideal([R('x1*x2 - 1')]))
+        P = _backend_ring([self.x1, self.x2])
+        self.assertEqual(_to_backend(Q('x1 + x2^2'), P), P('x1 + x2^2'))
+
+
+    def test_variable_names(self):
+        from polynomialBackend import _variable_names
+        self.assertEqual(_variable_names(self.p*self.x1 + 2), {'p', 'x1'})
+        self.assertEqual(_variable_names(7), set())
+
+
+    def test_terms_and_degrees(self):
+        from polynomialBackend import _backend_ring, _degree, _is_term
+        P = _backend_ring([self.x1, self.x2])
+        self.assertTrue(_is_term(P('3*p*x1^2')))
+        self.assertTrue(_is_term(P(0)))
+        self.assertFalse(_is_term(P('x1 + x2')))
+        f = P('p^2*x1 + x1^3*x2')
+        self.assertEqual([_degree(f, k) for k in range(3)], [2, 3, 1])
+        self.assertEqual(_degree(P(0), 1), 0)
+
+
+    def test_cone_mat(self):
+        from interfaceZeta import _cone_mat
+        p, x1, x2 = self.p, self.x1, self.x2
+        M = _cone_mat([x1, x2], [(p*x1**2, p**3*x2)])
+        self.assertEqual(M, [(0, 1, 0), (0, 0, 1), (2, -2, 1)])
+
+
+    # The pairs can be given in a ring with more variables than the ones left
+    # after cleaning up the cone data.
+    def test_cone_mat_with_pairs(self):
+        from sage.all import SR
+        from interfaceZeta import _cone_mat
+        from polynomialBackend import _backend_pairs
+        p, x1, x2 = self.p, self.x1, self.x2
+        y = SR.var('y')
+        cone = [(p*x1**2, p**3*x2*y)]
+        pairs = _backend_pairs([x1, x2, y], cone)
+        self.assertEqual(_cone_mat([x1, x2], cone, pairs), 
+            _cone_mat([x1, x2], cone))
+
+
+    def test_backend_pairs(self):
+        from polynomialBackend import _backend_pairs, _backend_ring
+        p, x1, x2 = self.p, self.x1, self.x2
+        P = _backend_ring([x1, x2])
+        pairs = _backend_pairs([x1, x2], [(p*x1, 1), (1/x1, x2)])
+        self.assertEqual(pairs, ((P('p*x1'), P(1)), (None, P('x2'))))
+        self.assertEqual(_backend_pairs([x1], []), ())
+
+
+@needs_sage
+class IsMonomialTest(unittest.TestCase):
+
+    # Returns a chart with only the data IsMonomial looks at.
+    def chart(self, varbs, cone):
+        from chartClass import Chart
+        C = Chart.__new__(Chart)
+        C.variables = varbs
+        C.cone = cone
+        return C
+
+
+    def test_is_monomial(self):
+        from sage.all import SR
+        p, x1, x2 = SR.var('p x1 x2')
+        self.assertTrue(self.chart((x1, x2), ((p*x1, x2**2), (1, -x1))).IsMonomial())
+        self.assertFalse(self.chart((x1, x2), ((p*x1, x1 + x2),)).IsMonomial())
+        self.assertFalse(self.chart((x1, x2), ((1, x1 - 1),)).IsMonomial())
+        self.assertTrue(self.chart((x1, x2), ()).IsMonomial())
+
+
+    # The cone data is converted when the chart is built, and only once.
+    def test_converted_once(self):
+        from sage.all import QQ, SR
+        from chartClass import Chart
+        p, x1, x2 = SR.var('p x1 x2')
+        C = Chart(QQ, (x1, x2), cone=[(p*x1, x2**2)], factor=[0])
+        pairs = C._backend_cone
+        self.assertEqual([str(g) for g in pairs[0]], ['p*x1', 'x2^2'])
+        self.assertTrue(C.IsMonomial())
+        self.assertIs(C._ring_cone(), pairs)
+        D = self.chart((x1, x2), ((p*x1, x1 + x2),))
+        self.assertFalse(D.IsMonomial())
+        self.assertIs(D._ring_cone(), D._ring_cone())
+
+
+    # Entries that are not polynomials in the chart variables fall back on
+    # the printout.
+    def test_fallback(self):
+        from sage.all import SR
+        x1, y = SR.var('x1 y')
+        self.assertTrue(self.chart((x1,), ((1, x1*y),)).IsMonomial())
+        self.assertFalse(self.chart((x1,), ((1, x1 + y),)).IsMonomial())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+
+@needs_sage
+class RationalFunctionsTest(unittest.TestCase):
+
+    def setUp(self):
+        from sage.all import SR
+        self.p, self.t = SR.var('p t')
+
+
+    def test_to_field(self):
+        from rationalFunctions import _field, _to_field
+        from sage.all import SR
+        p, t = self.p, self.t
+        K = _field()
+        P, T = K.gens()
+        self.assertEqual(_to_field((1 - p**-1*t)/(1 - t)), (P - T)/(P*(1 - T)))
+        self.assertEqual(_to_field(3), K(3))
+        self.assertEqual(_to_field(p - p), K(0))
+        self.assertEqual(_to_field(SR.var('C1')*p), None)
+        F = (P - T)/(P*(1 - T))
+        self.assertIs(_to_field(F), F)
+
+
+    def test_from_field(self):
+        from rationalFunctions import _field, _from_field, _to_field
+        K = _field()
+        P, T = K.gens()
+        F = (1 - P**-1*T)/(1 - T)**2
+        G = _from_field(F)
+        self.assertEqual(_to_field(G), F)
+        self.assertEqual(_from_field(K(0)), 0)
+
+
+    # Sums in the field agree with adding up and simplifying symbolically.
+    def test_sum(self):
+        from rationalFunctions import _rational_sum
+        p, t = self.p, self.t
+        terms = [(1 - p**-1)/(1 - p**-1*t), p**-1*t/(1 - t), 1 - p**-2]
+        S = _rational_sum(terms)
+        self.assertEqual((S - sum(terms)).simplify_full(), 0)
+        self.assertEqual(_rational_sum([]), 0)
+        self.assertEqual(_rational_sum([1/(1 - t), -1/(1 - t)]), 0)
+
+
+    # Sums can stay in the field, and be added up again there.
+    def test_sum_in_field(self):
+        from rationalFunctions import _field, _from_field, _rational_sum
+        p, t = self.p, self.t
+        K = _field()
+        P, T = K.gens()
+        S = _rational_sum([1/(1 - t), p**-1*t], symbolic=False)
+        self.assertEqual(S, 1/(1 - T) + T/P)
+        self.assertEqual(_rational_sum([S, -T/P], symbolic=False), 1/(1 - T))
+        self.assertEqual(_rational_sum([S, -T/P]), _from_field(1/(1 - T)))
+        self.assertEqual(_rational_sum([], symbolic=False), K(0))
+
+
+    # Terms that are not rational functions in p and t are added up in the
+    # symbolic ring.
+    def test_symbolic_sum(self):
+        from sage.all import SR
+        from rationalFunctions import _rational_sum
+        p, t = self.p, self.t
+        C = SR.var('C1')
+        terms = [C*t/(1 - t), (1 - p**-1)/(1 - t)]
+        S = _rational_sum(terms)
+        self.assertEqual((S - sum(terms)).simplify_full(), 0)
+        self.assertTrue(C in S.variables())
+        F = _rational_sum(terms[1:], symbolic=False)
+        S = _rational_sum([terms[0], F], symbolic=False)
+        self.assertEqual((S - sum(terms)).simplify_full(), 0)
+
+
+    def test_substitution(self):
+        from sage.all import PolynomialRing, QQ
+        from rationalFunctions import _field, _rational_substitution
+        p, t = self.p, self.t
+        R = PolynomialRing(QQ, 'Z0,Z1')
+        Z0, Z1 = R.gens()
+        Z = 1/((1 - Z0)*(1 - Z0*Z1))
+        K = _field()
+        P, T = K.gens()
+        F = _rational_substitution(Z, ['Z0', 'Z1'], [p**-1*t, p**-2], 1 - p**-1)
+        self.assertEqual(F, (1 - 1/P)/((1 - T/P)*(1 - T/P**3)))
+        # Images that are not rational functions in p and t.
+        self.assertEqual(_rational_substitution(Z, ['Z0', 'Z1'],
+            [p**-1*t, p.sqrt()], 1), None)
+        # A substitution that is not defined.
+        self.assertEqual(_rational_substitution(Z, ['Z0', 'Z1'], [1, t], 1), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
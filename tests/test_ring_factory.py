@@ -0,0 +1,64 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_atlas, needs_sage, ATLAS
+
+
+@needs_sage
+class RingFactoryTest(unittest.TestCase):
+
+    def test_one_ring_per_variables(self):
+        from sage.all import QQ, ZZ, SR
+        from ringFactory import _get_ring
+        P = _get_ring(QQ, ['x1', 'x2'])
+        self.assertIs(_get_ring(QQ, SR.var('x1 x2')), P)
+        self.assertEqual(P.variable_names(), ('x1', 'x2'))
+        self.assertIsNot(_get_ring(QQ, ['x2', 'x1']), P)
+        self.assertIsNot(_get_ring(ZZ, ['x1', 'x2']), P)
+
+
+    # Rings in one variable are multivariate as well.
+    def test_one_variable(self):
+        from sage.all import QQ
+        from ringFactory import _get_ring
+        P = _get_ring(QQ, ['x1'])
+        self.assertEqual(P.ngens(), 1)
+        self.assertEqual(P.gen().exponents(), [(1,)])
+
+
+    def test_one_quotient_per_ideal(self):
+        from sage.all import QQ
+        from ringFactory import _get_quotient, _get_ring
+        P = _get_ring(QQ, ['x1', 'x2'])
+        x1, x2 = P.gens()
+        Q = _get_quotient(QQ, ['x1', 'x2'], [x1*x2 - 1])
+        # The generators may be given in any order and with repeats.
+        self.assertIs(_get_quotient(QQ, ['x1', 'x2'], ['x1*x2 - 1']), Q)
+        R = _get_quotient(QQ, ['x1', 'x2'], [x1*x2 - 1, x1 - 2])
+        self.assertIs(_get_quotient(QQ, ['x1', 'x2'], [x1 - 2, x1*x2 - 1, x1 - 2]), R)
+        self.assertIsNot(R, Q)
+        self.assertIs(Q.cover_ring(), P)
+        self.assertEqual(Q(x1)*Q(x2), 1)
+
+
+@needs_atlas
+class AmbientSpaceTest(unittest.TestCase):
+
+    def test_charts_share_rings(self):
+        from atlasClass import Atlas
+        A = Atlas(ATLAS, verbose=0)
+        rings = {}
+        for C in A.charts:
+            self.assertIs(C.AmbientSpace(), C.AmbientSpace())
+            key = (tuple(map(str, C.variables)), str(C.ambientFactor))
+            if key in rings:
+                self.assertIs(C.AmbientSpace(), rings[key])
+            rings[key] = C.AmbientSpace()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+
+# Stands in for a Singular interface: it records what it is asked to do, and 
+# its process id can be changed to act like a restart.
+class _RecordingInterface():
+
+    def __init__(self):
+        self.process = 1
+        self.evals = []
+        self.libs = []
+
+
+    def pid(self):
+        return self.process
+
+
+    def eval(self, code):
+        self.evals.append(code)
+        return ""
+
+
+    def lib(self, path):
+        self.libs.append(path)
+
+
+@needs_sage
+class SessionSetUpTest(unittest.TestCase):
+
+    def test_libraries_procedures_and_rings_load_once(self):
+        from singularSession import SingularSession
+        I = _RecordingInterface()
+        S = SingularSession(I)
+        for _ in range(3):
+            S.lib("LIB/primdec.lib")
+            S.proc("f", "proc f() {}")
+            S.ring("r", "ring r;")
+        self.assertEqual(I.libs, ["LIB/primdec.lib"])
+        self.assertEqual(I.evals, ["proc f() {}", "ring r;"])
+        counts = S.Counts()
+        self.assertEqual((counts["lib skips"], counts["proc skips"], counts["ring skips"]), (2, 2, 2))
+
+
+    def test_restart_forgets_everything(self):
+        from singularSession import SingularSession
+        I = _RecordingInterface()
+        S = SingularSession(I)
+        S.lib("a.lib")
+        I.process = 2
+        S.lib("a.lib")
+        self.assertEqual(I.libs, ["a.lib", "a.lib"])
+        self.assertEqual(S.Counts()["restarts"], 1)
+
+
+    def test_one_session_per_interface(self):
+        from singularSession import _get_session
+        I = _RecordingInterface()
+        self.assertTrue(_get_session(I) is _get_session(I))
+        self.assertFalse(_get_session(I) is _get_session(_RecordingInterface()))
+
+
+@needs_sage
+class SessionNamesTest(unittest.TestCase):
+
+    def test_names_are_new_and_share_a_prefix(self):
+        from singularSession import SingularSession
+        S = SingularSession(_RecordingInterface())
+        names = [S.new_name() for _ in range(100)]
+        self.assertEqual(len(set(names)), 100)
+        self.assertTrue(all(x.startswith(S.prefix) for x in names))
+
+
+    def test_released_names_are_killed_in_batches(self):
+        from globalVars import _KILL_BATCH
+        from singularSession import SingularSession
+        I = _RecordingInterface()
+        S = SingularSession(I)
+        names = [S.new_name() for _ in range(_KILL_BATCH)]
+        S.release(*names[:-1])
+        _ = S.eval("1;")
+        self.assertEqual(I.evals, ["1;"])
+        S.release(names[-1])
+        _ = S.eval("2;")
+        self.assertEqual(I.evals[-1], "kill %s;\n2;" % (", ".join(names)))
+        self.assertEqual(S.Counts()["kills"], _KILL_BATCH)
+
+
+    def test_flush(self):
+        from singularSession import SingularSession
+        I = _RecordingInterface()
+        S = SingularSession(I)
+        x = S.new_name()
+        S.release(x)
+        S.flush()
+        self.assertEqual(I.evals, ["kill %s;" % (x)])
+        S.flush()
+        self.assertEqual(len(I.evals), 1)
+
+
+    # What is killed may be the current basering, so we switch to the base 
+    # ring first, and never kill the base ring itself.
+    def test_kills_switch_to_the_base_ring(self):
+        from singularSession import SingularSession
+        I = _RecordingInterface()
+        S = SingularSession(I)
+        S.ring("r", "ring r;", base=True)
+        x = S.new_name()
+        S.release(x, "r")
+        S.flush()
+        self.assertEqual(I.evals[-1], "setring r; kill %s;" % (x))
+        I.process = 2
+        S.release(x)
+        S.flush()
+        self.assertEqual(I.evals[-1], "kill %s;" % (x))
+
+
+@needs_sage
+class SingularKillTest(unittest.TestCase):
+
+    # With real Singular: killing a batch that holds the basering leaves us in
+    # the base ring, where we can keep working.
+    def test_killing_the_basering(self):
+        from sage.all import Singular
+        from globalVars import _KILL_BATCH
+        from singularSession import SingularSession
+        I = Singular()
+        try:
+            S = SingularSession(I)
+            S.ring("r", "ring r;", base=True)
+            for _ in range(_KILL_BATCH):
+                x = S.new_name()
+                _ = S.eval("ring %s = 0, (x, y), dp;" % (x))
+                S.release(x)
+            out = S.eval("nameof(basering);")
+            self.assertEqual(S.Counts()["kills"], _KILL_BATCH)
+            self.assertEqual(out.strip(), "r")
+            self.assertEqual(S.eval("poly f = x + 1; f;").strip(), "x+1")
+        finally:
+            I.quit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#
+#   Copyright 2020 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import unittest
+from support import needs_sage
+
+
+@needs_sage
+class SymbolTableTest(unittest.TestCase):
+
+    def test_interned(self):
+        from sage.all import SR
+        from symbolTable import SymbolTable
+        table = SymbolTable()
+        x = table('x1')
+        self.assertIs(table('x1'), x)
+        self.assertEqual(x, SR.var('x1'))
+        self.assertEqual(len(table.symbols), 1)
+        self.assertEqual(table.lookups, 2)
+
+
+    def test_symbols(self):
+        from sage.all import SR
+        from symbolTable import SymbolTable
+        table = SymbolTable()
+        X = table.Symbols(['y1', 'y2', 'y1'])
+        self.assertEqual(X, (SR.var('y1'), SR.var('y2'), SR.var('y1')))
+        self.assertIs(X[0], X[2])
+        self.assertEqual(len(table.symbols), 2)
+
+
+    def test_no_globals(self):
+        import __main__
+        from symbolTable import _symbol
+        _symbol('symbol_table_test_var')
+        self.assertFalse(hasattr(__main__, 'symbol_table_test_var'))
+
+
+    def test_shared(self):
+        from symbolTable import _symbol, _SYMBOLS
+        from parseSingularBasics import _parse_vars
+        X = _parse_vars("x(1) x(2)")
+        self.assertIs(X[0], _symbol('x1'))
+        self.assertIs(_SYMBOLS.symbols['x2'], X[1])
+
+
+if __name__ == "__main__":
+    unittest.main()